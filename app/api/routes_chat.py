@@ -1,59 +1,46 @@
 """Chat API endpoints for RAG-based question answering."""
 
+import asyncio
 import logging
-from typing import Annotated, Optional
+from typing import Annotated, AsyncIterator, Optional
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.models import ChatQuery, ChatResponse, ConversationMessage
 from app.services.chat_service import ChatService
 from app.services.session_manager import get_session_manager, SessionManager
-from app.ingestion.vector_store import WeaviateVectorStore
-from app.ingestion.embedder import BaseEmbedder
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def get_vector_store() -> WeaviateVectorStore:
-    """Dependency to get the global vector store instance."""
-    from app.main import vector_store
-    return vector_store
-
-
-def get_embedder() -> BaseEmbedder:
-    """Dependency to get the global embedder instance."""
-    from app.main import embedder
-    return embedder
-
-
-def get_chat_service(
-    vector_store: WeaviateVectorStore = Depends(get_vector_store),
-    embedder: BaseEmbedder = Depends(get_embedder),
-) -> ChatService:
+def get_chat_service() -> ChatService:
     """
-    Dependency to create ChatService instance.
+    Dependency to get the global chat service instance.
 
-    Args:
-        vector_store: WeaviateVectorStore instance (injected)
-        embedder: BaseEmbedder instance (injected)
+    The service (and its OpenAI client) is built once at startup rather
+    than per request.
 
     Returns:
         ChatService instance
     """
-    session_manager = get_session_manager()
-    return ChatService(
-        vector_store=vector_store,
-        embedder=embedder,
-        session_manager=session_manager
-    )
+    from app.main import chat_service
+    return chat_service
 
 
-@router.post("/chat/query", response_model=ChatResponse)
+# The service already returns a validated ChatResponse, so response_model=None
+# skips a second validation pass; `responses` keeps the schema in the docs.
+@router.post(
+    "/chat/query",
+    response_model=None,
+    responses={200: {"model": ChatResponse}},
+)
 async def chat_query(
     query: ChatQuery,
     chat_service: ChatService = Depends(get_chat_service),
-):
+) -> ChatResponse:
     """
     Answer a question using RAG (Retrieval-Augmented Generation).
 
@@ -72,29 +59,74 @@ async def chat_query(
     """
     try:
         logger.info(
-            f"Chat query: project={query.project_id}, "
-            f"session={query.session_id}, "
-            f"query_length={len(query.query)}"
+            "Chat query: project=%s, session=%s, query_length=%d",
+            query.project_id,
+            query.session_id,
+            len(query.query)
         )
 
         response = await chat_service.query(query)
 
         logger.info(
-            f"Chat response: session={response.session_id}, "
-            f"sources={len(response.sources)}, "
-            f"total_time={response.total_time_ms:.2f}ms"
+            "Chat response: session=%s, sources=%d, total_time=%.2fms",
+            response.session_id,
+            len(response.sources),
+            response.total_time_ms
         )
 
         return response
 
     except Exception as e:
-        logger.error(f"Error processing chat query: {e}", exc_info=True)
+        logger.error("Error processing chat query: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing query: {str(e)}"
         )
 
 
+@router.post("/chat/query/stream")
+async def chat_query_stream(
+    query: ChatQuery,
+    chat_service: ChatService = Depends(get_chat_service),
+) -> StreamingResponse:
+    """
+    Answer a question using RAG, streaming the answer as it is generated.
+
+    The body is newline-delimited JSON. Each piece of the answer is sent
+    as {"delta": "..."} as soon as it is generated; the last line is the
+    ChatResponse with the complete answer, sources and timings, sent once
+    the exchange is stored in the session. If the request fails after
+    streaming has started, the last line is {"error": "..."} instead.
+
+    Args:
+        query: ChatQuery with user question and parameters
+        chat_service: ChatService instance (injected)
+
+    Returns:
+        StreamingResponse of delta lines followed by one ChatResponse line
+    """
+    logger.info(
+        "Chat stream query: project=%s, session=%s, query_length=%d",
+        query.project_id,
+        query.session_id,
+        len(query.query)
+    )
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for item in chat_service.query_stream(query):
+                if isinstance(item, ChatResponse):
+                    yield item.model_dump_json() + "\n"
+                else:
+                    yield orjson.dumps({"delta": item}).decode() + "\n"
+        except Exception as e:
+            # The 200 status is already sent, so report the failure in-band
+            logger.error("Error processing chat stream: %s", e, exc_info=True)
+            yield orjson.dumps({"error": f"Error processing query: {str(e)}"}).decode() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/chat/history/{session_id}")
 async def get_chat_history(
     session_id: str,
@@ -113,17 +145,18 @@ async def get_chat_history(
         List of conversation messages in chronological order
     """
     try:
-        history = chat_service.get_conversation_history(
+        history = await asyncio.to_thread(
+            chat_service.get_conversation_history,
             session_id=session_id,
             max_messages=max_messages
         )
 
-        logger.info(f"Retrieved {len(history)} messages for session {session_id}")
+        logger.info("Retrieved %d messages for session %s", len(history), session_id)
 
         return history
 
     except Exception as e:
-        logger.error(f"Error retrieving chat history: {e}", exc_info=True)
+        logger.error("Error retrieving chat history: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving history: {str(e)}"
@@ -146,7 +179,7 @@ async def clear_chat_history(
         Success message
     """
     try:
-        success = chat_service.clear_conversation(session_id)
+        success = await asyncio.to_thread(chat_service.clear_conversation, session_id)
 
         if not success:
             raise HTTPException(
@@ -154,7 +187,7 @@ async def clear_chat_history(
                 detail=f"Session {session_id} not found"
             )
 
-        logger.info(f"Cleared conversation history for session {session_id}")
+        logger.info("Cleared conversation history for session %s", session_id)
 
         return {
             "message": "Conversation history cleared successfully",
@@ -164,7 +197,7 @@ async def clear_chat_history(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error clearing chat history: {e}", exc_info=True)
+        logger.error("Error clearing chat history: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error clearing history: {str(e)}"
@@ -176,24 +209,22 @@ async def get_session_stats() -> dict:
     """
     Get statistics about active sessions.
 
+    Expired sessions are swept by a background task (see app.main), so
+    this endpoint only reads counters.
+
     Returns:
         Dictionary with session statistics
     """
     try:
         session_manager = get_session_manager()
 
-        # Cleanup expired sessions first
-        cleaned_count = session_manager.cleanup_expired_sessions()
-
-        active_count = session_manager.get_active_session_count()
-
         return {
-            "active_sessions": active_count,
-            "expired_sessions_cleaned": cleaned_count
+            "active_sessions": await asyncio.to_thread(session_manager.get_active_session_count),
+            "expired_sessions_cleaned": session_manager.get_last_cleanup_count()
         }
 
     except Exception as e:
-        logger.error(f"Error getting session stats: {e}", exc_info=True)
+        logger.error("Error getting session stats: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error getting stats: {str(e)}"
@@ -1,21 +1,31 @@
 """Document ingestion API endpoints."""
 
+import asyncio
 import logging
+import os
 import pathlib
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Iterator
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
 from app.ingestion.loaders import from_upload_file, from_path
 from app.ingestion.pipeline import ingest_multiple_files, ingest_multiple_files_enhanced
 from app.ingestion.vector_store import WeaviateVectorStore
 from app.ingestion.embedder import BaseEmbedder
 from app.models import IngestResponse, DirectoryIngestRequest
-from app.config import settings
+from app.config import get_settings
+from app.services.semantic_cache import get_semantic_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# File extensions picked up by directory ingestion
+SUPPORTED_EXTENSIONS = frozenset({
+    '.html', '.htm', '.pdf', '.docx', '.doc',
+    '.txt', '.md', '.markdown', '.csv',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'
+})
+
 
 def get_vector_store() -> WeaviateVectorStore:
     """Dependency to get the global vector store instance."""
@@ -29,7 +39,36 @@ def get_embedder() -> BaseEmbedder:
     return embedder
 
 
-@router.post("/ingest/files", response_model=IngestResponse)
+def _iter_files(root: Path, extensions: frozenset[str]) -> Iterator[Path]:
+    """
+    Recursively yield files under root whose extension is in extensions.
+
+    Uses os.scandir, whose entries carry cached file-type information, so
+    directories are walked without a separate stat call per path.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file():
+                    if os.path.splitext(entry.name)[1].lower() in extensions:
+                        yield Path(entry.path)
+
+
+def _invalidate_answer_cache(project_id: str) -> None:
+    """Drop cached chat answers for a project whose documents just changed."""
+    if get_settings().semantic_cache_enabled:
+        get_semantic_cache().invalidate(project_id)
+
+
+@router.post(
+    "/ingest/files",
+    response_model=None,  # IngestResponse is built below; avoid re-validating it
+    responses={200: {"model": IngestResponse}},
+)
 async def ingest_files(
     project_id: Annotated[str, Form()],
     files: Annotated[list[UploadFile], File(...)],
@@ -40,8 +79,8 @@ async def ingest_files(
     Ingest one or more uploaded files with enhanced visual grounding.
 
     Now uses Phase 1 enhanced pipeline with:
-    - Layout-aware text extraction (PyMuPDF + pdfplumber)
-    - Table detection and preservation
+    - Layout-aware text extraction (PyMuPDF)
+    - Table detection and preservation (PyMuPDF find_tables)
     - Semantic chunking with overlap
     - Visual grounding (bounding boxes + chunk images)
 
@@ -57,17 +96,36 @@ async def ingest_files(
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
 
-    logger.info(f"Ingesting {len(files)} files for project {project_id} with enhanced pipeline")
+    logger.info("Ingesting %d files for project %s with enhanced pipeline", len(files), project_id)
+
+    settings = get_settings()
+
+    data_dir = Path(settings.data_dir)
+
+    # The enhanced pipeline works from files on disk, so stream uploads
+    # straight to their document directory instead of holding them in memory
+    upload_dir = data_dir / "documents" / project_id if settings.use_visual_grounding else None
+
+    # Load all files into RawDocument instances concurrently, bounded so a
+    # large batch of uploads is not all pulled into memory at once
+    semaphore = asyncio.Semaphore(settings.ingest_concurrency)
+
+    async def _load(file: UploadFile):
+        async with semaphore:
+            return await from_upload_file(project_id, file, dest_dir=upload_dir)
+
+    loaded = await asyncio.gather(
+        *(_load(file) for file in files),
+        return_exceptions=True,
+    )
 
-    # Load all files into RawDocument instances
     raws = []
-    for file in files:
-        try:
-            raw = await from_upload_file(project_id, file)
-            raws.append(raw)
-        except Exception as e:
-            logger.error(f"Error loading file {file.filename}: {e}", exc_info=True)
+    for file, result in zip(files, loaded):
+        if isinstance(result, Exception):
+            logger.error("Error loading file %s: %s", file.filename, result, exc_info=result)
             # Continue with other files even if one fails
+            continue
+        raws.append(result)
 
     if not raws:
         raise HTTPException(
@@ -76,8 +134,6 @@ async def ingest_files(
         )
 
     # Use enhanced pipeline if USE_VISUAL_GROUNDING is enabled
-    data_dir = Path(settings.data_dir)
-
     if settings.use_visual_grounding:
         logger.info("Using enhanced pipeline with visual grounding")
         summary = await ingest_multiple_files_enhanced(
@@ -92,6 +148,8 @@ async def ingest_files(
         logger.info("Using legacy pipeline (visual grounding disabled)")
         summary = await ingest_multiple_files(project_id, raws, vector_store, embedder)
 
+    _invalidate_answer_cache(project_id)
+
     return IngestResponse(project_id=project_id, summary=summary)
 
 
@@ -126,19 +184,10 @@ async def ingest_directory(
             detail=f"Path is not a directory: {request.path}"
         )
     
-    logger.info(f"Ingesting directory {request.path} for project {request.project_id}")
+    logger.info("Ingesting directory %s for project %s", request.path, request.project_id)
     
     # Find all files in directory
-    supported_extensions = {
-        '.html', '.htm', '.pdf', '.docx', '.doc',
-        '.txt', '.md', '.markdown', '.csv',
-        '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'
-    }
-    
-    files = [
-        f for f in directory_path.rglob('*')
-        if f.is_file() and f.suffix.lower() in supported_extensions
-    ]
+    files = list(_iter_files(directory_path, SUPPORTED_EXTENSIONS))
     
     if not files:
         raise HTTPException(
@@ -146,17 +195,21 @@ async def ingest_directory(
             detail=f"No supported files found in directory: {request.path}"
         )
     
-    logger.info(f"Found {len(files)} files to ingest")
+    logger.info("Found %d files to ingest", len(files))
     
-    # Load all files into RawDocument instances
+    # Load all files into RawDocument instances, reading them off the event loop
+    loaded = await asyncio.gather(
+        *(asyncio.to_thread(from_path, request.project_id, file_path) for file_path in files),
+        return_exceptions=True,
+    )
+
     raws = []
-    for file_path in files:
-        try:
-            raw = from_path(request.project_id, file_path)
-            raws.append(raw)
-        except Exception as e:
-            logger.error(f"Error loading file {file_path}: {e}", exc_info=True)
+    for file_path, result in zip(files, loaded):
+        if isinstance(result, Exception):
+            logger.error("Error loading file %s: %s", file_path, result, exc_info=result)
             # Continue with other files
+            continue
+        raws.append(result)
     
     if not raws:
         raise HTTPException(
@@ -165,6 +218,7 @@ async def ingest_directory(
         )
     
     # Use enhanced pipeline if enabled
+    settings = get_settings()
     data_dir = Path(settings.data_dir)
 
     if settings.use_visual_grounding:
@@ -181,5 +235,7 @@ async def ingest_directory(
         logger.info("Using legacy pipeline for directory ingestion")
         summary = await ingest_multiple_files(request.project_id, raws, vector_store, embedder)
 
+    _invalidate_answer_cache(request.project_id)
+
     return IngestResponse(project_id=request.project_id, summary=summary)
 
@@ -1,7 +1,8 @@
 """Configuration management using environment variables."""
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -14,10 +15,48 @@ class Settings(BaseSettings):
     weaviate_url: str = "http://localhost:8080"
     weaviate_api_key: Optional[str] = None
     weaviate_class_name: str = "IngestedChunk"  # Configurable class name
+    weaviate_upsert_concurrency: int = 8  # Batch requests in flight at once during ingestion
+    weaviate_batch_size: int = 100  # Objects per batch request
+    weaviate_batch_max_wait_ms: int = 50  # How long an upsert waits to share a batch with concurrent ingests
+    weaviate_quantization: Literal["none", "pq", "bq", "sq"] = "none"  # Vector compression for a new class
 
     # Chunking Configuration
     chunk_max_tokens: int = 400
     chunk_overlap_tokens: int = 50
+    chunk_dedupe_blocks: bool = False  # Drop blocks whose exact text appeared earlier in the document
+
+    # Ingestion Configuration
+    ingest_concurrency: int = 8  # Max uploaded files read and extracted concurrently
+    ingest_process_workers: Optional[int] = None  # Extraction worker processes (default: CPU count)
+    document_cache_dir: Optional[str] = None  # Directory for reusing extracted text and PDF blocks across ingests
+
+    # Embedding Configuration
+    embed_batch_size: int = 256  # Max texts per embeddings request (EMBED_BATCH_SIZE)
+    embed_max_concurrency: int = 5  # Embeddings requests in flight at once
+    min_embed_chars: int = 8  # Chunks with less (stripped) text are not embedded or stored
+    openai_embed_rpm: int = 3_000  # Embeddings requests per minute allowed by the account
+    openai_embed_tpm: int = 1_000_000  # Embeddings tokens per minute allowed by the account
+    embedding_dtype: Literal["float16", "float32"] = "float32"  # In-memory precision between embed and store
+    embedding_cache_path: Optional[str] = None  # SQLite file for reusing embeddings across ingests
+
+    # Answer Cache Configuration
+    semantic_cache_enabled: bool = False  # Reuse answers for repeated/paraphrased queries
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity for a semantic hit
+    semantic_cache_ttl_seconds: int = 600
+    semantic_cache_max_entries: int = 10_000
+
+    # Re-ranking Configuration
+    rerank_enabled: bool = False  # Re-order retrieved chunks with a cross-encoder
+    rerank_model: str = "BAAI/bge-reranker-base"
+    rerank_candidates_multiplier: int = 4  # Candidates fetched per kept chunk
+
+    # Startup Configuration
+    warmup_on_startup: bool = False  # One embeddings call and Weaviate write/search before serving
+
+    # Session Configuration
+    session_cleanup_interval_seconds: int = 30  # Background sweep of expired sessions
+    session_redis_url: Optional[str] = None  # Keep sessions in Redis, shared across workers
+    session_max_messages: int = 200  # Messages kept per session; older ones are dropped
 
     # Data Storage Configuration (Phase 1)
     data_dir: str = "./data"  # Base directory for storing documents and images
@@ -29,6 +68,17 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-# Singleton settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings.
+
+    Settings are read from the environment on first use rather than at
+    import time, and the same instance is shared afterwards. Tests can call
+    get_settings.cache_clear() to pick up a modified environment.
+
+    Returns:
+        Settings singleton
+    """
+    return Settings()
 
@@ -8,13 +8,21 @@ This module provides intelligent document chunking that:
 - Preserves bounding box information
 """
 
+import heapq
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import re
+from collections import ChainMap
+from itertools import chain
+from operator import attrgetter
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from app.ingestion.loaders import RawDocument
 from app.models import DocumentChunk
 
 logger = logging.getLogger(__name__)
 
+# A "token" for the legacy chunker is any run of non-whitespace characters
+_WORD_PATTERN = re.compile(r"\S+")
+
 
 # ============================================================================
 # Legacy chunking functions (for backward compatibility)
@@ -24,7 +32,9 @@ def chunk_text(text: str, max_tokens: int, overlap_tokens: int) -> list[tuple[in
     """
     Chunk text into smaller pieces with overlap.
 
-    Uses word-based approximation of tokens (splits on whitespace).
+    Uses word-based approximation of tokens (splits on whitespace). Word
+    offsets are computed in a single pass and each chunk is sliced straight
+    out of the original text, so whitespace inside a chunk is preserved.
 
     Args:
         text: The text to chunk
@@ -37,30 +47,23 @@ def chunk_text(text: str, max_tokens: int, overlap_tokens: int) -> list[tuple[in
     if not text.strip():
         return [(0, text)]
 
-    words = text.split()
+    spans = [match.span() for match in _WORD_PATTERN.finditer(text)]
+    num_words = len(spans)
 
-    if len(words) <= max_tokens:
+    if num_words <= max_tokens:
         return [(0, text)]
 
-    chunks = []
-    chunk_index = 0
-    start = 0
-
-    while start < len(words):
-        end = start + max_tokens
-        chunk_words = words[start:end]
-        chunk_text = " ".join(chunk_words)
-        chunks.append((chunk_index, chunk_text))
-
-        chunk_index += 1
-        # Move start forward by (max_tokens - overlap_tokens) to create overlap
-        start += max_tokens - overlap_tokens
+    # Prevent infinite loop if overlap is too large: only the first chunk is emitted
+    if overlap_tokens >= max_tokens:
+        return [(0, text[spans[0][0]:spans[max_tokens - 1][1]])]
 
-        # Prevent infinite loop if overlap is too large
-        if overlap_tokens >= max_tokens:
-            break
+    step = max_tokens - overlap_tokens
+    last_word = num_words - 1
 
-    return chunks
+    return [
+        (chunk_index, text[spans[start][0]:spans[min(start + max_tokens - 1, last_word)][1]])
+        for chunk_index, start in enumerate(range(0, num_words, step))
+    ]
 
 
 def chunk_document(
@@ -84,7 +87,9 @@ def chunk_document(
     Returns:
         List of DocumentChunk instances
     """
-    from app.config import settings
+    from app.config import get_settings
+
+    settings = get_settings()
 
     chunks_data = chunk_text(
         text,
@@ -96,14 +101,16 @@ def chunk_document(
 
     document_chunks = []
     for chunk_index, chunk_content in chunks_data:
-        # Merge base_metadata with chunk-specific metadata
-        chunk_metadata = {
-            **base_metadata,
-            "chunk_index": chunk_index,
-            "total_chunks": total_chunks,
-        }
+        # Chunk-specific metadata layered over the shared base_metadata
+        # instead of a full copy per chunk
+        chunk_metadata = ChainMap(
+            {"chunk_index": chunk_index, "total_chunks": total_chunks},
+            base_metadata,
+        )
 
-        chunk = DocumentChunk(
+        # Fields are built here, so skip validation (which would also copy
+        # the metadata into a new dict)
+        chunk = DocumentChunk.model_construct(
             project_id=project_id,
             source_id=raw.source_id,
             source_type=raw.file_type.value,
@@ -126,6 +133,8 @@ def chunk_document(
 class BoundingBox:
     """Represents a bounding box with coordinates."""
 
+    __slots__ = ("x1", "y1", "x2", "y2")
+
     def __init__(self, x1: float, y1: float, x2: float, y2: float):
         self.x1 = x1
         self.y1 = y1
@@ -146,10 +155,19 @@ class BoundingBox:
         if not boxes:
             return cls(0, 0, 0, 0)
 
-        x1 = min(box.x1 for box in boxes)
-        y1 = min(box.y1 for box in boxes)
-        x2 = max(box.x2 for box in boxes)
-        y2 = max(box.y2 for box in boxes)
+        # Single pass over the boxes instead of one min/max pass per coordinate
+        first = boxes[0]
+        x1, y1, x2, y2 = first.x1, first.y1, first.x2, first.y2
+
+        for box in boxes:
+            if box.x1 < x1:
+                x1 = box.x1
+            if box.y1 < y1:
+                y1 = box.y1
+            if box.x2 > x2:
+                x2 = box.x2
+            if box.y2 > y2:
+                y2 = box.y2
 
         return cls(x1, y1, x2, y2)
 
@@ -157,6 +175,22 @@ class BoundingBox:
 class EnhancedDocumentChunk:
     """Enhanced chunk with visual grounding metadata."""
 
+    # Created once per chunk, so skip the per-instance __dict__
+    __slots__ = (
+        "chunk_id",
+        "text",
+        "chunk_type",
+        "page_number",
+        "bounding_box",
+        "chunk_index",
+        "document_id",
+        "project_id",
+        "file_name",
+        "file_path",
+        "confidence",
+        "metadata",
+    )
+
     def __init__(
         self,
         chunk_id: str,
@@ -213,17 +247,20 @@ class SemanticChunker:
     - Table-aware (keeps tables whole)
     - Preserves bounding boxes
     - Respects paragraph boundaries
+    - Drops repeated boilerplate text blocks (optional)
     """
 
     def __init__(
         self,
         chunk_size: int = 400,
         chunk_overlap: int = 50,
-        min_chunk_size: int = 100
+        min_chunk_size: int = 100,
+        dedupe_blocks: bool = False
     ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.min_chunk_size = min_chunk_size
+        self.dedupe_blocks = dedupe_blocks
         self.logger = logging.getLogger(__name__)
 
     def chunk_blocks(
@@ -247,61 +284,137 @@ class SemanticChunker:
         Returns:
             List of EnhancedDocumentChunk objects
         """
-        chunks = []
-        chunk_index = 0
-
-        # Separate tables from text blocks
-        table_blocks = [b for b in blocks if getattr(b, 'block_type', 'text') == "table"]
-        text_blocks = [b for b in blocks if getattr(b, 'block_type', 'text') != "table"]
-
-        # Process tables first (each table is a single chunk)
-        for table_block in table_blocks:
-            bbox = getattr(table_block, 'bbox', None)
-            bbox_list = bbox.to_list() if bbox else [0, 0, 0, 0]
-
-            chunk = EnhancedDocumentChunk(
-                chunk_id=f"{document_id}_chunk_{chunk_index}",
-                text=table_block.text,
-                chunk_type="table",
-                page_number=getattr(table_block, 'page_number', 1),
-                bounding_box=bbox_list,
-                chunk_index=chunk_index,
-                document_id=document_id,
-                project_id=project_id,
-                file_name=file_name,
-                file_path=file_path,
-                confidence=getattr(table_block, 'confidence', 1.0),
-                metadata=getattr(table_block, 'metadata', {})
-            )
-            chunks.append(chunk)
-            chunk_index += 1
+        chunks = list(self.iter_chunk_blocks(
+            blocks,
+            document_id,
+            project_id,
+            file_name,
+            file_path
+        ))
 
-        # Process text blocks with semantic chunking
+        table_count = sum(1 for c in chunks if c.chunk_type == "table")
+        self.logger.info(
+            f"Created {len(chunks)} enhanced chunks "
+            f"({table_count} tables, {len(chunks) - table_count} text)"
+        )
+
+        return chunks
+
+    def iter_chunk_blocks(
+        self,
+        blocks: List[Any],
+        document_id: str,
+        project_id: str,
+        file_name: str,
+        file_path: Optional[str] = None
+    ) -> Iterator[EnhancedDocumentChunk]:
+        """
+        Lazily chunk a document, yielding each chunk with its final index.
+
+        Chunks are ordered by page, with tables ahead of text on the same
+        page. When table and text blocks each arrive in page order (as
+        DocumentProcessor produces them) chunks are streamed as soon as they
+        are built; otherwise they are collected and sorted first.
+
+        Args:
+            blocks: List of TextBlock objects from document processor
+            document_id: Unique document identifier
+            project_id: Project identifier
+            file_name: Original file name
+            file_path: Optional file path
+
+        Yields:
+            EnhancedDocumentChunk objects
+        """
+        # Separate tables from text blocks in a single pass
+        table_blocks = []
+        text_blocks = []
+        for block in blocks:
+            if getattr(block, 'block_type', 'text') == "table":
+                table_blocks.append(block)
+            else:
+                text_blocks.append(block)
+
+        if self.dedupe_blocks:
+            text_blocks = self._drop_duplicate_blocks(text_blocks)
+
+        # Each table is a single chunk
+        table_chunks = (
+            self._create_table_chunk(block, document_id, project_id, file_name, file_path)
+            for block in table_blocks
+        )
+
+        # Text blocks go through semantic chunking
         text_chunks = self._chunk_text_blocks(
             text_blocks,
             document_id,
             project_id,
             file_name,
-            file_path,
-            start_index=chunk_index
+            file_path
         )
 
-        chunks.extend(text_chunks)
-
-        # Sort by page and position
-        chunks.sort(key=lambda c: (c.page_number, c.chunk_index))
+        # Order by page with tables first on ties: heapq.merge breaks ties by
+        # iterable position, matching a stable sort of tables + text
+        page_key = attrgetter('page_number')
+        if _in_page_order(table_blocks) and _in_page_order(text_blocks):
+            ordered = heapq.merge(table_chunks, text_chunks, key=page_key)
+        else:
+            ordered = sorted(chain(table_chunks, text_chunks), key=page_key)
 
-        # Renumber indices
-        for i, chunk in enumerate(chunks):
+        # Assign final indices and ids in a single pass
+        for i, chunk in enumerate(ordered):
             chunk.chunk_index = i
             chunk.chunk_id = f"{document_id}_chunk_{i}"
+            yield chunk
 
-        self.logger.info(
-            f"Created {len(chunks)} enhanced chunks "
-            f"({len(table_blocks)} tables, {len(text_chunks)} text)"
-        )
+    def _drop_duplicate_blocks(self, blocks: List[Any]) -> List[Any]:
+        """
+        Keep only the first occurrence of each distinct block text.
 
-        return chunks
+        Repeated boilerplate (copyright lines, page templates) would
+        otherwise be chunked, embedded and stored once per page.
+        """
+        seen = set()
+        unique_blocks = []
+
+        for block in blocks:
+            if block.text in seen:
+                continue
+            seen.add(block.text)
+            unique_blocks.append(block)
+
+        dropped = len(blocks) - len(unique_blocks)
+        if dropped:
+            self.logger.info(f"Dropped {dropped} duplicate text blocks before chunking")
+
+        return unique_blocks
+
+    def _create_table_chunk(
+        self,
+        table_block: Any,
+        document_id: str,
+        project_id: str,
+        file_name: str,
+        file_path: Optional[str]
+    ) -> EnhancedDocumentChunk:
+        """Create a chunk holding a whole table (without a final index or id)."""
+        bbox = getattr(table_block, 'bbox', None)
+        bbox_list = bbox.to_list() if bbox else [0, 0, 0, 0]
+
+        return EnhancedDocumentChunk(
+            chunk_id="",  # Assigned once the final order is known
+            text=table_block.text,
+            chunk_type="table",
+            page_number=getattr(table_block, 'page_number', 1),
+            bounding_box=bbox_list,
+            chunk_index=-1,
+            document_id=document_id,
+            project_id=project_id,
+            file_name=file_name,
+            file_path=file_path,
+            confidence=getattr(table_block, 'confidence', 1.0),
+            metadata=getattr(table_block, 'metadata', {})
+        )
 
     def _chunk_text_blocks(
         self,
@@ -309,81 +422,78 @@ class SemanticChunker:
         document_id: str,
         project_id: str,
         file_name: str,
-        file_path: Optional[str],
-        start_index: int = 0
-    ) -> List[EnhancedDocumentChunk]:
-        """Chunk text blocks with overlap."""
-        chunks = []
-        current_text = []
-        current_blocks = []
-        chunk_index = start_index
+        file_path: Optional[str]
+    ) -> Iterator[EnhancedDocumentChunk]:
+        """Chunk text blocks with overlap (indices are assigned by the caller)."""
+        # (block, word_count) pairs; each block is split exactly once
+        current_blocks: List[Tuple[Any, int]] = []
+        current_word_count = 0
 
         for block in blocks:
             # Skip headers/footers if needed
             if getattr(block, 'block_type', 'text') in ["header", "footer"]:
                 continue
 
-            current_text.append(block.text)
-            current_blocks.append(block)
+            word_count = len(block.text.split())
+            current_blocks.append((block, word_count))
+            current_word_count += word_count
 
             # Check if reached target size
-            total_words = sum(len(text.split()) for text in current_text)
-
-            if total_words >= self.chunk_size:
+            if current_word_count >= self.chunk_size:
                 chunk = self._create_chunk_from_blocks(
                     current_blocks,
                     document_id,
                     project_id,
                     file_name,
-                    file_path,
-                    chunk_index
+                    file_path
                 )
 
                 if chunk:
-                    chunks.append(chunk)
-                    chunk_index += 1
+                    yield chunk
 
                 # Prepare next chunk with overlap
-                overlap_text = self._get_overlap_text(current_text)
-                overlap_blocks = self._get_overlap_blocks(current_blocks, overlap_text)
-
-                current_text = [overlap_text] if overlap_text else []
-                current_blocks = overlap_blocks
+                overlap_word_count = min(current_word_count, self.chunk_overlap)
+                current_blocks = self._get_overlap_blocks(current_blocks, overlap_word_count)
+                current_word_count = overlap_word_count
 
         # Final chunk
-        if current_text:
+        if current_blocks:
             chunk = self._create_chunk_from_blocks(
                 current_blocks,
                 document_id,
                 project_id,
                 file_name,
-                file_path,
-                chunk_index
+                file_path
             )
 
             if chunk:
-                chunks.append(chunk)
-
-        return chunks
+                yield chunk
 
     def _create_chunk_from_blocks(
         self,
-        blocks: List[Any],
+        block_entries: List[Tuple[Any, int]],
         document_id: str,
         project_id: str,
         file_name: str,
-        file_path: Optional[str],
-        chunk_index: int
+        file_path: Optional[str]
     ) -> Optional[EnhancedDocumentChunk]:
-        """Create chunk from blocks."""
-        if not blocks:
+        """
+        Create chunk from (block, word_count) pairs (without a final index or id).
+
+        Blocks are joined with whitespace, so the chunk's word count is the
+        sum of the precomputed block counts and the text is never re-split.
+        """
+        if not block_entries:
             return None
 
-        text = "\n\n".join(block.text for block in blocks)
+        word_count = sum(count for _, count in block_entries)
 
-        if len(text.split()) < self.min_chunk_size:
+        if word_count < self.min_chunk_size:
             return None
 
+        blocks = [block for block, _ in block_entries]
+        text = "\n\n".join(block.text for block in blocks)
+
         # Merge bounding boxes
         bboxes = [getattr(b, 'bbox', None) for b in blocks if hasattr(b, 'bbox')]
         if bboxes:
@@ -396,12 +506,12 @@ class SemanticChunker:
         avg_confidence = sum(getattr(b, 'confidence', 1.0) for b in blocks) / len(blocks)
 
         return EnhancedDocumentChunk(
-            chunk_id=f"{document_id}_chunk_{chunk_index}",
+            chunk_id="",
             text=text,
             chunk_type="text",
             page_number=page_number,
             bounding_box=bbox_list,
-            chunk_index=chunk_index,
+            chunk_index=-1,
             document_id=document_id,
             project_id=project_id,
             file_name=file_name,
@@ -409,42 +519,39 @@ class SemanticChunker:
             confidence=avg_confidence,
             metadata={
                 "block_count": len(blocks),
-                "word_count": len(text.split())
+                "word_count": word_count
             }
         )
 
-    def _get_overlap_text(self, texts: List[str]) -> str:
-        """Get overlap text from end of current chunk."""
-        if not texts:
-            return ""
-
-        combined = " ".join(texts)
-        words = combined.split()
-
-        if len(words) <= self.chunk_overlap:
-            return combined
-
-        return " ".join(words[-self.chunk_overlap:])
-
-    def _get_overlap_blocks(self, blocks: List[Any], overlap_text: str) -> List[Any]:
-        """Get blocks for overlap."""
-        if not overlap_text or not blocks:
+    def _get_overlap_blocks(
+        self,
+        blocks: List[Tuple[Any, int]],
+        overlap_word_count: int
+    ) -> List[Tuple[Any, int]]:
+        """Get trailing (block, word_count) pairs covering the overlap."""
+        if overlap_word_count <= 0 or not blocks:
             return []
 
-        overlap_word_count = len(overlap_text.split())
         overlap_blocks = []
         word_count = 0
 
-        for block in reversed(blocks):
-            overlap_blocks.insert(0, block)
-            word_count += len(block.text.split())
+        for block, block_word_count in reversed(blocks):
+            overlap_blocks.append((block, block_word_count))
+            word_count += block_word_count
 
             if word_count >= overlap_word_count:
                 break
 
+        overlap_blocks.reverse()
         return overlap_blocks
 
 
+def _in_page_order(blocks: List[Any]) -> bool:
+    """Check whether blocks are sorted by page number."""
+    pages = [getattr(b, 'page_number', 1) for b in blocks]
+    return all(a <= b for a, b in zip(pages, pages[1:]))
+
+
 def chunk_document_enhanced(
     project_id: str,
     document_id: str,
@@ -452,7 +559,8 @@ def chunk_document_enhanced(
     file_path: Optional[str],
     blocks: List[Any],
     chunk_size: int = 400,
-    chunk_overlap: int = 50
+    chunk_overlap: int = 50,
+    dedupe_blocks: bool = False
 ) -> List[EnhancedDocumentChunk]:
     """
     Enhanced chunking with visual grounding.
@@ -465,13 +573,15 @@ def chunk_document_enhanced(
         blocks: List of TextBlock objects
         chunk_size: Target chunk size
         chunk_overlap: Overlap size
+        dedupe_blocks: Whether to drop text blocks repeating an earlier block
 
     Returns:
         List of EnhancedDocumentChunk objects
     """
     chunker = SemanticChunker(
         chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
+        chunk_overlap=chunk_overlap,
+        dedupe_blocks=dedupe_blocks
     )
 
     return chunker.chunk_blocks(
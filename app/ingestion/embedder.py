@@ -1,18 +1,101 @@
 """Embedding provider abstraction and implementations."""
 
+import asyncio
+import base64
 import logging
 import time
-from typing import Protocol
-from openai import OpenAI
-from app.config import settings
+from functools import lru_cache
+from typing import Optional, Protocol, Union
+
+import numpy as np
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# OpenAI accepts at most 2048 inputs and ~300k tokens per embeddings request
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 250_000
+
+# Embedding vectors, one per input text: a float list each, or one 2-D array
+Embeddings = Union[list[list[float]], np.ndarray]
+
+
+def _estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text from its length (conservatively)."""
+    return len(text) // 3 + 1
+
+
+def _decode_embeddings(data: list) -> np.ndarray:
+    """
+    Decode base64 embeddings from a response into a (texts, dims) array.
+    
+    Each vector is raw little-endian float32, so it is read straight into
+    the array instead of through a list of Python floats.
+    """
+    return np.stack([
+        np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+        for item in data
+    ])
+
+
+class TokenBucket:
+    """
+    Async token bucket for pacing requests against a rate limit.
+    
+    The bucket holds up to capacity tokens and refills continuously at
+    rate_per_sec. acquire() waits only as long as needed for enough tokens.
+    """
+    
+    def __init__(self, rate_per_sec: float, capacity: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate_per_sec: Refill rate in tokens per second
+            capacity: Maximum number of tokens held (burst size)
+        """
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, amount: float = 1) -> None:
+        """
+        Wait until amount tokens are available and consume them.
+        
+        Args:
+            amount: Tokens to consume (clamped to the bucket capacity)
+        """
+        amount = min(amount, self.capacity)
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated_at) * self.rate_per_sec,
+                )
+                self._updated_at = now
+                
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                
+                await asyncio.sleep((amount - self._tokens) / self.rate_per_sec)
+
 
 class BaseEmbedder(Protocol):
     """Protocol for embedding providers."""
     
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    def embed_texts(self, texts: list[str]) -> Embeddings:
         """
         Generate embeddings for a list of texts.
         
@@ -20,7 +103,8 @@ class BaseEmbedder(Protocol):
             texts: List of text strings to embed
         
         Returns:
-            List of embedding vectors (each is a list of floats)
+            Embedding vectors in input order (lists of floats or the rows
+            of a 2-D array)
         """
         ...
 
@@ -28,19 +112,39 @@ class BaseEmbedder(Protocol):
 class OpenAIEmbedder:
     """OpenAI embedding provider implementation."""
     
-    def __init__(self, api_key: str, model: str = "text-embedding-3-large"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-large",
+        batch_size: int = 256,
+        max_concurrency: int = 5,
+        client: Optional[OpenAI] = None,
+        aclient: Optional[AsyncOpenAI] = None,
+        requests_per_minute: int = 3_000,
+        tokens_per_minute: int = 1_000_000,
+    ):
         """
         Initialize OpenAI embedder.
         
         Args:
             api_key: OpenAI API key
             model: Model name (default: text-embedding-3-large)
+            batch_size: Maximum number of texts sent per embeddings request
+            max_concurrency: Maximum embeddings requests in flight in aembed_texts
+            client: Optional shared OpenAI client (created from api_key if omitted)
+            aclient: Optional shared AsyncOpenAI client (created from api_key if omitted)
+            requests_per_minute: Request rate limit paced by aembed_texts
+            tokens_per_minute: Token rate limit paced by aembed_texts
         """
-        self.client = OpenAI(api_key=api_key)
+        self.client = client or OpenAI(api_key=api_key)
+        self.aclient = aclient or AsyncOpenAI(api_key=api_key)
         self.model = model
-        self.batch_size = 64  # OpenAI's recommended batch size
+        self.batch_size = min(batch_size, MAX_INPUTS_PER_REQUEST)
+        self.max_concurrency = max_concurrency
+        self.request_bucket = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
     
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
         """
         Generate embeddings for texts using OpenAI API.
         
@@ -50,16 +154,16 @@ class OpenAIEmbedder:
             texts: List of text strings to embed
         
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dims)
         """
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         
-        all_embeddings = []
+        all_embeddings: Optional[np.ndarray] = None
         
         # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
+        for batch_number, indices in enumerate(self._plan_batches(texts), 1):
+            batch = [texts[i] for i in indices]
             
             # Retry logic for rate limiting
             max_retries = 3
@@ -70,16 +174,19 @@ class OpenAIEmbedder:
                     response = self.client.embeddings.create(
                         model=self.model,
                         input=batch,
+                        encoding_format="base64",
                     )
                     
-                    batch_embeddings = [item.embedding for item in response.data]
-                    all_embeddings.extend(batch_embeddings)
+                    vectors = _decode_embeddings(response.data)
+                    if all_embeddings is None:
+                        all_embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+                    all_embeddings[indices] = vectors
                     break
                     
                 except Exception as e:
                     if attempt < max_retries - 1:
                         logger.warning(
-                            f"Embedding batch {i//self.batch_size + 1} failed, "
+                            f"Embedding batch {batch_number} failed, "
                             f"retrying in {retry_delay}s: {e}"
                         )
                         time.sleep(retry_delay)
@@ -90,13 +197,180 @@ class OpenAIEmbedder:
         
         return all_embeddings
 
+    async def aembed_texts(self, texts: list[str]) -> np.ndarray:
+        """
+        Generate embeddings for texts with concurrent batch requests.
+        
+        Batches are the same as in embed_texts, but up to max_concurrency
+        requests are in flight at once so their network latency overlaps.
+        Results are returned in input order.
+        
+        Args:
+            texts: List of text strings to embed
+        
+        Returns:
+            float32 array of shape (len(texts), dims)
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = self._plan_batches(texts)
+        
+        async def embed_one(batch_number: int, indices: list[int]) -> np.ndarray:
+            async with semaphore:
+                return await self._aembed_batch(batch_number, [texts[i] for i in indices])
+        
+        results = await asyncio.gather(
+            *(embed_one(number, indices) for number, indices in enumerate(batches, 1))
+        )
+        
+        all_embeddings = np.empty((len(texts), results[0].shape[1]), dtype=np.float32)
+        for indices, batch_embeddings in zip(batches, results):
+            all_embeddings[indices] = batch_embeddings
+        
+        return all_embeddings
+
+    def _plan_batches(self, texts: list[str]) -> list[list[int]]:
+        """
+        Group text indices into embeddings requests.
+        
+        Texts are visited longest first and packed greedily until a batch
+        reaches batch_size inputs or the per-request token budget, so
+        similarly sized texts share a request and long outliers cannot push
+        a batch over the API limit. Token counts are estimated from the
+        character length (see _estimate_tokens).
+        
+        Args:
+            texts: List of text strings to embed
+        
+        Returns:
+            List of batches, each a list of indices into texts
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        
+        batches: list[list[int]] = []
+        current: list[int] = []
+        current_tokens = 0
+        
+        for i in order:
+            tokens = _estimate_tokens(texts[i])
+            if current and (
+                len(current) >= self.batch_size
+                or current_tokens + tokens > MAX_TOKENS_PER_REQUEST
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+
+    async def _aembed_batch(self, batch_number: int, batch: list[str]) -> np.ndarray:
+        """
+        Embed one batch with the async client.
+        
+        Each attempt first waits for request and token budget, so concurrent
+        batches run at the configured rate limits instead of provoking 429s.
+        Rate-limit errors wait for the server's Retry-After; connection and
+        5xx errors back off exponentially; other API errors are raised
+        immediately since retrying cannot fix them.
+        """
+        max_retries = 3
+        retry_delay = 1
+        n_tokens = sum(_estimate_tokens(text) for text in batch)
+        
+        for attempt in range(max_retries):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(n_tokens)
+            
+            try:
+                response = await self.aclient.embeddings.create(
+                    model=self.model,
+                    input=batch,
+                    encoding_format="base64",
+                )
+                return _decode_embeddings(response.data)
+                
+            except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                if attempt == max_retries - 1:
+                    logger.error(f"Failed to embed batch after {max_retries} attempts: {e}")
+                    raise
+                
+                delay = retry_delay
+                if isinstance(e, RateLimitError):
+                    delay = _retry_after(e, default=retry_delay)
+                
+                logger.warning(
+                    f"Embedding batch {batch_number} failed, "
+                    f"retrying in {delay}s: {e}"
+                )
+                await asyncio.sleep(delay)
+                retry_delay *= 2
+
+
+def _retry_after(error: RateLimitError, default: float) -> float:
+    """Return the Retry-After delay from a rate-limit response, if present."""
+    try:
+        return float(error.response.headers.get("retry-after", default))
+    except (TypeError, ValueError):
+        return default
+
 
+async def aembed_texts(embedder: BaseEmbedder, texts: list[str]) -> Embeddings:
+    """
+    Embed texts without blocking the event loop.
+    
+    Uses the embedder's native aembed_texts when it has one and otherwise
+    runs the synchronous embed_texts in a worker thread.
+    
+    Args:
+        embedder: BaseEmbedder instance
+        texts: List of text strings to embed
+    
+    Returns:
+        Embedding vectors in input order
+    """
+    native = getattr(embedder, "aembed_texts", None)
+    if native is not None:
+        return await native(texts)
+    return await asyncio.to_thread(embedder.embed_texts, texts)
+
+
+@lru_cache(maxsize=1)
 def get_embedder() -> BaseEmbedder:
     """
     Factory function to get the configured embedder.
     
+    The embedder is built once and shares the process-wide OpenAI clients,
+    so every caller reuses the same connection pool.
+    
     Returns:
-        BaseEmbedder instance (currently OpenAIEmbedder)
+        BaseEmbedder instance (OpenAIEmbedder, wrapped in a CachedEmbedder
+        when EMBEDDING_CACHE_PATH is set)
     """
-    return OpenAIEmbedder(api_key=settings.openai_api_key)
-
+    from app.services.openai_clients import get_async_openai_client, get_openai_client
+    
+    settings = get_settings()
+    embedder = OpenAIEmbedder(
+        api_key=settings.openai_api_key,
+        batch_size=settings.embed_batch_size,
+        max_concurrency=settings.embed_max_concurrency,
+        client=get_openai_client(),
+        aclient=get_async_openai_client(),
+        requests_per_minute=settings.openai_embed_rpm,
+        tokens_per_minute=settings.openai_embed_tpm,
+    )
+    
+    if settings.embedding_cache_path:
+        from pathlib import Path
+        from app.ingestion.embedding_cache import CachedEmbedder, EmbeddingCache
+        
+        cache = EmbeddingCache(Path(settings.embedding_cache_path))
+        return CachedEmbedder(embedder, cache, model=embedder.model)
+    
+    return embedder
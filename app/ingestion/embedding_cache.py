@@ -0,0 +1,178 @@
+"""Persistent content-addressed cache for embeddings."""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.ingestion.embedder import BaseEmbedder, aembed_texts
+
+logger = logging.getLogger(__name__)
+
+# Keys per SELECT ... IN (...) query, below SQLite's bound-parameter limit
+_LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed store of embeddings keyed by (model, text).
+
+    Keys are SHA-256 digests of the model name and text, so the same text
+    embedded by a different model never collides. Vectors are stored as
+    raw float32 bytes.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb (key BLOB PRIMARY KEY, v BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        logger.info(f"EmbeddingCache opened at {path}")
+
+    @staticmethod
+    def make_key(model: str, text: str) -> bytes:
+        """Build the cache key for a text embedded with a model."""
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, list[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            keys: Cache keys from make_key
+
+        Returns:
+            Mapping of found keys to their embeddings
+        """
+        found: dict[bytes, list[float]] = {}
+
+        with self._lock:
+            for i in range(0, len(keys), _LOOKUP_BATCH_SIZE):
+                batch = keys[i:i + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, v FROM emb WHERE key IN ({placeholders})", batch
+                )
+                for key, value in rows:
+                    found[key] = np.frombuffer(value, dtype=np.float32).tolist()
+
+        return found
+
+    def put_many(self, items: list[tuple[bytes, list[float]]]) -> None:
+        """
+        Store embeddings, keeping existing entries for the same key.
+
+        Args:
+            items: (key, embedding) pairs
+        """
+        rows = [
+            (key, np.asarray(embedding, dtype=np.float32).tobytes())
+            for key, embedding in items
+        ]
+
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO emb (key, v) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedder:
+    """Embedder wrapper that only sends cache misses to the wrapped embedder."""
+
+    def __init__(self, embedder: BaseEmbedder, cache: EmbeddingCache, model: str):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embedder: Embedder used for cache misses
+            cache: EmbeddingCache instance
+            model: Model name used in cache keys
+        """
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings, serving repeated texts from the cache.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        keys, embeddings, missing = self._lookup(texts)
+        if missing:
+            fresh = self.embedder.embed_texts([texts[i] for i in missing])
+            self._store(keys, embeddings, missing, fresh)
+        return embeddings
+
+    async def aembed_texts(self, texts: list[str]) -> list[list[float]]:
+        """
+        Async variant of embed_texts; database access runs in a worker thread.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        keys, embeddings, missing = await asyncio.to_thread(self._lookup, texts)
+        if missing:
+            fresh = await aembed_texts(self.embedder, [texts[i] for i in missing])
+            await asyncio.to_thread(self._store, keys, embeddings, missing, fresh)
+        return embeddings
+
+    def _lookup(
+        self, texts: list[str]
+    ) -> tuple[list[bytes], list[Optional[list[float]]], list[int]]:
+        """Return keys, embeddings with cache hits filled in, and miss indices."""
+        keys = [EmbeddingCache.make_key(self.model, text) for text in texts]
+        hits = self.cache.get_many(keys)
+
+        embeddings = [hits.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if texts:
+            logger.debug(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits")
+
+        return keys, embeddings, missing
+
+    def _store(
+        self,
+        keys: list[bytes],
+        embeddings: list[Optional[list[float]]],
+        missing: list[int],
+        fresh: list[list[float]],
+    ) -> None:
+        """Fill misses with fresh embeddings and persist them."""
+        if len(fresh) != len(missing):
+            raise ValueError(
+                f"Embedding count ({len(fresh)}) doesn't match miss count ({len(missing)})"
+            )
+
+        for i, embedding in zip(missing, fresh):
+            embeddings[i] = embedding
+        self.cache.put_many([(keys[i], embedding) for i, embedding in zip(missing, fresh)])
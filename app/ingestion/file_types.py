@@ -1,8 +1,8 @@
 """File type detection and enumeration."""
 
+import os
 from enum import Enum
 from typing import Optional
-import mimetypes
 
 
 class FileType(str, Enum):
@@ -18,51 +18,94 @@ class FileType(str, Enum):
     UNKNOWN = "unknown"
 
 
-def guess_file_type(filename: str, content_type: Optional[str] = None) -> FileType:
+# Extension -> file type, checked first
+_EXTENSION_TYPES: dict[str, FileType] = {
+    '.html': FileType.HTML,
+    '.htm': FileType.HTML,
+    '.pdf': FileType.PDF,
+    '.docx': FileType.DOCX,
+    '.doc': FileType.DOCX,
+    '.txt': FileType.TXT,
+    '.md': FileType.MARKDOWN,
+    '.markdown': FileType.MARKDOWN,
+    '.csv': FileType.CSV,
+    '.jpg': FileType.IMAGE,
+    '.jpeg': FileType.IMAGE,
+    '.png': FileType.IMAGE,
+    '.gif': FileType.IMAGE,
+    '.bmp': FileType.IMAGE,
+    '.webp': FileType.IMAGE,
+}
+
+# MIME type (without parameters) -> file type, used when the extension is unknown
+_MIME_TYPES: dict[str, FileType] = {
+    'text/html': FileType.HTML,
+    'application/xhtml+xml': FileType.HTML,
+    'application/pdf': FileType.PDF,
+    'application/x-pdf': FileType.PDF,
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': FileType.DOCX,
+    'application/msword': FileType.DOCX,
+    'text/plain': FileType.TXT,
+    'text/markdown': FileType.MARKDOWN,
+    'text/csv': FileType.CSV,
+    'text/comma-separated-values': FileType.CSV,
+}
+
+# Number of leading bytes inspected by magic-number sniffing
+HEADER_SIZE = 261
+
+
+def guess_file_type(
+    filename: str,
+    content_type: Optional[str] = None,
+    header: Optional[bytes] = None,
+) -> FileType:
     """
-    Guess file type from filename extension and optional MIME type.
+    Guess file type from filename extension, MIME type and content.
     
     Args:
         filename: The filename with extension
         content_type: Optional MIME type (e.g., from HTTP Content-Type header)
+        header: Optional leading bytes of the file, sniffed for magic
+            numbers when neither the extension nor the MIME type is known
     
     Returns:
         FileType enum value
     """
-    filename_lower = filename.lower()
-    
     # Check by extension first
-    if filename_lower.endswith(('.html', '.htm')):
-        return FileType.HTML
-    elif filename_lower.endswith('.pdf'):
-        return FileType.PDF
-    elif filename_lower.endswith(('.docx', '.doc')):
-        return FileType.DOCX
-    elif filename_lower.endswith('.txt'):
-        return FileType.TXT
-    elif filename_lower.endswith(('.md', '.markdown')):
-        return FileType.MARKDOWN
-    elif filename_lower.endswith('.csv'):
-        return FileType.CSV
-    elif filename_lower.endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')):
-        return FileType.IMAGE
+    file_type = _EXTENSION_TYPES.get(os.path.splitext(filename)[1].lower())
+    if file_type is not None:
+        return file_type
     
     # Fallback to MIME type if provided
     if content_type:
-        if 'html' in content_type:
-            return FileType.HTML
-        elif 'pdf' in content_type:
-            return FileType.PDF
-        elif 'wordprocessingml' in content_type or 'msword' in content_type:
-            return FileType.DOCX
-        elif 'text/plain' in content_type:
-            return FileType.TXT
-        elif 'text/markdown' in content_type:
-            return FileType.MARKDOWN
-        elif 'text/csv' in content_type or 'text/comma-separated-values' in content_type:
-            return FileType.CSV
-        elif content_type.startswith('image/'):
+        mime_type = content_type.split(';', 1)[0].strip().lower()
+        file_type = _MIME_TYPES.get(mime_type)
+        if file_type is not None:
+            return file_type
+        if mime_type.startswith('image/'):
             return FileType.IMAGE
     
+    # Last resort: look at the content itself
+    if header:
+        return _sniff_file_type(header[:HEADER_SIZE])
+    
     return FileType.UNKNOWN
 
+
+def _sniff_file_type(header: bytes) -> FileType:
+    """Identify a file type from its leading bytes."""
+    if header.startswith(b'%PDF-'):
+        return FileType.PDF
+    if header.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'BM')):
+        return FileType.IMAGE
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return FileType.IMAGE
+    if header.startswith(b'PK\x03\x04') and (b'word/' in header or b'[Content_Types].xml' in header):
+        return FileType.DOCX
+    
+    start = header.lstrip().lower()
+    if start.startswith((b'<!doctype html', b'<html')):
+        return FileType.HTML
+    
+    return FileType.UNKNOWN
@@ -1,11 +1,16 @@
 """File loading utilities to create RawDocument instances."""
 
 from dataclasses import dataclass
-from typing import Any
+import hashlib
+from typing import Any, Optional
 import pathlib
+import aiofiles
 from fastapi import UploadFile
 
-from app.ingestion.file_types import FileType, guess_file_type
+from app.ingestion.file_types import HEADER_SIZE, FileType, guess_file_type
+
+# Size of each read when streaming an upload to disk
+UPLOAD_READ_SIZE = 1 << 20
 
 
 @dataclass
@@ -23,34 +28,66 @@ class RawDocument:
         """Initialize metadata if not provided."""
         if self.metadata is None:
             self.metadata = {}
+    
+    def read_bytes(self) -> bytes:
+        """
+        Return the document content.
+        
+        Uploads streamed to disk carry empty bytes and a file_path in their
+        metadata; their content is read back from that file on demand.
+        """
+        if self.bytes or "file_path" not in self.metadata:
+            return self.bytes
+        return pathlib.Path(self.metadata["file_path"]).read_bytes()
 
 
-async def from_upload_file(project_id: str, upload_file: UploadFile) -> RawDocument:
+async def from_upload_file(
+    project_id: str,
+    upload_file: UploadFile,
+    dest_dir: Optional[pathlib.Path] = None,
+) -> RawDocument:
     """
     Create a RawDocument from a FastAPI UploadFile.
     
+    When dest_dir is given, the upload is streamed in fixed-size pieces to
+    dest_dir/<source_id>/original.<ext> instead of being read into memory.
+    The returned document then has empty bytes and records the saved
+    file's path, size and SHA-256 in its metadata.
+    
     Args:
         project_id: The project/tenant identifier
         upload_file: FastAPI UploadFile instance
+        dest_dir: Optional directory to stream the upload into
     
     Returns:
         RawDocument instance
     """
     file_name = upload_file.filename or "unknown"
-    content = await upload_file.read()
     content_type = upload_file.content_type
     
-    file_type = guess_file_type(file_name, content_type)
-    
     # Generate source_id from filename (without extension)
     source_id = pathlib.Path(file_name).stem
     
     metadata = {
         "original_filename": file_name,
         "content_type": content_type,
-        "file_size": len(content),
     }
     
+    if dest_dir is None:
+        content = await upload_file.read()
+        header = content[:HEADER_SIZE]
+        metadata["file_size"] = len(content)
+    else:
+        file_ext = file_name.split('.')[-1].lower()
+        file_path = dest_dir / source_id / f"original.{file_ext}"
+        file_size, sha256, header = await _stream_to_disk(upload_file, file_path)
+        content = b""
+        metadata["file_path"] = str(file_path.absolute())
+        metadata["file_size"] = file_size
+        metadata["sha256"] = sha256
+    
+    file_type = guess_file_type(file_name, content_type, header)
+    
     return RawDocument(
         project_id=project_id,
         source_id=source_id,
@@ -61,6 +98,31 @@ async def from_upload_file(project_id: str, upload_file: UploadFile) -> RawDocum
     )
 
 
+async def _stream_to_disk(
+    upload_file: UploadFile, file_path: pathlib.Path
+) -> tuple[int, str, bytes]:
+    """
+    Copy an upload to file_path piece by piece.
+    
+    Returns:
+        Tuple of (file_size, sha256_hexdigest, leading bytes for type sniffing)
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    hasher = hashlib.sha256()
+    file_size = 0
+    header = b""
+    
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await upload_file.read(UPLOAD_READ_SIZE):
+            if not file_size:
+                header = chunk[:HEADER_SIZE]
+            hasher.update(chunk)
+            file_size += len(chunk)
+            await f.write(chunk)
+    
+    return file_size, hasher.hexdigest(), header
+
+
 def from_path(project_id: str, path: pathlib.Path) -> RawDocument:
     """
     Create a RawDocument from a file path.
@@ -81,7 +143,7 @@ def from_path(project_id: str, path: pathlib.Path) -> RawDocument:
     file_name = path.name
     content = path.read_bytes()
     
-    file_type = guess_file_type(file_name, None)
+    file_type = guess_file_type(file_name, None, content[:HEADER_SIZE])
     
     # Generate source_id from filename (without extension)
     source_id = path.stem
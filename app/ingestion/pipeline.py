@@ -1,115 +1,566 @@
 """Orchestration pipeline for document ingestion."""
 
+import asyncio
 import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional
+
+import numpy as np
+
 from app.ingestion.loaders import RawDocument
-from app.ingestion.text_extractors import extract_text
+from app.ingestion.text_extractors import (
+    EXTRACTOR_VERSION,
+    PARSED_FILE_TYPES,
+    UNSUPPORTED_FILE_TYPES,
+    extract_text,
+)
 from app.ingestion.chunker import chunk_document, chunk_document_enhanced
-from app.ingestion.embedder import BaseEmbedder
-from app.ingestion.vector_store import WeaviateVectorStore
+from app.ingestion.embedder import BaseEmbedder, aembed_texts
+from app.ingestion.vector_store import WeaviateVectorStore, aupsert_chunks
+from app.services.document_cache import ExtractedTextCache
 from app.services.document_processor import DocumentProcessor
 from app.services.visual_grounding import VisualGroundingService
 
 logger = logging.getLogger(__name__)
 
 
-async def ingest_raw_document(
+@dataclass
+class _PreparedDocument:
+    """A document that has been extracted and chunked but not yet embedded."""
+
+    raw: RawDocument
+    summary: dict[str, Any]
+    chunks: list[Any]
+    image_paths: Optional[list[str]] = None  # Only set by the enhanced pipeline
+
+
+# Embedded micro-batches waiting to be stored (bounds memory via backpressure)
+_STORE_QUEUE_SIZE = 4
+
+# Recently embedded texts whose vectors are kept for reuse by later micro-batches
+_RECENT_EMBEDDINGS_SIZE = 2048
+
+# Worker processes for CPU-bound extraction (created on first use)
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool used for document preparation.
+
+    Extraction (pdfplumber, python-docx, PyMuPDF) is pure CPU and holds the
+    GIL, so processes are needed to use more than one core. Workers are
+    spawned rather than forked so they never inherit the server's threads
+    or a PyMuPDF context.
+
+    Returns:
+        ProcessPoolExecutor singleton sized from settings
+    """
+    global _process_pool
+
+    if _process_pool is None:
+        from app.config import get_settings
+
+        _process_pool = ProcessPoolExecutor(
+            max_workers=get_settings().ingest_process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared process pool if it was started."""
+    global _process_pool
+
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+def _error_summary(project_id: str, raw: RawDocument, error: str) -> dict[str, Any]:
+    """Build the summary returned for a file that could not be ingested."""
+    return {
+        "file_name": raw.file_name,
+        "num_chunks": 0,
+        "project_id": project_id,
+        "source_id": raw.source_id,
+        "error": error,
+    }
+
+
+async def _embed_and_store(
     project_id: str,
-    raw: RawDocument,
+    documents: AsyncIterable[_PreparedDocument],
     vector_store: WeaviateVectorStore,
     embedder: BaseEmbedder,
-) -> dict[str, Any]:
+) -> None:
     """
-    Ingest a single raw document through the full pipeline.
-    
-    Steps:
-    1. Extract text and metadata
-    2. Chunk the document
-    3. Generate embeddings
-    4. Store in Weaviate
-    
+    Embed the chunks of all prepared documents and store them.
+
+    Chunks from every document are flattened into a single sequence and
+    cut into micro-batches large enough to keep every concurrent embeddings
+    request full, so small files share requests. Documents are consumed as
+    they finish preparing, so the first micro-batch is embedded while later
+    files are still being extracted. Embedding and storage run as two
+    stages connected by a bounded queue: while one micro-batch is being
+    written to Weaviate the next is already being embedded.
+
+    Identical texts are embedded only once, and chunks too short to be
+    useful for retrieval are dropped first. A failure only affects the
+    documents it touches; their summaries are updated in place.
+
     Args:
         project_id: Project identifier
-        raw: RawDocument instance
+        documents: Prepared documents (documents without chunks are skipped)
         vector_store: WeaviateVectorStore instance
         embedder: BaseEmbedder instance
-    
+    """
+    from app.config import get_settings
+
+    settings = get_settings()
+    batch_size = settings.embed_batch_size * settings.embed_max_concurrency
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_STORE_QUEUE_SIZE)
+    await asyncio.gather(
+        _embed_stage(
+            project_id,
+            _micro_batches(project_id, documents, batch_size, settings.min_embed_chars),
+            embedder,
+            queue,
+            settings.embedding_dtype,
+        ),
+        _store_stage(project_id, vector_store, queue),
+    )
+
+
+async def _micro_batches(
+    project_id: str,
+    documents: AsyncIterable[_PreparedDocument],
+    batch_size: int,
+    min_chars: int,
+) -> AsyncIterator[list[tuple[_PreparedDocument, int]]]:
+    """
+    Group the chunks of arriving documents into micro-batches.
+
+    Yields (document, chunk position) lists of batch_size entries, in
+    arrival order, plus a final partial batch once every document is in.
+    """
+    batch: list[tuple[_PreparedDocument, int]] = []
+
+    async for doc in documents:
+        if doc.chunks:
+            _drop_short_chunks(project_id, doc, min_chars)
+
+        for i in range(len(doc.chunks)):
+            batch.append((doc, i))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+async def _embed_stage(
+    project_id: str,
+    micro_batches: AsyncIterable[list[tuple[_PreparedDocument, int]]],
+    embedder: BaseEmbedder,
+    queue: asyncio.Queue,
+    dtype: str,
+) -> None:
+    """
+    Embed each micro-batch and hand it to the store stage.
+
+    Embeddings are packed into one contiguous (chunks, dims) array per
+    micro-batch instead of lists of Python floats; rows are converted back
+    only when stored. Texts embedded recently (the last
+    _RECENT_EMBEDDINGS_SIZE unique texts) are reused rather than sent
+    again, so memory stays bounded however large the ingest is. A None
+    sentinel marks the end of the stream.
+    """
+    recent: OrderedDict[str, np.ndarray] = OrderedDict()
+    chunk_count = batch_count = unique_count = 0
+
+    try:
+        async for batch in micro_batches:
+            chunk_count += len(batch)
+            batch_count += 1
+
+            texts = [doc.chunks[i].text for doc, i in batch]
+            new_texts = list(dict.fromkeys(text for text in texts if text not in recent))
+
+            fresh: dict[str, np.ndarray] = {}
+            if new_texts:
+                try:
+                    vectors = await aembed_texts(embedder, new_texts)
+
+                    if len(vectors) != len(new_texts):
+                        raise ValueError(
+                            f"Embedding count ({len(vectors)}) doesn't match "
+                            f"chunk count ({len(new_texts)})"
+                        )
+                except Exception as e:
+                    logger.error(f"Error generating embeddings: {e}", exc_info=True)
+                    for doc in {id(doc): doc for doc, _ in batch}.values():
+                        doc.summary = _error_summary(project_id, doc.raw, str(e))
+                    continue
+
+                fresh = dict(zip(new_texts, np.asarray(vectors, dtype=dtype)))
+                unique_count += len(new_texts)
+
+            embeddings = np.stack([fresh[text] if text in fresh else recent[text] for text in texts])
+
+            for text in texts:
+                if text in recent:
+                    recent.move_to_end(text)
+            recent.update(fresh)
+            while len(recent) > _RECENT_EMBEDDINGS_SIZE:
+                recent.popitem(last=False)
+
+            await queue.put((batch, embeddings))
+    finally:
+        await queue.put(None)
+
+    if batch_count:
+        logger.info(
+            f"Embedded {unique_count} unique texts for {chunk_count} chunks "
+            f"in {batch_count} batches"
+        )
+
+
+async def _store_stage(
+    project_id: str,
+    vector_store: WeaviateVectorStore,
+    queue: asyncio.Queue,
+) -> None:
+    """
+    Store embedded micro-batches as they arrive, one document slice at a time.
+
+    Upserts go through the async Weaviate client (or a worker thread for
+    stores without one), so the embed stage keeps going meanwhile. The
+    slices of one micro-batch are stored concurrently, so the client's
+    batcher packs small documents into shared upsert batches instead of
+    flushing each document's remainder on its own.
+    Before a document's first slice is stored, chunks left from an earlier
+    ingest of the same source are deleted, so a re-ingested file that now
+    has fewer chunks leaves none behind. Documents that already failed are
+    skipped; a document that fails after some of its slices were stored is
+    deleted again once the stream ends, so no half-stored file is left.
+    """
+    cleared: dict[int, _PreparedDocument] = {}
+
+    async def store_slice(doc: _PreparedDocument, first: int, last: int, embeddings: np.ndarray) -> None:
+        try:
+            if id(doc) not in cleared:
+                cleared[id(doc)] = doc
+                await asyncio.to_thread(
+                    vector_store.delete_by_source, project_id, doc.raw.source_id
+                )
+            logger.info(f"Storing {last - first} chunks from {doc.raw.file_name} in Weaviate")
+            await aupsert_chunks(
+                vector_store,
+                doc.chunks[first:last],
+                embeddings,
+                image_paths=None if doc.image_paths is None else doc.image_paths[first:last],
+            )
+        except Exception as e:
+            logger.error(f"Error storing {doc.raw.file_name}: {e}", exc_info=True)
+            doc.summary = _error_summary(project_id, doc.raw, str(e))
+
+    while (item := await queue.get()) is not None:
+        batch, embeddings = item
+
+        # A document's chunks are contiguous within a micro-batch, and the
+        # batches are stored in order, so each document is cleared first
+        slices = []
+        start = 0
+        while start < len(batch):
+            doc = batch[start][0]
+            end = start + 1
+            while end < len(batch) and batch[end][0] is doc:
+                end += 1
+
+            if "error" not in doc.summary:
+                first, last = batch[start][1], batch[end - 1][1] + 1
+                slices.append(store_slice(doc, first, last, embeddings[start:end]))
+
+            start = end
+
+        await asyncio.gather(*slices)
+
+    for doc in cleared.values():
+        if "error" in doc.summary:
+            await _remove_partial_document(project_id, vector_store, doc)
+
+
+async def _remove_partial_document(
+    project_id: str,
+    vector_store: WeaviateVectorStore,
+    doc: _PreparedDocument,
+) -> None:
+    """Delete the chunks stored for a document that failed part-way."""
+    error = doc.summary["error"]
+    try:
+        await asyncio.to_thread(vector_store.delete_by_source, project_id, doc.raw.source_id)
+    except Exception as e:
+        logger.error(
+            f"Error removing partially stored {doc.raw.file_name}: {e}", exc_info=True
+        )
+        doc.summary["error"] = f"{error} (partially stored chunks could not be removed: {e})"
+    else:
+        logger.warning(f"Removed partially stored chunks of {doc.raw.file_name}")
+        doc.summary["error"] = f"{error} (partially stored chunks were removed)"
+
+
+async def _in_order(documents: list[_PreparedDocument]) -> AsyncIterator[_PreparedDocument]:
+    """Feed already prepared documents to _embed_and_store."""
+    for doc in documents:
+        yield doc
+
+
+async def _as_completed(
+    tasks: list["asyncio.Future[_PreparedDocument]"],
+) -> AsyncIterator[_PreparedDocument]:
+    """
+    Yield documents as their preparation finishes.
+
+    If the consumer stops early the remaining preparations are cancelled.
+    """
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _failed_document(project_id: str, raw: RawDocument, error: Exception) -> _PreparedDocument:
+    """Report a file whose preparation raised, e.g. because its worker process died."""
+    logger.error(f"Error preparing {raw.file_name}: {error}", exc_info=error)
+    return _PreparedDocument(
+        raw=raw,
+        summary=_error_summary(project_id, raw, str(error)),
+        chunks=[],
+    )
+
+
+def _unsupported_document(project_id: str, raw: RawDocument) -> _PreparedDocument:
+    """Skip a file type that has no extractor, before any work is done on it."""
+    logger.warning(f"Skipping {raw.file_name}: unsupported file type {raw.file_type.value}")
+    return _PreparedDocument(
+        raw=raw,
+        summary=_error_summary(project_id, raw, f"Unsupported file type: {raw.file_type.value}"),
+        chunks=[],
+    )
+
+
+def _is_empty(raw: RawDocument) -> bool:
+    """Check whether a document has no content, without reading a streamed upload."""
+    if raw.bytes:
+        return False
+    if "file_path" not in raw.metadata:
+        return True
+    return raw.metadata.get("file_size") == 0
+
+
+def _empty_document(project_id: str, raw: RawDocument) -> _PreparedDocument:
+    """Skip an empty file before handing it to a parser that would fail on it."""
+    logger.warning(f"Skipping {raw.file_name}: file is empty")
+    return _PreparedDocument(
+        raw=raw,
+        summary=_error_summary(project_id, raw, "File is empty"),
+        chunks=[],
+    )
+
+
+def _preview_text(texts: Iterable[str], limit: int = 100) -> str:
+    """
+    Build the summary preview of the space-joined texts.
+
+    Only as many texts as needed to exceed the limit are joined, rather
+    than the whole document.
+    """
+    parts = []
+    length = -1
+    for text in texts:
+        parts.append(text)
+        length += len(text) + 1
+        if length > limit:
+            return " ".join(parts)[:limit] + "..."
+    return " ".join(parts)
+
+
+def _drop_short_chunks(project_id: str, doc: _PreparedDocument, min_chars: int) -> None:
+    """
+    Remove chunks whose text is too short to embed, keeping image paths aligned.
+
+    Empty inputs are rejected by the embeddings API and fragments such as a
+    stray page number never help retrieval. The summary's chunk count is
+    updated, or replaced by an error if nothing is left.
+    """
+    keep = [i for i, chunk in enumerate(doc.chunks) if len(chunk.text.strip()) >= min_chars]
+    skipped = len(doc.chunks) - len(keep)
+    if not skipped:
+        return
+
+    logger.info(f"Skipping {skipped} chunks shorter than {min_chars} characters from {doc.raw.file_name}")
+
+    doc.chunks = [doc.chunks[i] for i in keep]
+    if doc.image_paths is not None:
+        doc.image_paths = [doc.image_paths[i] for i in keep]
+
+    if doc.chunks:
+        doc.summary["num_chunks"] = len(doc.chunks)
+    else:
+        doc.summary = _error_summary(project_id, doc.raw, "No chunks long enough to embed")
+
+
+@lru_cache(maxsize=1)
+def _get_text_cache() -> Optional[ExtractedTextCache]:
+    """Get this process's extracted-text cache, or None if DOCUMENT_CACHE_DIR is unset."""
+    from app.config import get_settings
+
+    cache_dir = get_settings().document_cache_dir
+    if not cache_dir:
+        return None
+    return ExtractedTextCache(Path(cache_dir), EXTRACTOR_VERSION)
+
+
+def _extract_text_cached(raw: RawDocument) -> tuple[str, dict[str, Any]]:
+    """
+    Extract text, reusing the result for content that was parsed before.
+
+    Only parsed formats (HTML, PDF, DOCX) are cached; plain text is just
+    decoded again.
+
+    Args:
+        raw: RawDocument instance
+
     Returns:
-        Summary dictionary with ingestion results
+        Tuple of (extracted_text, extra_metadata)
     """
+    cache = _get_text_cache() if raw.file_type in PARSED_FILE_TYPES else None
+    if cache is None:
+        return extract_text(raw)
+
+    content = raw.read_bytes()
+    key = cache.make_key(content)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Reusing extracted text for {raw.file_name}")
+        return cached
+
+    text, extra_metadata = extract_text(raw)
+    try:
+        cache.put(key, text, extra_metadata)
+    except OSError as e:
+        logger.warning(f"Could not cache extracted text for {raw.file_name}: {e}")
+    return text, extra_metadata
+
+
+def _prepare_raw_document(project_id: str, raw: RawDocument) -> _PreparedDocument:
+    """
+    Extract and chunk a single raw document.
+
+    Args:
+        project_id: Project identifier
+        raw: RawDocument instance
+
+    Returns:
+        _PreparedDocument with chunks and the summary to report once stored
+    """
+    if raw.file_type in UNSUPPORTED_FILE_TYPES:
+        return _unsupported_document(project_id, raw)
+    if _is_empty(raw):
+        return _empty_document(project_id, raw)
+
     try:
         # Step 1: Extract text
         logger.info(f"Extracting text from {raw.file_name}")
-        text, extra_metadata = extract_text(raw)
-        
+        text, extra_metadata = _extract_text_cached(raw)
+
         if not text.strip():
             logger.warning(f"No text extracted from {raw.file_name}")
-            return {
-                "file_name": raw.file_name,
-                "num_chunks": 0,
-                "project_id": project_id,
-                "source_id": raw.source_id,
-                "error": "No text extracted from file",
-            }
-        
+            return _PreparedDocument(
+                raw=raw,
+                summary=_error_summary(project_id, raw, "No text extracted from file"),
+                chunks=[],
+            )
+
         # Step 2: Prepare base metadata
-        base_metadata = {
-            "project_id": project_id,
-            "file_type": raw.file_type.value,
-            **raw.metadata,
-            **extra_metadata,
-        }
-        
+        base_metadata = {"project_id": project_id, "file_type": raw.file_type.value}
+        base_metadata.update(raw.metadata)
+        base_metadata.update(extra_metadata)
+
         # Step 3: Chunk document
         logger.info(f"Chunking document {raw.file_name}")
         chunks = chunk_document(project_id, raw, text, base_metadata)
-        
+
         if not chunks:
             logger.warning(f"No chunks created from {raw.file_name}")
-            return {
+            return _PreparedDocument(
+                raw=raw,
+                summary=_error_summary(project_id, raw, "No chunks created"),
+                chunks=[],
+            )
+
+        # Step 4: Build summary
+        preview_text = text[:100] + "..." if len(text) > 100 else text
+
+        return _PreparedDocument(
+            raw=raw,
+            summary={
                 "file_name": raw.file_name,
-                "num_chunks": 0,
+                "num_chunks": len(chunks),
                 "project_id": project_id,
                 "source_id": raw.source_id,
-                "error": "No chunks created",
-            }
-        
-        # Step 4: Generate embeddings
-        logger.info(f"Generating embeddings for {len(chunks)} chunks")
-        chunk_texts = [chunk.text for chunk in chunks]
-        embeddings = embedder.embed_texts(chunk_texts)
-        
-        if len(embeddings) != len(chunks):
-            raise ValueError(
-                f"Embedding count ({len(embeddings)}) doesn't match "
-                f"chunk count ({len(chunks)})"
-            )
-        
-        # Step 5: Store in Weaviate
-        logger.info(f"Storing {len(chunks)} chunks in Weaviate")
-        vector_store.upsert_chunks(chunks, embeddings)
-        
-        # Step 6: Return summary
-        preview_text = text[:100] + "..." if len(text) > 100 else text
-        
-        return {
-            "file_name": raw.file_name,
-            "num_chunks": len(chunks),
-            "project_id": project_id,
-            "source_id": raw.source_id,
-            "text_preview": preview_text,
-        }
-        
+                "text_preview": preview_text,
+            },
+            chunks=chunks,
+        )
+
     except Exception as e:
         logger.error(f"Error ingesting {raw.file_name}: {e}", exc_info=True)
-        return {
-            "file_name": raw.file_name,
-            "num_chunks": 0,
-            "project_id": project_id,
-            "source_id": raw.source_id,
-            "error": str(e),
-        }
+        return _PreparedDocument(
+            raw=raw,
+            summary=_error_summary(project_id, raw, str(e)),
+            chunks=[],
+        )
+
+
+async def ingest_raw_document(
+    project_id: str,
+    raw: RawDocument,
+    vector_store: WeaviateVectorStore,
+    embedder: BaseEmbedder,
+) -> dict[str, Any]:
+    """
+    Ingest a single raw document through the full pipeline.
+    
+    Steps:
+    1. Extract text and metadata
+    2. Chunk the document
+    3. Generate embeddings
+    4. Store in Weaviate
+    
+    Args:
+        project_id: Project identifier
+        raw: RawDocument instance
+        vector_store: WeaviateVectorStore instance
+        embedder: BaseEmbedder instance
+    
+    Returns:
+        Summary dictionary with ingestion results
+    """
+    prepared = await asyncio.to_thread(_prepare_raw_document, project_id, raw)
+    await _embed_and_store(project_id, _in_order([prepared]), vector_store, embedder)
+    return prepared.summary
 
 
 async def ingest_multiple_files(
@@ -119,7 +570,10 @@ async def ingest_multiple_files(
     embedder: BaseEmbedder,
 ) -> list[dict[str, Any]]:
     """
-    Ingest multiple files sequentially.
+    Ingest multiple files, embedding all of their chunks together.
+
+    Files are extracted and chunked in the shared process pool, up to
+    ingest_concurrency at a time, before the combined embedding call.
 
     Args:
         project_id: Project identifier
@@ -130,54 +584,65 @@ async def ingest_multiple_files(
     Returns:
         List of summary dictionaries (one per file)
     """
-    results = []
+    from app.config import get_settings
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    semaphore = asyncio.Semaphore(get_settings().ingest_concurrency)
 
-    for raw in raws:
-        logger.info(f"Processing file: {raw.file_name}")
-        result = await ingest_raw_document(project_id, raw, vector_store, embedder)
-        results.append(result)
+    async def prepare_one(raw: RawDocument) -> _PreparedDocument:
+        async with semaphore:
+            logger.info(f"Processing file: {raw.file_name}")
+            try:
+                return await loop.run_in_executor(pool, _prepare_raw_document, project_id, raw)
+            except Exception as e:
+                # Only this file fails; the others are still ingested
+                return _failed_document(project_id, raw, e)
 
-    return results
+    tasks = [asyncio.ensure_future(prepare_one(raw)) for raw in raws]
+    await _embed_and_store(project_id, _as_completed(tasks), vector_store, embedder)
+
+    return [task.result().summary for task in tasks]
 
 
 # ============================================================================
 # Enhanced ingestion pipeline with visual grounding (Phase 1)
 # ============================================================================
 
-async def ingest_raw_document_enhanced(
+def _prepare_raw_document_enhanced(
     project_id: str,
     raw: RawDocument,
-    vector_store: WeaviateVectorStore,
-    embedder: BaseEmbedder,
     data_dir: Path,
-    use_visual_grounding: bool = True
-) -> dict[str, Any]:
+    use_visual_grounding: bool
+) -> _PreparedDocument:
     """
-    Enhanced ingestion pipeline with visual grounding.
+    Process, chunk and render chunk images for a single raw document.
 
-    Steps:
-    1. Process document with layout awareness (PyMuPDF + pdfplumber)
-    2. Chunk with table awareness and overlap
-    3. Generate chunk images with bounding boxes
-    4. Generate embeddings
-    5. Store in Weaviate with visual metadata
+    Formats without layout support fall back to the legacy preparation.
 
     Args:
         project_id: Project identifier
         raw: RawDocument instance
-        vector_store: WeaviateVectorStore instance
-        embedder: BaseEmbedder instance
         data_dir: Base data directory for storing images
         use_visual_grounding: Whether to generate chunk images
 
     Returns:
-        Summary dictionary with ingestion results
+        _PreparedDocument with chunks, image paths and the summary to report
     """
+    if raw.file_type in UNSUPPORTED_FILE_TYPES:
+        return _unsupported_document(project_id, raw)
+    if _is_empty(raw):
+        return _empty_document(project_id, raw)
+
     try:
-        from app.config import settings
+        from app.config import get_settings
+
+        settings = get_settings()
 
         # Initialize services
-        doc_processor = DocumentProcessor()
+        doc_processor = DocumentProcessor(
+            cache_dir=Path(settings.document_cache_dir) if settings.document_cache_dir else None
+        )
         visual_service = VisualGroundingService(data_dir) if use_visual_grounding else None
 
         # Determine file extension
@@ -196,7 +661,7 @@ async def ingest_raw_document_enhanced(
 
             # Save file with appropriate extension
             file_path = doc_dir / f"original.{file_ext}"
-            file_path.write_bytes(raw.bytes)
+            file_path.write_bytes(raw.read_bytes())
 
             # Update metadata
             raw.metadata['file_path'] = str(file_path.absolute())
@@ -215,13 +680,11 @@ async def ingest_raw_document_enhanced(
 
             if not blocks:
                 logger.warning(f"No content extracted from {raw.file_name}")
-                return {
-                    "file_name": raw.file_name,
-                    "num_chunks": 0,
-                    "project_id": project_id,
-                    "source_id": raw.source_id,
-                    "error": "No content extracted from PDF",
-                }
+                return _PreparedDocument(
+                    raw=raw,
+                    summary=_error_summary(project_id, raw, "No content extracted from PDF"),
+                    chunks=[],
+                )
 
         elif file_ext in ['docx', 'doc']:
             logger.info(f"Processing DOCX: {raw.file_name}")
@@ -234,7 +697,7 @@ async def ingest_raw_document_enhanced(
         else:
             # Fall back to legacy extraction for other formats
             logger.info(f"Using legacy extraction for {raw.file_name}")
-            return await ingest_raw_document(project_id, raw, vector_store, embedder)
+            return _prepare_raw_document(project_id, raw)
 
         # Step 2: Chunk document with semantic chunking
         logger.info(f"Chunking {len(blocks)} blocks from {raw.file_name}")
@@ -245,18 +708,17 @@ async def ingest_raw_document_enhanced(
             file_path=str(file_path),
             blocks=blocks,
             chunk_size=settings.chunk_max_tokens,
-            chunk_overlap=settings.chunk_overlap_tokens
+            chunk_overlap=settings.chunk_overlap_tokens,
+            dedupe_blocks=settings.chunk_dedupe_blocks
         )
 
         if not enhanced_chunks:
             logger.warning(f"No chunks created from {raw.file_name}")
-            return {
-                "file_name": raw.file_name,
-                "num_chunks": 0,
-                "project_id": project_id,
-                "source_id": raw.source_id,
-                "error": "No chunks created",
-            }
+            return _PreparedDocument(
+                raw=raw,
+                summary=_error_summary(project_id, raw, "No chunks created"),
+                chunks=[],
+            )
 
         # Step 3: Generate chunk images (only for PDFs with visual grounding)
         image_paths = []
@@ -271,49 +733,76 @@ async def ingest_raw_document_enhanced(
         else:
             image_paths = [""] * len(enhanced_chunks)
 
-        # Step 4: Generate embeddings
-        logger.info(f"Generating embeddings for {len(enhanced_chunks)} chunks")
-        chunk_texts = [chunk.text for chunk in enhanced_chunks]
-        embeddings = embedder.embed_texts(chunk_texts)
+        # Step 4: Build summary
+        preview_text = _preview_text(block.text for block in blocks)
 
-        if len(embeddings) != len(enhanced_chunks):
-            raise ValueError(
-                f"Embedding count ({len(embeddings)}) doesn't match "
-                f"chunk count ({len(enhanced_chunks)})"
-            )
-
-        # Step 5: Store in Weaviate with visual grounding
-        logger.info(f"Storing {len(enhanced_chunks)} enhanced chunks in Weaviate")
-        vector_store.upsert_chunks_enhanced(
+        return _PreparedDocument(
+            raw=raw,
+            summary={
+                "file_name": raw.file_name,
+                "num_chunks": len(enhanced_chunks),
+                "project_id": project_id,
+                "source_id": raw.source_id,
+                "text_preview": preview_text,
+                "page_count": doc_metadata.get("page_count", 0),
+                "has_visual_grounding": use_visual_grounding and file_ext == 'pdf',
+                "tables_detected": sum(1 for c in enhanced_chunks if c.chunk_type == "table"),
+            },
             chunks=enhanced_chunks,
-            embeddings=embeddings,
-            image_paths=image_paths
+            image_paths=image_paths,
         )
 
-        # Step 6: Return summary
-        total_text = " ".join(block.text for block in blocks)
-        preview_text = total_text[:100] + "..." if len(total_text) > 100 else total_text
-
-        return {
-            "file_name": raw.file_name,
-            "num_chunks": len(enhanced_chunks),
-            "project_id": project_id,
-            "source_id": raw.source_id,
-            "text_preview": preview_text,
-            "page_count": doc_metadata.get("page_count", 0),
-            "has_visual_grounding": use_visual_grounding and file_ext == 'pdf',
-            "tables_detected": sum(1 for c in enhanced_chunks if c.chunk_type == "table"),
-        }
-
     except Exception as e:
         logger.error(f"Error ingesting {raw.file_name} with enhanced pipeline: {e}", exc_info=True)
-        return {
-            "file_name": raw.file_name,
-            "num_chunks": 0,
-            "project_id": project_id,
-            "source_id": raw.source_id,
-            "error": str(e),
-        }
+        return _PreparedDocument(
+            raw=raw,
+            summary=_error_summary(project_id, raw, str(e)),
+            chunks=[],
+        )
+
+
+async def ingest_raw_document_enhanced(
+    project_id: str,
+    raw: RawDocument,
+    vector_store: WeaviateVectorStore,
+    embedder: BaseEmbedder,
+    data_dir: Path,
+    use_visual_grounding: bool = True
+) -> dict[str, Any]:
+    """
+    Enhanced ingestion pipeline with visual grounding.
+
+    Steps:
+    1. Process document with layout awareness (PyMuPDF text blocks and find_tables)
+    2. Chunk with table awareness and overlap
+    3. Generate chunk images with bounding boxes
+    4. Generate embeddings
+    5. Store in Weaviate with visual metadata
+
+    Args:
+        project_id: Project identifier
+        raw: RawDocument instance
+        vector_store: WeaviateVectorStore instance
+        embedder: BaseEmbedder instance
+        data_dir: Base data directory for storing images
+        use_visual_grounding: Whether to generate chunk images
+
+    Returns:
+        Summary dictionary with ingestion results
+    """
+    try:
+        prepared = await asyncio.get_running_loop().run_in_executor(
+            get_process_pool(),
+            _prepare_raw_document_enhanced,
+            project_id,
+            raw,
+            data_dir,
+            use_visual_grounding,
+        )
+    except Exception as e:
+        prepared = _failed_document(project_id, raw, e)
+    await _embed_and_store(project_id, _in_order([prepared]), vector_store, embedder)
+    return prepared.summary
 
 
 async def ingest_multiple_files_enhanced(
@@ -327,6 +816,12 @@ async def ingest_multiple_files_enhanced(
     """
     Ingest multiple files with enhanced pipeline.
 
+    All files are processed and chunked first; their chunks are then
+    embedded together so the embedder receives full batches. Processing
+    runs in the shared process pool (PyMuPDF is not thread-safe, but each
+    worker process has its own context), up to ingest_concurrency files
+    at a time.
+
     Args:
         project_id: Project identifier
         raws: List of RawDocument instances
@@ -338,19 +833,29 @@ async def ingest_multiple_files_enhanced(
     Returns:
         List of summary dictionaries
     """
-    results = []
-
-    for raw in raws:
-        logger.info(f"Processing file with enhanced pipeline: {raw.file_name}")
-        result = await ingest_raw_document_enhanced(
-            project_id=project_id,
-            raw=raw,
-            vector_store=vector_store,
-            embedder=embedder,
-            data_dir=data_dir,
-            use_visual_grounding=use_visual_grounding
-        )
-        results.append(result)
-
-    return results
-
+    from app.config import get_settings
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    semaphore = asyncio.Semaphore(get_settings().ingest_concurrency)
+
+    async def prepare_one(raw: RawDocument) -> _PreparedDocument:
+        async with semaphore:
+            logger.info(f"Processing file with enhanced pipeline: {raw.file_name}")
+            try:
+                return await loop.run_in_executor(
+                    pool,
+                    _prepare_raw_document_enhanced,
+                    project_id,
+                    raw,
+                    data_dir,
+                    use_visual_grounding,
+                )
+            except Exception as e:
+                # Only this file fails; the others are still ingested
+                return _failed_document(project_id, raw, e)
+
+    tasks = [asyncio.ensure_future(prepare_one(raw)) for raw in raws]
+    await _embed_and_store(project_id, _as_completed(tasks), vector_store, embedder)
+
+    return [task.result().summary for task in tasks]
@@ -1,16 +1,59 @@
 """Text extraction from various file formats."""
 
 import csv
+import importlib.util
 import io
+import logging
 import re
 from typing import Any
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound, UnicodeDammit
+import fitz  # PyMuPDF
 import pdfplumber
 from docx import Document
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # Optional: CSV extraction falls back to the csv module
+    pa = pc = pacsv = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional: HTML extraction falls back to BeautifulSoup
+    LexborHTMLParser = None
+
+try:
+    from charset_normalizer import from_bytes as detect_charsets
+except ImportError:  # Optional: non-UTF-8 text is then read as Windows-1252
+    detect_charsets = None
+
 from app.ingestion.loaders import RawDocument
 from app.ingestion.file_types import FileType
 
+logger = logging.getLogger(__name__)
+
+_MULTI_NEWLINE = re.compile(r'\n{3,}')
+_MULTI_SPACE = re.compile(r' {2,}')
+
+# File types with no text extractor; callers should skip these before extraction
+UNSUPPORTED_FILE_TYPES = frozenset({FileType.IMAGE, FileType.UNKNOWN})
+
+# File types whose parsing costs more than reading a cached result back
+PARSED_FILE_TYPES = frozenset({FileType.HTML, FileType.PDF, FileType.DOCX})
+
+# Bytes examined when guessing the encoding of a non-UTF-8 text file
+_ENCODING_SNIFF_BYTES = 64 * 1024
+
+# BeautifulSoup tree builder; 'html.parser' (stdlib) if lxml is missing
+_HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+# HTML backend in use; the backends don't produce byte-identical text
+_HTML_BACKEND = 'selectolax' if LexborHTMLParser is not None else f'bs4-{_HTML_PARSER}'
+
+# Identifies the extraction code for caches; bump when extract_text output changes
+EXTRACTOR_VERSION = f"1-pymupdf-{fitz.VersionBind}-html-{_HTML_BACKEND}"
+
 
 def extract_text(raw: RawDocument) -> tuple[str, dict[str, Any]]:
     """
@@ -21,28 +64,27 @@ def extract_text(raw: RawDocument) -> tuple[str, dict[str, Any]]:
     
     Returns:
         Tuple of (extracted_text, extra_metadata)
+    
+    Raises:
+        ValueError: If the file type has no extractor (see UNSUPPORTED_FILE_TYPES)
     """
     file_type = raw.file_type
     extra_metadata: dict[str, Any] = {}
     
     if file_type == FileType.HTML:
-        text, metadata = _extract_html(raw.bytes)
+        text, metadata = _extract_html(raw.read_bytes())
         extra_metadata.update(metadata)
     elif file_type == FileType.PDF:
-        text, metadata = _extract_pdf(raw.bytes)
+        text, metadata = _extract_pdf(raw.read_bytes())
         extra_metadata.update(metadata)
     elif file_type == FileType.DOCX:
-        text = _extract_docx(raw.bytes)
+        text = _extract_docx(raw.read_bytes())
     elif file_type in (FileType.TXT, FileType.MARKDOWN):
-        text = _extract_text_file(raw.bytes)
+        text = _extract_text_file(raw.read_bytes())
     elif file_type == FileType.CSV:
-        text = _extract_csv(raw.bytes)
-    elif file_type == FileType.IMAGE:
-        text = f"IMAGE: {raw.file_name} (no OCR yet)"
-        extra_metadata["ocr_note"] = "OCR not implemented yet"
+        text = _extract_csv(raw.read_bytes())
     else:
-        text = f"UNKNOWN FILE TYPE: {raw.file_name}"
-        extra_metadata["error"] = f"Unsupported file type: {file_type}"
+        raise ValueError(f"Unsupported file type: {file_type.value}")
     
     # Normalize whitespace
     text = _normalize_whitespace(text)
@@ -55,11 +97,16 @@ def _extract_html(content: bytes) -> tuple[str, dict[str, Any]]:
     Extract text from HTML content.
     
     Removes script/style tags, extracts text, and includes image alt text.
+    Uses selectolax's lexbor parser (C) when it is installed, otherwise
+    BeautifulSoup.
     """
-    soup = BeautifulSoup(content, 'html.parser')
+    if LexborHTMLParser is not None:
+        return _extract_html_lexbor(content)
+    
+    soup = _parse_html(content)
     
     # Remove script, style, and noscript tags
-    for tag in soup(['script', 'style', 'noscript']):
+    for tag in soup.select('script, style, noscript'):
         tag.decompose()
     
     # Extract text
@@ -85,12 +132,101 @@ def _extract_html(content: bytes) -> tuple[str, dict[str, Any]]:
     return text, metadata
 
 
+def _extract_html_lexbor(content: bytes) -> tuple[str, dict[str, Any]]:
+    """
+    Extract text from HTML content with selectolax's lexbor parser.
+    
+    Produces the same text as the BeautifulSoup path: text nodes joined
+    with newlines, followed by one "Image: ..." line per image.
+    """
+    tree = LexborHTMLParser(_decode_html(content))
+    
+    # Remove script, style, and noscript tags
+    for tag in tree.css('script, style, noscript'):
+        tag.decompose()
+    
+    # Extract text
+    text = tree.root.text(separator="\n") if tree.root is not None else ""
+    
+    # Extract image information
+    images = []
+    for img in tree.css('img'):
+        alt = img.attributes.get('alt') or ''
+        src = img.attributes.get('src') or ''
+        filename = src.split('/')[-1] if src else 'unknown'
+        image_text = alt if alt else filename
+        images.append(f"Image: {image_text}")
+    
+    # Append image information to text
+    if images:
+        text += "\n\n" + "\n".join(images)
+    
+    metadata = {
+        "image_count": len(images),
+    }
+    
+    return text, metadata
+
+
+def _decode_html(content: bytes) -> str:
+    """Decode HTML as UTF-8, or sniff the encoding (meta charset etc.) if that fails."""
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).unicode_markup
+
+
+def _parse_html(content: bytes) -> BeautifulSoup:
+    """Parse HTML with lxml (libxml2), falling back to the stdlib parser."""
+    global _HTML_PARSER
+    
+    try:
+        return BeautifulSoup(content, _HTML_PARSER)
+    except FeatureNotFound:
+        logger.warning("lxml is not installed, using html.parser for HTML extraction")
+        _HTML_PARSER = 'html.parser'
+        return BeautifulSoup(content, _HTML_PARSER)
+
+
 def _extract_pdf(content: bytes) -> tuple[str, dict[str, Any]]:
     """
     Extract text from PDF content.
     
-    Extracts page by page with page separators.
+    Extracts page by page with page separators. Uses PyMuPDF and falls
+    back to pdfplumber if PyMuPDF cannot read the file.
     """
+    try:
+        return _extract_pdf_pymupdf(content)
+    except Exception as e:
+        logger.warning(f"PyMuPDF failed to extract PDF, falling back to pdfplumber: {e}")
+        return _extract_pdf_pdfplumber(content)
+
+
+def _extract_pdf_pymupdf(content: bytes) -> tuple[str, dict[str, Any]]:
+    """Extract text from PDF content with PyMuPDF."""
+    pages_text = []
+    
+    doc = fitz.open(stream=content, filetype="pdf")
+    try:
+        page_count = doc.page_count
+        for i, page in enumerate(doc, 1):
+            page_text = page.get_text("text").strip()
+            if page_text:
+                pages_text.append(f"\n\n--- Page {i} ---\n\n{page_text}")
+    finally:
+        doc.close()
+    
+    text = "".join(pages_text)
+    
+    metadata = {
+        "page_count": page_count,
+    }
+    
+    return text, metadata
+
+
+def _extract_pdf_pdfplumber(content: bytes) -> tuple[str, dict[str, Any]]:
+    """Extract text from PDF content with pdfplumber."""
     pages_text = []
     page_count = 0
     
@@ -125,13 +261,35 @@ def _extract_text_file(content: bytes) -> str:
     """
     Extract text from plain text or markdown file.
     
-    Decodes as UTF-8 with error handling.
+    Decodes as UTF-8, or in the detected encoding if that fails.
+    """
+    return _decode_text(content)
+
+
+def _decode_text(content: bytes) -> str:
+    """
+    Decode text of unknown encoding.
+    
+    UTF-8 is tried first, since nearly every file is. Otherwise the encoding
+    is detected from the first 64 KiB with charset-normalizer. Detection
+    can't reliably tell the Western European code pages apart, so
+    Windows-1252 (a superset of latin-1's printable range) wins whenever
+    it is among the plausible candidates.
     """
     try:
         return content.decode('utf-8')
     except UnicodeDecodeError:
-        # Fallback to latin-1 or ignore errors
-        return content.decode('utf-8', errors='ignore')
+        pass
+    
+    encoding = 'cp1252'
+    if detect_charsets is not None:
+        matches = detect_charsets(content[:_ENCODING_SNIFF_BYTES])
+        best = matches.best()
+        if best is not None and not any('cp1252' in m.could_be_from_charset for m in matches):
+            encoding = best.encoding
+    
+    # The guess is from a prefix; undecodable bytes later on are replaced
+    return content.decode(encoding, errors='replace')
 
 
 def _extract_csv(content: bytes) -> str:
@@ -139,11 +297,16 @@ def _extract_csv(content: bytes) -> str:
     Extract text from CSV content.
     
     Converts CSV to plain text format: header row followed by data rows.
+    Uses pyarrow's vectorized CSV reader when it is installed and the file
+    is rectangular, otherwise the csv module.
     """
-    try:
-        text_content = content.decode('utf-8')
-    except UnicodeDecodeError:
-        text_content = content.decode('utf-8', errors='ignore')
+    if pacsv is not None:
+        try:
+            return _extract_csv_pyarrow(content)
+        except (pa.ArrowInvalid, UnicodeDecodeError):
+            pass
+    
+    text_content = _decode_text(content)
     
     csv_reader = csv.reader(io.StringIO(text_content))
     rows = []
@@ -154,6 +317,39 @@ def _extract_csv(content: bytes) -> str:
     return "\n".join(rows)
 
 
+def _extract_csv_pyarrow(content: bytes) -> str:
+    """
+    Extract text from CSV content with pyarrow.
+    
+    Every column is read as a string (the header included, as a data row)
+    so values are reproduced exactly, then rows are joined column-wise in C.
+    
+    Raises:
+        pa.ArrowInvalid: If the CSV is ragged or otherwise unparseable
+    """
+    # Slice only the header line; split() would also copy the rest of the file
+    header_end = content.find(b"\n")
+    first_line = (content if header_end < 0 else content[:header_end]).decode('utf-8')
+    num_columns = len(next(csv.reader([first_line]), []))
+    if num_columns == 0:
+        return ""
+    
+    column_names = [f"c{i}" for i in range(num_columns)]
+    table = pacsv.read_csv(
+        pa.py_buffer(content),
+        read_options=pacsv.ReadOptions(column_names=column_names),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in column_names},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    
+    rows = pc.binary_join_element_wise(*table.columns, ", ")
+    return "\n".join(rows.to_pylist())
+
+
 def _normalize_whitespace(text: str) -> str:
     """
     Normalize whitespace in extracted text.
@@ -161,21 +357,20 @@ def _normalize_whitespace(text: str) -> str:
     - Removes excessive blank lines (more than 2 consecutive newlines)
     - Strips leading/trailing whitespace from each line
     - Normalizes spaces
+    
+    The newline and space steps are single compiled-regex sweeps. Lines are
+    stripped with str.strip, which runs in C per line and is about twice
+    as fast on large files as a regex matching whitespace around every
+    newline.
     """
     # Replace multiple consecutive newlines (3+) with double newline
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _MULTI_NEWLINE.sub('\n\n', text)
     
-    # Strip each line and remove empty lines at start/end
-    lines = [line.strip() for line in text.split('\n')]
-    
-    # Remove leading and trailing empty lines
-    while lines and not lines[0]:
-        lines.pop(0)
-    while lines and not lines[-1]:
-        lines.pop()
+    # Strip each line
+    text = '\n'.join([line.strip() for line in text.split('\n')])
     
     # Normalize spaces (multiple spaces to single space)
-    normalized_lines = [re.sub(r' +', ' ', line) for line in lines]
+    text = _MULTI_SPACE.sub(' ', text)
     
-    return '\n'.join(normalized_lines)
-
+    # Remove leading and trailing empty lines (and the ends of the first/last line)
+    return text.strip()
@@ -1,16 +1,389 @@
 """Weaviate vector store integration."""
 
-import json
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    TypedDict,
+    Union,
+)
+import numpy as np
+import orjson
 import weaviate
-from weaviate.classes.config import Property, DataType
-from weaviate.classes.query import Filter
+from weaviate.classes.config import Configure, DataType, Property, Reconfigure
+from weaviate.classes.data import DataObject
+from weaviate.config import AdditionalConfig, ConnectionConfig
+from weaviate.classes.query import Filter, MetadataQuery
 
+from app.ingestion.chunker import EnhancedDocumentChunk
 from app.models import DocumentChunk
 
 logger = logging.getLogger(__name__)
 
+# Embeddings arrive either as float lists or as one (chunks, dims) array
+Embeddings = Union[Sequence[Sequence[float]], np.ndarray]
+
+class SearchResult(TypedDict):
+    """A chunk returned by search_with_visual_grounding."""
+
+    id: str
+    text: str
+    fileName: str
+    chunkType: str
+    pageNumber: int
+    boundingBox: Optional[list[float]]
+    imagePath: str
+    confidence: float
+    sourceId: str
+    projectId: str
+    chunkIndex: int
+    score: float
+
+
+# HNSW vector compression: product, binary or scalar quantization
+Quantization = Literal["none", "pq", "bq", "sq"]
+
+
+_NAMESPACE_URL_BYTES = uuid.NAMESPACE_URL.bytes
+
+# Objects per batch request (one gRPC BatchObjects call each)
+UPSERT_BATCH_SIZE = 100
+
+# Project of the throwaway object written by awarmup()
+WARMUP_PROJECT_ID = "__warmup__"
+
+# Progress is logged once per this many batches
+BATCH_LOG_INTERVAL = 10
+
+# Minimum REST connection pool of each client (kept alive / total)
+WEAVIATE_POOL_CONNECTIONS = 16
+WEAVIATE_POOL_MAXSIZE = 64
+
+
+def _to_vector(embedding: Union[Sequence[float], np.ndarray]) -> list[float]:
+    """Convert one embedding row to the float list sent to Weaviate."""
+    if isinstance(embedding, np.ndarray):
+        return embedding.astype(np.float32).tolist()
+    return embedding
+
+
+def _uuid5_str(name: str) -> str:
+    """
+    Compute str(uuid.uuid5(uuid.NAMESPACE_URL, name)) without the UUID object.
+
+    Same SHA-1 digest and version/variant bits as uuid5, formatted directly
+    from the hex digest.
+    """
+    h = bytearray(hashlib.sha1(_NAMESPACE_URL_BYTES + name.encode("utf-8")).digest()[:16])
+    h[6] = (h[6] & 0x0F) | 0x50  # version 5
+    h[8] = (h[8] & 0x3F) | 0x80  # RFC 4122 variant
+    x = h.hex()
+    return f"{x[:8]}-{x[8:12]}-{x[12:16]}-{x[16:20]}-{x[20:]}"
+
+
+def _chunk_uuid(project_id: str, source_id: str, chunk_index: int) -> str:
+    """Deterministic UUID per chunk for idempotent upserts."""
+    return _uuid5_str(f"{project_id}_{source_id}_{chunk_index}")
+
+
+def _dump_metadata(metadata: Mapping[str, Any]) -> str:
+    """Serialize chunk metadata to the metadataJson property."""
+    # orjson only serializes real dicts (not ChainMap); non-str keys are
+    # stringified like json.dumps does
+    return orjson.dumps(dict(metadata), option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _chunk_properties(chunk: DocumentChunk) -> dict[str, Any]:
+    """Build the Weaviate properties of a DocumentChunk."""
+    return {
+        "projectId": chunk.project_id,
+        "sourceId": chunk.source_id,
+        "sourceType": chunk.source_type,
+        "fileName": chunk.file_name,
+        "filePath": chunk.file_path or "",
+        "chunkIndex": chunk.chunk_index,
+        "text": chunk.text,
+        "metadataJson": _dump_metadata(chunk.metadata),
+    }
+
+
+def _enhanced_chunk_properties(chunk: EnhancedDocumentChunk, image_path: str) -> dict[str, Any]:
+    """Build the Weaviate properties of an EnhancedDocumentChunk."""
+    file_name = chunk.file_name
+
+    return {
+        # Original fields
+        "projectId": chunk.project_id,
+        "sourceId": chunk.document_id,
+        "sourceType": file_name.rpartition('.')[2] if file_name else '',
+        "fileName": file_name,
+        "filePath": chunk.file_path or "",
+        "chunkIndex": chunk.chunk_index,
+        "text": chunk.text,
+        "metadataJson": _dump_metadata(chunk.metadata),
+        # Visual grounding fields
+        "chunkType": chunk.chunk_type,
+        "pageNumber": chunk.page_number,
+        "boundingBox": chunk.bounding_box,
+        "imagePath": image_path,
+        "confidence": chunk.confidence,
+    }
+
+
+def _check_lengths(chunks: Sequence[Any], embeddings: Embeddings) -> None:
+    """Raise ValueError unless there is exactly one embedding per chunk."""
+    if len(chunks) != len(embeddings):
+        raise ValueError(
+            f"Chunks ({len(chunks)}) and embeddings ({len(embeddings)}) "
+            "must have the same length"
+        )
+
+
+def _build_objects(
+    chunks: Sequence[Union[DocumentChunk, EnhancedDocumentChunk]],
+    embeddings: Embeddings,
+    enhanced: bool,
+    image_paths: Optional[list[str]] = None,
+) -> list[DataObject]:
+    """
+    Build the Weaviate objects for chunks and their embeddings.
+
+    Args:
+        chunks: DocumentChunks, or EnhancedDocumentChunks when enhanced is set
+        embeddings: Embedding vectors (one per chunk), as lists or an array
+        enhanced: Whether to store the visual grounding properties
+        image_paths: Image paths (one per chunk) for enhanced chunks
+
+    Returns:
+        One DataObject per chunk with a deterministic UUID
+
+    Raises:
+        ValueError: If chunks and embeddings lengths don't match
+    """
+    _check_lengths(chunks, embeddings)
+
+    if enhanced:
+        # Default image paths if not provided
+        if image_paths is None:
+            image_paths = [""] * len(chunks)
+        all_properties = [
+            _enhanced_chunk_properties(chunk, img_path)
+            for chunk, img_path in zip(chunks, image_paths)
+        ]
+    else:
+        all_properties = [_chunk_properties(chunk) for chunk in chunks]
+
+    return [
+        DataObject(
+            properties=properties,
+            vector=_to_vector(embedding),
+            uuid=_chunk_uuid(
+                properties["projectId"], properties["sourceId"], properties["chunkIndex"]
+            ),
+        )
+        for properties, embedding in zip(all_properties, embeddings)
+    ]
+
+
+# Queued by WeaviateBatcher.close() to stop its worker after the objects ahead of it
+_STOP = object()
+
+
+def _fail_futures(items: list[tuple[Any, asyncio.Future]], message: str) -> None:
+    """Fail the futures of queued items that have no result yet."""
+    for _, future in items:
+        if not future.done():
+            future.set_exception(RuntimeError(message))
+
+
+class WeaviateBatcher:
+    """
+    Coalesces async upserts from concurrent ingests into shared batches.
+
+    Callers enqueue objects and wait for them to be stored. A background
+    task collects queued objects until it has batch_size of them or
+    max_wait_ms has passed since the first one, then sends them in one
+    insert_many request, with up to max_concurrency requests in flight.
+    """
+
+    def __init__(
+        self,
+        insert_many: Callable[[list[DataObject]], Awaitable[Any]],
+        batch_size: int = UPSERT_BATCH_SIZE,
+        max_wait_ms: float = 50,
+        max_concurrency: int = 8,
+    ):
+        """
+        Initialize the batcher; the background task starts on first use.
+
+        Args:
+            insert_many: Coroutine function storing one batch (collection.data.insert_many)
+            batch_size: Maximum objects per insert_many request
+            max_wait_ms: Longest time a queued object waits for its batch to fill
+            max_concurrency: insert_many requests in flight at once
+        """
+        self.insert_many = insert_many
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flushes: set[asyncio.Task] = set()
+        self._batches_sent = 0
+        self._objects_sent = 0
+
+    async def insert(self, objects: list[DataObject]) -> None:
+        """
+        Queue objects and wait until all of them are stored.
+
+        Args:
+            objects: Weaviate objects to insert
+
+        Raises:
+            RuntimeError: If Weaviate rejected any of the objects
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.create_task(self._run())
+
+        futures = []
+        for obj in objects:
+            future = loop.create_future()
+            self._queue.put_nowait((obj, future))
+            futures.append(future)
+
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if errors:
+            raise RuntimeError(
+                f"Weaviate rejected {len(errors)}/{len(objects)} objects: {errors[0]}"
+            )
+
+    async def _run(self) -> None:
+        """
+        Collect queued objects into batches and flush them.
+
+        Returns after the _STOP sentinel, once every object queued before it
+        has been handed to a flush, including a partly filled batch.
+        """
+        loop = asyncio.get_running_loop()
+        batch: list[tuple[DataObject, asyncio.Future]] = []
+        stopping = False
+
+        try:
+            while not stopping:
+                item = await self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.batch_size:
+                    if not self._queue.empty():
+                        item = self._queue.get_nowait()
+                    else:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                await self._semaphore.acquire()
+                flush = asyncio.create_task(self._flush(batch))
+                self._flushes.add(flush)
+                flush.add_done_callback(self._flushes.discard)
+                batch = []
+        except asyncio.CancelledError:
+            _fail_futures(batch, "WeaviateBatcher was cancelled before the object was sent")
+            raise
+
+    async def _flush(self, batch: list[tuple[DataObject, asyncio.Future]]) -> None:
+        """Send one batch and resolve its callers' futures."""
+        try:
+            result = await self.insert_many([obj for obj, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._semaphore.release()
+
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            error = result.errors.get(i)
+            if error is not None:
+                future.set_exception(RuntimeError(error.message))
+            else:
+                future.set_result(None)
+
+        self._batches_sent += 1
+        self._objects_sent += len(batch)
+        if self._batches_sent % BATCH_LOG_INTERVAL == 0:
+            logger.info(
+                "Inserted %d batches (%d chunks) into Weaviate",
+                self._batches_sent, self._objects_sent,
+            )
+
+    async def close(self) -> None:
+        """
+        Stop the background task once queued objects are sent.
+
+        The worker gets a sentinel rather than being cancelled, so it flushes
+        a partly filled batch and everything queued before the sentinel.
+        Objects it can't send (e.g. its event loop is gone) fail instead of
+        leaving their callers waiting.
+        """
+        worker, self._worker = self._worker, None
+        queue = self._queue
+        if worker is not None:
+            if not worker.done() and worker.get_loop() is asyncio.get_running_loop():
+                queue.put_nowait(_STOP)
+                await asyncio.gather(worker, return_exceptions=True)
+            else:
+                worker.cancel()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        while queue is not None and not queue.empty():
+            item = queue.get_nowait()
+            if item is not _STOP:
+                _fail_futures([item], "WeaviateBatcher was closed before the object was sent")
+
+
+@dataclass
+class _SharedClient:
+    """A connected sync client and the number of stores using it."""
+
+    client: weaviate.WeaviateClient
+    use_cloud: bool
+    refs: int = 1
+
+
+# Sync clients by (URL, API key digest), shared across store instances
+_CLIENT_CACHE: dict[tuple[str, str], _SharedClient] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
 
 class WeaviateVectorStore:
     """Weaviate client wrapper for storing document chunks."""
@@ -20,16 +393,40 @@ class WeaviateVectorStore:
         weaviate_url: str,
         weaviate_api_key: Optional[str] = None,
         class_name: str = "IngestedChunk",
+        upsert_concurrency: int = 8,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        quantization: Quantization = "none",
+        batch_max_wait_ms: float = 50,
     ):
         """
-        Initialize Weaviate client using HTTP only (gRPC checks are skipped).
+        Initialize the Weaviate client (REST for schema, gRPC for data).
+        
+        The async client used by aupsert_chunks is connected lazily, on the
+        event loop that first needs it.
         
         Args:
             weaviate_url: HTTP URL of the Weaviate instance (e.g., https://...)
             weaviate_api_key: Optional API key for authentication
             class_name: Name of the Weaviate class/collection to use
+            upsert_concurrency: Batch requests in flight at once during upserts
+            upsert_batch_size: Objects per batch request
+            quantization: Vector compression for the HNSW index of a new class
+            batch_max_wait_ms: How long async upserts wait to share a batch with
+                concurrent ingests
         """
         self.class_name = class_name
+        self.weaviate_url = weaviate_url
+        self.upsert_concurrency = upsert_concurrency
+        self.upsert_batch_size = upsert_batch_size
+        self.quantization = quantization
+        self.batch_max_wait_ms = batch_max_wait_ms
+        self.aclient: Optional[weaviate.WeaviateAsyncClient] = None
+        self._aclient_lock = asyncio.Lock()
+        self._batcher: Optional[WeaviateBatcher] = None
+        
+        # Collection handles, looked up once per client
+        self._collection = None
+        self._acollection = None
         
         # Parse HTTP URL
         from urllib.parse import urlparse
@@ -45,70 +442,79 @@ class WeaviateVectorStore:
         if weaviate_api_key:
             auth_config = weaviate.auth.AuthApiKey(api_key=weaviate_api_key)
         
-        # Import additional config for skipping gRPC checks
-        import weaviate.classes.init as wvc_init
-        from weaviate.exceptions import WeaviateGRPCUnavailableError
-        
         # Check if this is a Weaviate Cloud instance (has .weaviate.cloud in URL)
         is_cloud = ".weaviate.cloud" in weaviate_url.lower()
         
-        # For Weaviate Cloud, try using connect_to_weaviate_cloud() which handles gRPC better
-        if is_cloud and auth_config:
+        # For Weaviate Cloud, gRPC uses port 443 (secure), for local use 50051
+        grpc_port = 443 if (is_cloud and http_secure) else 50051
+        
+        # One keep-alive REST pool per client, with room for every concurrent
+        # batch request plus query traffic (gRPC multiplexes a single channel)
+        self._additional_config = AdditionalConfig(
+            connection=ConnectionConfig(
+                session_pool_connections=max(WEAVIATE_POOL_CONNECTIONS, upsert_concurrency),
+                session_pool_maxsize=max(WEAVIATE_POOL_MAXSIZE, 2 * upsert_concurrency),
+            )
+        )
+        
+        # Kept for connecting the async client with the same settings
+        self._auth_config = auth_config
+        self._use_cloud = is_cloud and auth_config is not None
+        self._custom_connection = {
+            "http_host": http_host,
+            "http_port": http_port,
+            "http_secure": http_secure,
+            "grpc_host": http_host,
+            "grpc_port": grpc_port,
+            "grpc_secure": http_secure,
+            "auth_credentials": auth_config,
+            "additional_config": self._additional_config,
+        }
+        
+        # Reuse a connected client for the same instance and credentials
+        key_digest = (
+            hashlib.blake2b(weaviate_api_key.encode("utf-8"), digest_size=16).hexdigest()
+            if weaviate_api_key else ""
+        )
+        self._client_key = (weaviate_url, key_digest)
+        
+        with _CLIENT_CACHE_LOCK:
+            shared = _CLIENT_CACHE.get(self._client_key)
+            if shared is not None and shared.client.is_connected():
+                shared.refs += 1
+                self.client = shared.client
+                self._use_cloud = shared.use_cloud
+                logger.info(f"Reusing connected Weaviate client for {weaviate_url}")
+                return
+            
+            self.client = self._connect()
+            _CLIENT_CACHE[self._client_key] = _SharedClient(self.client, self._use_cloud)
+    
+    def _connect(self) -> weaviate.WeaviateClient:
+        """Connect a new sync client, preferring the Weaviate Cloud helper."""
+        # Init checks stay on: they verify the gRPC channel used for batch inserts
+        # and queries, so a misconfigured gRPC port fails at startup
+        if self._use_cloud:
             try:
-                # Use connect_to_weaviate_cloud for cloud instances with skip_init_checks
                 logger.info("Connecting to Weaviate Cloud...")
-                self.client = weaviate.connect_to_weaviate_cloud(
-                    cluster_url=weaviate_url,
-                    auth_credentials=auth_config,
-                    skip_init_checks=True,  # Pass directly as parameter
+                client = weaviate.connect_to_weaviate_cloud(
+                    cluster_url=self.weaviate_url,
+                    auth_credentials=self._auth_config,
+                    additional_config=self._additional_config,
                 )
-                logger.info("Successfully connected to Weaviate Cloud (HTTP-only mode)")
-                return
+                logger.info("Successfully connected to Weaviate Cloud (HTTP + gRPC)")
+                return client
             except Exception as e:
                 logger.warning(f"connect_to_weaviate_cloud failed: {e}, falling back to connect_to_custom")
+                self._use_cloud = False
         
         # Fallback to connect_to_custom for local or if cloud method fails
-        # For Weaviate Cloud, gRPC uses port 443 (secure), for local use 50051
-        grpc_port = 443 if (is_cloud and http_secure) else 50051
-        
-        # Weaviate v4+ API requires gRPC parameters, but we skip gRPC checks
-        # Use skip_init_checks=True to bypass gRPC health check
-        additional_config = wvc_init.AdditionalConfig(
-            skip_init_checks=True  # Skip gRPC health check - use HTTP only
+        client = weaviate.connect_to_custom(**self._custom_connection)
+        logger.info(
+            f"Connected to Weaviate at {self._custom_connection['http_host']}:"
+            f"{self._custom_connection['http_port']} (gRPC port {self._custom_connection['grpc_port']})"
         )
-        
-        # Create connection - catch gRPC errors since we only need HTTP
-        try:
-            if auth_config:
-                self.client = weaviate.connect_to_custom(
-                    http_host=http_host,
-                    http_port=http_port,
-                    http_secure=http_secure,
-                    grpc_host=http_host,
-                    grpc_port=grpc_port,
-                    grpc_secure=http_secure,
-                    auth_credentials=auth_config,
-                    additional_config=additional_config,
-                )
-            else:
-                self.client = weaviate.connect_to_custom(
-                    http_host=http_host,
-                    http_port=http_port,
-                    http_secure=http_secure,
-                    grpc_host=http_host,
-                    grpc_port=grpc_port,
-                    grpc_secure=http_secure,
-                    additional_config=additional_config,
-                )
-        except WeaviateGRPCUnavailableError as e:
-            # gRPC check failed - this is expected when using HTTP-only
-            # Log warning but the error will propagate - HTTP should still work
-            logger.warning(
-                f"gRPC health check failed (this is expected for HTTP-only mode): {e}"
-            )
-            logger.info("Note: HTTP connection is working, but gRPC check failed")
-            # Re-raise - the application startup will fail, but this indicates a config issue
-            raise
+        return client
     
     def ensure_schema(self) -> None:
         """
@@ -139,75 +545,70 @@ class WeaviateVectorStore:
                     Property(name="imagePath", data_type=DataType.TEXT),  # Path to cropped chunk image
                     Property(name="confidence", data_type=DataType.NUMBER),  # Extraction confidence
                 ],
+                vector_index_config=self._vector_index_config(),
             )
             logger.info(f"Created Weaviate class with visual grounding: {self.class_name}")
         else:
             logger.info(f"Weaviate class {self.class_name} already exists")
+
+        self._collection = self.client.collections.get(self.class_name)
+
+    def _vector_index_config(self):
+        """HNSW index config for a new class, or None for the uncompressed default."""
+        if self.quantization == "none":
+            return None
+        quantizer = getattr(Configure.VectorIndex.Quantizer, self.quantization)()
+        return Configure.VectorIndex.hnsw(quantizer=quantizer)
+
+    def reconfigure_quantization(self) -> None:
+        """
+        Enable the configured quantization on an existing class.
+
+        Weaviate compresses the vectors already stored in the background
+        (PQ and SQ first train on them). Compression can't be turned off
+        again once enabled.
+
+        Raises:
+            ValueError: If quantization is "none"
+        """
+        if self.quantization == "none":
+            raise ValueError("No quantization configured to enable")
+
+        quantizer = getattr(Reconfigure.VectorIndex.Quantizer, self.quantization)()
+        self._get_collection().config.update(
+            vector_index_config=Reconfigure.VectorIndex.hnsw(quantizer=quantizer)
+        )
+        logger.info(f"Enabled {self.quantization} quantization on {self.class_name}")
+
+    def _get_collection(self):
+        """Return the cached collection handle, looking it up on first use."""
+        if self._collection is None:
+            self._collection = self.client.collections.get(self.class_name)
+        return self._collection
     
     def upsert_chunks(
         self,
         chunks: list[DocumentChunk],
-        embeddings: list[list[float]],
+        embeddings: Embeddings,
     ) -> None:
         """
         Upsert document chunks with their embeddings into Weaviate.
         
         Args:
             chunks: List of DocumentChunk instances
-            embeddings: List of embedding vectors (one per chunk)
+            embeddings: Embedding vectors (one per chunk), as lists or an array
         
         Raises:
             ValueError: If chunks and embeddings lengths don't match
+            RuntimeError: If Weaviate rejected any chunk
         """
-        if len(chunks) != len(embeddings):
-            raise ValueError(
-                f"Chunks ({len(chunks)}) and embeddings ({len(embeddings)}) "
-                "must have the same length"
-            )
-        
-        import uuid
-        collection = self.client.collections.get(self.class_name)
-        
-        # Insert chunks with embeddings using v4 batch API
-        # Use batch context manager for efficient insertion
-        batch_size = 100
-        for i in range(0, len(chunks), batch_size):
-            batch_chunks = chunks[i:i + batch_size]
-            batch_embeddings = embeddings[i:i + batch_size]
-            
-            # Use batch context manager for efficient batch insertion
-            with collection.batch.dynamic() as batch:
-                for chunk, embedding in zip(batch_chunks, batch_embeddings):
-                    # Deterministic UUID per chunk for idempotent upserts
-                    chunk_id_str = f"{chunk.project_id}_{chunk.source_id}_{chunk.chunk_index}"
-                    chunk_uuid = uuid.uuid5(uuid.NAMESPACE_URL, chunk_id_str)
-                    
-                    properties = {
-                        "projectId": chunk.project_id,
-                        "sourceId": chunk.source_id,
-                        "sourceType": chunk.source_type,
-                        "fileName": chunk.file_name,
-                        "filePath": chunk.file_path or "",
-                        "chunkIndex": chunk.chunk_index,
-                        "text": chunk.text,
-                        "metadataJson": json.dumps(chunk.metadata),
-                    }
-                    
-                    # v4 batch API: use add_object (batch.add is not available)
-                    batch.add_object(
-                        properties=properties,
-                        vector=embedding,
-                        uuid=str(chunk_uuid),
-                    )
-            
-            logger.info(f"Inserted batch of {len(batch_chunks)} chunks")
-        
+        self._insert_objects(_build_objects(chunks, embeddings, enhanced=False))
         logger.info(f"Successfully upserted {len(chunks)} chunks to Weaviate")
     
     def upsert_chunks_enhanced(
         self,
-        chunks: list,  # List of EnhancedDocumentChunk or similar
-        embeddings: list[list[float]],
+        chunks: list[EnhancedDocumentChunk],
+        embeddings: Embeddings,
         image_paths: list[str] = None,
     ) -> None:
         """
@@ -215,91 +616,172 @@ class WeaviateVectorStore:
 
         Args:
             chunks: List of EnhancedDocumentChunk instances
-            embeddings: List of embedding vectors (one per chunk)
+            embeddings: Embedding vectors (one per chunk), as lists or an array
             image_paths: Optional list of image paths (one per chunk)
 
         Raises:
             ValueError: If chunks and embeddings lengths don't match
+            RuntimeError: If Weaviate rejected any chunk
+        """
+        self._insert_objects(_build_objects(chunks, embeddings, enhanced=True, image_paths=image_paths))
+        logger.info(f"Successfully upserted {len(chunks)} enhanced chunks to Weaviate")
+
+    async def aupsert_chunks(
+        self,
+        chunks: list[DocumentChunk],
+        embeddings: Embeddings,
+    ) -> None:
+        """
+        Async variant of upsert_chunks using the async Weaviate client.
+        
+        Args:
+            chunks: List of DocumentChunk instances
+            embeddings: Embedding vectors (one per chunk), as lists or an array
+        
+        Raises:
+            ValueError: If chunks and embeddings lengths don't match
+            RuntimeError: If Weaviate rejected any chunk
         """
-        if len(chunks) != len(embeddings):
-            raise ValueError(
-                f"Chunks ({len(chunks)}) and embeddings ({len(embeddings)}) "
-                "must have the same length"
+        await self._ainsert_objects(_build_objects(chunks, embeddings, enhanced=False))
+        logger.info(f"Successfully upserted {len(chunks)} chunks to Weaviate")
+
+    async def aupsert_chunks_enhanced(
+        self,
+        chunks: list[EnhancedDocumentChunk],
+        embeddings: Embeddings,
+        image_paths: list[str] = None,
+    ) -> None:
+        """
+        Async variant of upsert_chunks_enhanced using the async Weaviate client.
+
+        Args:
+            chunks: List of EnhancedDocumentChunk instances
+            embeddings: Embedding vectors (one per chunk), as lists or an array
+            image_paths: Optional list of image paths (one per chunk)
+
+        Raises:
+            ValueError: If chunks and embeddings lengths don't match
+            RuntimeError: If Weaviate rejected any chunk
+        """
+        await self._ainsert_objects(
+            _build_objects(chunks, embeddings, enhanced=True, image_paths=image_paths)
+        )
+        logger.info(f"Successfully upserted {len(chunks)} enhanced chunks to Weaviate")
+
+    def _insert_objects(self, objects: list[DataObject]) -> None:
+        """
+        Insert objects with fixed-size batching.
+
+        The client's batch context manager flushes every upsert_batch_size
+        objects and keeps up to upsert_concurrency requests in flight from
+        its own worker threads.
+
+        Raises:
+            RuntimeError: If Weaviate rejected any object
+        """
+        collection = self._get_collection()
+
+        with collection.batch.fixed_size(
+            batch_size=self.upsert_batch_size,
+            concurrent_requests=self.upsert_concurrency,
+        ) as batch:
+            for obj in objects:
+                batch.add_object(properties=obj.properties, vector=obj.vector, uuid=obj.uuid)
+
+        failed = collection.batch.failed_objects
+        if failed:
+            raise RuntimeError(
+                f"Weaviate rejected {len(failed)}/{len(objects)} objects: {failed[0].message}"
             )
 
-        # Default image paths if not provided
-        if image_paths is None:
-            image_paths = [""] * len(chunks)
+    async def _ainsert_objects(self, objects: list[DataObject]) -> None:
+        """Insert objects through the shared batcher of the async client."""
+        collection = await self._get_async_collection()
 
-        import uuid
-        collection = self.client.collections.get(self.class_name)
-
-        # Insert chunks with embeddings using v4 batch API
-        batch_size = 100
-        for i in range(0, len(chunks), batch_size):
-            batch_chunks = chunks[i:i + batch_size]
-            batch_embeddings = embeddings[i:i + batch_size]
-            batch_image_paths = image_paths[i:i + batch_size]
-
-            # Use batch context manager for efficient batch insertion
-            with collection.batch.dynamic() as batch:
-                for chunk, embedding, img_path in zip(batch_chunks, batch_embeddings, batch_image_paths):
-                    # Get chunk attributes (works with both dict and object)
-                    if hasattr(chunk, '__dict__'):
-                        chunk_data = chunk.__dict__
-                    elif hasattr(chunk, 'to_dict'):
-                        chunk_data = chunk.to_dict()
-                    else:
-                        chunk_data = chunk
-
-                    # Extract fields
-                    project_id = chunk_data.get('project_id', '')
-                    document_id = chunk_data.get('document_id', '')
-                    chunk_index = chunk_data.get('chunk_index', 0)
-                    chunk_type = chunk_data.get('chunk_type', 'text')
-                    page_number = chunk_data.get('page_number', 1)
-                    bounding_box = chunk_data.get('bounding_box', [0.0, 0.0, 0.0, 0.0])
-                    confidence = chunk_data.get('confidence', 1.0)
-
-                    # Deterministic UUID per chunk for idempotent upserts
-                    chunk_id_str = f"{project_id}_{document_id}_{chunk_index}"
-                    chunk_uuid = uuid.uuid5(uuid.NAMESPACE_URL, chunk_id_str)
-
-                    properties = {
-                        # Original fields
-                        "projectId": project_id,
-                        "sourceId": document_id,
-                        "sourceType": chunk_data.get('file_name', '').split('.')[-1] if chunk_data.get('file_name') else '',
-                        "fileName": chunk_data.get('file_name', ''),
-                        "filePath": chunk_data.get('file_path', ''),
-                        "chunkIndex": chunk_index,
-                        "text": chunk_data.get('text', ''),
-                        "metadataJson": json.dumps(chunk_data.get('metadata', {})),
-                        # Visual grounding fields
-                        "chunkType": chunk_type,
-                        "pageNumber": page_number,
-                        "boundingBox": bounding_box,
-                        "imagePath": img_path,
-                        "confidence": confidence,
-                    }
-
-                    # v4 batch API: use add_object
-                    batch.add_object(
-                        properties=properties,
-                        vector=embedding,
-                        uuid=str(chunk_uuid),
+        if self._batcher is None:
+            self._batcher = WeaviateBatcher(
+                collection.data.insert_many,
+                batch_size=self.upsert_batch_size,
+                max_wait_ms=self.batch_max_wait_ms,
+                max_concurrency=self.upsert_concurrency,
+            )
+
+        await self._batcher.insert(objects)
+
+    async def awarmup(self, vector: Sequence[float]) -> None:
+        """
+        Exercise the write and query paths once, then remove the test object.
+
+        Opens the async client and its gRPC channel, runs one batch insert
+        and one filtered vector search, so the first real ingest and chat
+        request don't pay for connection setup.
+
+        Args:
+            vector: An embedding from the configured model
+        """
+        chunk = DocumentChunk(
+            project_id=WARMUP_PROJECT_ID,
+            source_id="warmup",
+            source_type="txt",
+            file_name="warmup.txt",
+            chunk_index=0,
+            text="warmup",
+        )
+        await self.aupsert_chunks([chunk], [vector])
+        await asyncio.to_thread(
+            self.search_with_visual_grounding, _to_vector(vector), WARMUP_PROJECT_ID, 1
+        )
+
+        collection = await self._get_async_collection()
+        await collection.data.delete_by_id(
+            _chunk_uuid(chunk.project_id, chunk.source_id, chunk.chunk_index)
+        )
+
+    async def _get_async_collection(self):
+        """Connect the async client on first use and return its collection handle."""
+        async with self._aclient_lock:
+            if self.aclient is None:
+                if self._use_cloud:
+                    aclient = weaviate.use_async_with_weaviate_cloud(
+                        cluster_url=self.weaviate_url,
+                        auth_credentials=self._auth_config,
+                        additional_config=self._additional_config,
                     )
+                else:
+                    aclient = weaviate.use_async_with_custom(**self._custom_connection)
+                await aclient.connect()
+                self.aclient = aclient
+                self._acollection = aclient.collections.get(self.class_name)
+                logger.info("Connected async Weaviate client")
 
-            logger.info(f"Inserted batch of {len(batch_chunks)} enhanced chunks")
+        return self._acollection
 
-        logger.info(f"Successfully upserted {len(chunks)} enhanced chunks to Weaviate")
+    def delete_by_source(self, project_id: str, source_id: str) -> int:
+        """
+        Delete every chunk of one source document in a single request.
+
+        Args:
+            project_id: Project identifier
+            source_id: Source document identifier
+
+        Returns:
+            Number of chunks deleted
+        """
+        result = self._get_collection().data.delete_many(
+            where=Filter.by_property("projectId").equal(project_id)
+            & Filter.by_property("sourceId").equal(source_id)
+        )
+
+        if result.successful:
+            logger.info(f"Deleted {result.successful} existing chunks of {source_id}")
+        return result.successful
 
     def search_with_visual_grounding(
         self,
         query_vector: list[float],
         project_id: str,
         limit: int = 5,
-    ) -> list[dict]:
+    ) -> list[SearchResult]:
         """
         Search for chunks with visual grounding metadata.
 
@@ -309,9 +791,9 @@ class WeaviateVectorStore:
             limit: Maximum number of results
 
         Returns:
-            List of chunk dictionaries with visual grounding data
+            List of SearchResult dicts with visual grounding data
         """
-        collection = self.client.collections.get(self.class_name)
+        collection = self._get_collection()
 
         # Perform vector search with filters (Weaviate v4 syntax)
         response = collection.query.near_vector(
@@ -329,57 +811,99 @@ class WeaviateVectorStore:
                 "projectId",
                 "chunkIndex"
             ],
-            return_metadata=["distance", "certainty"],  # Request distance/certainty in metadata
+            return_metadata=MetadataQuery(distance=True),
             filters=Filter.by_property("projectId").equal(project_id)
         )
 
         # Convert results to list of dicts
         results = []
         for obj in response.objects:
-            # Calculate relevance score from distance (lower distance = higher relevance)
-            # In Weaviate v4, distance is in metadata and represents cosine distance (0-2 range)
-            # Lower distance = more similar (0 = identical)
-            distance = None
-            if hasattr(obj, 'metadata') and obj.metadata:
-                # Try different possible attributes
-                if hasattr(obj.metadata, 'distance'):
-                    distance = obj.metadata.distance
-                elif hasattr(obj.metadata, 'certainty'):
-                    # Certainty is 0-1, higher is better (convert to distance-like score)
-                    distance = 1.0 - obj.metadata.certainty
-
-            # Convert distance to similarity score (0-1 scale, higher = more relevant)
-            # For cosine distance: 0 = identical, 2 = opposite
-            if distance is not None:
-                # Normalize cosine distance (0-2) to similarity score (0-1)
-                # Distance 0 → score 1.0, Distance 2 → score 0.0
-                score = max(0.0, min(1.0, 1.0 - (distance / 2.0)))
-            else:
-                # Fallback if no distance available
-                score = 0.5
-                logger.warning(f"No distance/certainty found for result, using default score")
+            p = obj.properties
 
-            result = {
+            # Cosine distance (0 = identical, 2 = opposite) to a 0-1 similarity score;
+            # the server always returns distance when it is requested
+            score = 1.0 - obj.metadata.distance * 0.5
+
+            # Both upsert paths always set the core properties; the visual
+            # grounding ones are missing on chunks stored by upsert_chunks
+            results.append({
                 "id": str(obj.uuid),  # Object UUID
-                "text": obj.properties.get("text", ""),
-                "fileName": obj.properties.get("fileName", ""),
-                "chunkType": obj.properties.get("chunkType", "text"),
-                "pageNumber": obj.properties.get("pageNumber", 1),
-                "boundingBox": obj.properties.get("boundingBox"),
-                "imagePath": obj.properties.get("imagePath", ""),
-                "confidence": obj.properties.get("confidence", 1.0),
-                "sourceId": obj.properties.get("sourceId", ""),
-                "projectId": obj.properties.get("projectId", ""),
-                "chunkIndex": obj.properties.get("chunkIndex", 0),
-                "score": score
-            }
-            results.append(result)
+                "text": p["text"],
+                "fileName": p["fileName"],
+                "chunkType": p.get("chunkType", "text"),
+                "pageNumber": p.get("pageNumber", 1),
+                "boundingBox": p.get("boundingBox"),
+                "imagePath": p.get("imagePath", ""),
+                "confidence": p.get("confidence", 1.0),
+                "sourceId": p["sourceId"],
+                "projectId": p["projectId"],
+                "chunkIndex": p["chunkIndex"],
+                "score": score,
+            })
 
         logger.info(f"Retrieved {len(results)} chunks for query")
         return results
 
     def close(self) -> None:
-        """Close the Weaviate client connection."""
-        if self.client:
-            self.client.close()
+        """Release the Weaviate client; the connection closes with its last store."""
+        self._collection = None
+        if not self.client:
+            return
+
+        with _CLIENT_CACHE_LOCK:
+            shared = _CLIENT_CACHE.get(self._client_key)
+            if shared is not None and shared.client is self.client:
+                shared.refs -= 1
+                if shared.refs > 0:
+                    self.client = None
+                    return
+                del _CLIENT_CACHE[self._client_key]
+
+        self.client.close()
+        self.client = None
+
+    async def aclose(self) -> None:
+        """Close the async Weaviate client connection, if it was opened."""
+        if self._batcher is not None:
+            await self._batcher.close()
+            self._batcher = None
+        if self.aclient is not None:
+            await self.aclient.close()
+            self.aclient = None
+            self._acollection = None
+
+
+async def aupsert_chunks(
+    vector_store: WeaviateVectorStore,
+    chunks: list,
+    embeddings: Embeddings,
+    image_paths: Optional[list[str]] = None,
+) -> None:
+    """
+    Upsert chunks without blocking the event loop.
+
+    Uses the store's native async upserts when it has them and otherwise
+    runs the synchronous ones in a worker thread. Chunks with image_paths
+    are stored with the enhanced (visual grounding) schema.
+
+    Args:
+        vector_store: WeaviateVectorStore instance
+        chunks: DocumentChunk instances, or enhanced chunks when image_paths is given
+        embeddings: Embedding vectors (one per chunk), as lists or an array
+        image_paths: Image paths (one per chunk) for enhanced chunks
+    """
+    if image_paths is None:
+        native = getattr(vector_store, "aupsert_chunks", None)
+        if native is not None:
+            await native(chunks, embeddings)
+        else:
+            await asyncio.to_thread(vector_store.upsert_chunks, chunks, embeddings)
+    else:
+        native = getattr(vector_store, "aupsert_chunks_enhanced", None)
+        if native is not None:
+            await native(chunks, embeddings, image_paths)
+        else:
+            await asyncio.to_thread(
+                vector_store.upsert_chunks_enhanced, chunks, embeddings, image_paths
+            )
 
@@ -1,40 +1,87 @@
 """FastAPI application entrypoint."""
 
+import asyncio
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.config import settings
+from app.config import get_settings
 from app.ingestion.vector_store import WeaviateVectorStore
-from app.ingestion.embedder import get_embedder, BaseEmbedder
+from app.ingestion.embedder import aembed_texts, get_embedder, BaseEmbedder
+from app.ingestion.pipeline import get_process_pool, shutdown_process_pool
+from app.services.chat_service import ChatService
+from app.services.openai_clients import close_openai_clients
+from app.services.reranker import get_reranker
+from app.services.semantic_cache import get_semantic_cache
+from app.services.session_manager import get_session_manager
 from app.api import routes_health, routes_ingest, routes_chat
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Configure logging: records are handed to a queue and written to stderr by a
+# listener thread, so log I/O never blocks the event loop
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 )
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # Full format applied by the listener
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler], force=True)
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 # Global instances (initialized at startup)
 vector_store: WeaviateVectorStore | None = None
 embedder: BaseEmbedder | None = None
+chat_service: ChatService | None = None
+
+
+async def _sweep_expired_sessions(interval_seconds: float) -> None:
+    """Periodically remove expired sessions off the request path."""
+    session_manager = get_session_manager()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(session_manager.cleanup_expired_sessions)
+        except Exception as e:
+            logger.error(f"Error cleaning up expired sessions: {e}", exc_info=True)
+
+
+async def _warm_up(vector_store: WeaviateVectorStore, embedder: BaseEmbedder) -> None:
+    """Send one embeddings request and one Weaviate write/search before serving."""
+    try:
+        vector = (await aembed_texts(embedder, ["warmup"]))[0]
+        await vector_store.awarmup(vector)
+        logger.info("Warm-up complete")
+    except Exception as e:
+        logger.warning(f"Warm-up failed, continuing without it: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events."""
     # Startup
-    global vector_store, embedder
+    global vector_store, embedder, chat_service
     
     logger.info("Initializing Weaviate connection...")
     vector_store = WeaviateVectorStore(
         weaviate_url=settings.weaviate_url,
         weaviate_api_key=settings.weaviate_api_key,
         class_name=settings.weaviate_class_name,
+        upsert_concurrency=settings.weaviate_upsert_concurrency,
+        upsert_batch_size=settings.weaviate_batch_size,
+        quantization=settings.weaviate_quantization,
+        batch_max_wait_ms=settings.weaviate_batch_max_wait_ms,
     )
     
     logger.info("Ensuring Weaviate schema...")
@@ -43,13 +90,40 @@ async def lifespan(app: FastAPI):
     logger.info("Initializing embedder...")
     embedder = get_embedder()
     
+    logger.info("Creating extraction worker pool...")
+    get_process_pool()
+    
+    if settings.warmup_on_startup:
+        logger.info("Warming up embedder and Weaviate...")
+        await _warm_up(vector_store, embedder)
+    
+    logger.info("Initializing chat service...")
+    chat_service = ChatService(
+        vector_store=vector_store,
+        embedder=embedder,
+        session_manager=get_session_manager(),
+        answer_cache=get_semantic_cache() if settings.semantic_cache_enabled else None,
+        reranker=get_reranker() if settings.rerank_enabled else None,
+        rerank_candidates_multiplier=settings.rerank_candidates_multiplier,
+    )
+    
+    session_sweeper = asyncio.create_task(
+        _sweep_expired_sessions(settings.session_cleanup_interval_seconds)
+    )
+    
     logger.info("Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    session_sweeper.cancel()
+    shutdown_process_pool()
+    if chat_service:
+        await chat_service.aclose()
+    await close_openai_clients()
     if vector_store:
+        await vector_store.aclose()
         vector_store.close()
     logger.info("Application shutdown complete")
 
@@ -60,6 +134,7 @@ app = FastAPI(
     description="Upload documents with visual grounding and chat with your data using RAG",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Include routers
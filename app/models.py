@@ -1,7 +1,9 @@
 """Pydantic models for request/response types and data structures."""
 
+from dataclasses import dataclass, field
+
 from pydantic import BaseModel, Field
-from typing import Any, Optional
+from typing import Any, Mapping, Optional
 from datetime import datetime
 
 
@@ -15,7 +17,7 @@ class DocumentChunk(BaseModel):
     file_path: Optional[str] = None
     chunk_index: int
     text: str
-    metadata: dict[str, Any] = {}
+    metadata: Mapping[str, Any] = Field(default_factory=dict)  # A ChainMap over shared document metadata when chunked
 
 
 class IngestResponse(BaseModel):
@@ -62,16 +64,19 @@ class SourceReference(BaseModel):
     )
 
 
-class ConversationMessage(BaseModel):
-    """Single message in a conversation."""
+@dataclass(slots=True)
+class ConversationMessage:
+    """
+    Single message in a conversation.
 
-    role: str = Field(description="Role: 'user' or 'assistant'")
-    content: str = Field(description="Message content")
-    timestamp: datetime = Field(default_factory=datetime.now)
-    sources: Optional[list[SourceReference]] = Field(
-        default=None,
-        description="Source references (only for assistant messages)"
-    )
+    A slotted dataclass rather than a pydantic model: sessions keep many of
+    these, built from already-validated values.
+    """
+
+    role: str  # 'user' or 'assistant'
+    content: str
+    timestamp: datetime = field(default_factory=datetime.now)
+    sources: Optional[list[SourceReference]] = None  # Only for assistant messages
 
 
 class ChatQuery(BaseModel):
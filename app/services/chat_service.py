@@ -1,18 +1,233 @@
 """Chat service with RAG (Retrieval-Augmented Generation) logic."""
 
+import asyncio
+import hashlib
 import logging
 import time
-from typing import Optional
-from openai import OpenAI
+from collections import OrderedDict
+from typing import AsyncIterator, Optional, Union
+
+import orjson
 
 from app.models import ChatQuery, ChatResponse, SourceReference, ConversationMessage
-from app.ingestion.embedder import BaseEmbedder
+from app.ingestion.embedder import BaseEmbedder, aembed_texts
 from app.ingestion.vector_store import WeaviateVectorStore
+from app.services.openai_clients import get_async_openai_client
+from app.services.reranker import CrossEncoderReranker
+from app.services.semantic_cache import SemanticCache
 from app.services.session_manager import SessionManager
-from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Prefix of the fallback answer returned when the LLM call fails
+_GENERATION_ERROR_PREFIX = "Sorry, I encountered an error while generating the answer"
+
+# Instructions sent as the first message of every answer prompt
+_SYSTEM_PROMPT = """You are a helpful AI assistant that answers questions based on provided document context.
+
+Guidelines:
+1. Answer questions accurately using ONLY the information from the provided sources
+2. If the answer is not in the sources, say "I don't have enough information to answer this question"
+3. Cite sources by number when referencing specific information (e.g., "According to Source 1...")
+4. Be concise but comprehensive
+5. If sources conflict, acknowledge the discrepancy
+6. Maintain conversation context and refer to previous messages when relevant
+
+Format your answer clearly with proper paragraphs and citations."""
+
+# Shared by every prompt and never mutated
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+
+# Recent query embeddings kept in memory, so repeated questions skip the API
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Queries from concurrent requests are embedded together, up to this many
+# per request and waiting at most this long for the batch to fill
+QUERY_EMBED_BATCH_SIZE = 32
+QUERY_EMBED_MAX_WAIT_MS = 25
+
+
+class _SharedCompletion:
+    """
+    A streaming completion that several identical requests can follow.
+
+    The completion runs in its own task, so a follower that disconnects
+    doesn't cancel it for the others; each follower replays the pieces
+    received so far and then waits for new ones.
+    """
+
+    def __init__(self, stream: AsyncIterator[str]):
+        self._parts: list[str] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Condition()
+        self.task = asyncio.ensure_future(self._consume(stream))
+
+    async def _consume(self, stream: AsyncIterator[str]) -> None:
+        try:
+            async for part in stream:
+                async with self._changed:
+                    self._parts.append(part)
+                    self._changed.notify_all()
+        except asyncio.CancelledError as e:
+            self._error = e
+            raise
+        except Exception as e:
+            self._error = e
+        finally:
+            async with self._changed:
+                self._done = True
+                self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Yield every piece of the completion, failing if it failed."""
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: self._done or len(self._parts) > position
+                )
+                parts = self._parts[position:]
+                done = self._done
+            for part in parts:
+                yield part
+            position += len(parts)
+            if done:
+                if self._error is not None:
+                    raise self._error
+                return
+
+
+# Queued by _CoalescingEmbedder.close() to stop its worker after the queries ahead of it
+_STOP = object()
+
+
+def _fail_pending(items: list[tuple[str, asyncio.Future]], message: str) -> None:
+    """Fail the futures of queued queries that have no result yet."""
+    for _, future in items:
+        if not future.done():
+            future.set_exception(RuntimeError(message))
+
+
+class _CoalescingEmbedder:
+    """
+    Embeds queries from concurrent chat requests in shared batches.
+
+    Callers enqueue a query and wait for its embedding. A background task
+    collects queued queries until it has batch_size of them or max_wait_ms
+    has passed since the first one, then embeds them in one request.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        batch_size: int = QUERY_EMBED_BATCH_SIZE,
+        max_wait_ms: float = QUERY_EMBED_MAX_WAIT_MS,
+    ):
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> list[float]:
+        """Queue a query and wait for its embedding."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        """
+        Collect queued queries into batches and flush them.
+
+        Returns after the _STOP sentinel, once every query queued before it
+        has been handed to a flush, including a partly filled batch.
+        """
+        loop = asyncio.get_running_loop()
+        batch: list[tuple[str, asyncio.Future]] = []
+        stopping = False
+
+        try:
+            while not stopping:
+                item = await self._queue.get()
+                if item is _STOP:
+                    break
+                batch = [item]
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.batch_size:
+                    if not self._queue.empty():
+                        item = self._queue.get_nowait()
+                    else:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                flush = asyncio.create_task(self._flush(batch))
+                self._flushes.add(flush)
+                flush.add_done_callback(self._flushes.discard)
+                batch = []
+        except asyncio.CancelledError:
+            _fail_pending(batch, "Query embedder was cancelled before the query was embedded")
+            raise
+
+    async def _flush(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        """Embed one batch and resolve its callers' futures."""
+        # The same question asked concurrently is only embedded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await aembed_texts(self.embedder, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, embeddings))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+        if len(batch) > 1:
+            logger.debug(f"Embedded {len(batch)} concurrent queries in one request")
+
+    async def close(self) -> None:
+        """
+        Stop the background task once queued queries are embedded.
+
+        The worker gets a sentinel rather than being cancelled, so waiting
+        callers get their embeddings; any it can't reach fail instead.
+        """
+        worker, self._worker = self._worker, None
+        queue = self._queue
+        if worker is not None:
+            if not worker.done() and worker.get_loop() is asyncio.get_running_loop():
+                queue.put_nowait(_STOP)
+                await asyncio.gather(worker, return_exceptions=True)
+            else:
+                worker.cancel()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        while queue is not None and not queue.empty():
+            item = queue.get_nowait()
+            if item is not _STOP:
+                _fail_pending([item], "Query embedder was closed before the query was embedded")
+
 
 class ChatService:
     """
@@ -31,6 +246,9 @@ class ChatService:
         vector_store: WeaviateVectorStore,
         embedder: BaseEmbedder,
         session_manager: SessionManager,
+        answer_cache: Optional[SemanticCache] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        rerank_candidates_multiplier: int = 4,
     ):
         """
         Initialize chat service.
@@ -39,11 +257,21 @@ class ChatService:
             vector_store: WeaviateVectorStore instance
             embedder: BaseEmbedder instance for query embedding
             session_manager: SessionManager for conversation persistence
+            answer_cache: Optional SemanticCache for answers to repeated queries
+            reranker: Optional CrossEncoderReranker for retrieved chunks
+            rerank_candidates_multiplier: Candidates retrieved per chunk kept
+                when re-ranking
         """
         self.vector_store = vector_store
         self.embedder = embedder
         self.session_manager = session_manager
-        self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        self.answer_cache = answer_cache
+        self.reranker = reranker
+        self.rerank_candidates_multiplier = rerank_candidates_multiplier
+        self.async_openai_client = get_async_openai_client()
+        self._inflight_completions: dict[str, _SharedCompletion] = {}
+        self._query_embedder = _CoalescingEmbedder(embedder)
+        self._query_vectors: OrderedDict[str, list[float]] = OrderedDict()
 
         logger.info("ChatService initialized")
 
@@ -57,10 +285,34 @@ class ChatService:
         Returns:
             ChatResponse with answer and sources
         """
+        async for item in self.query_stream(chat_query):
+            if isinstance(item, ChatResponse):
+                return item
+        raise RuntimeError("query_stream ended without a response")
+
+    async def query_stream(
+        self, chat_query: ChatQuery
+    ) -> AsyncIterator[Union[str, ChatResponse]]:
+        """
+        Process a chat query using RAG, streaming the answer as it is generated.
+
+        Each new piece of the answer is yielded as a string as soon as the
+        LLM produces it. The last item is the ChatResponse with the complete
+        answer, sources and timings, yielded once the exchange has been
+        stored in the session. A cached answer yields only the ChatResponse.
+
+        Args:
+            chat_query: ChatQuery instance with user question
+
+        Yields:
+            Answer text deltas, then one ChatResponse
+        """
         start_time = time.time()
 
         # Step 1: Get or create session
-        session_id = self.session_manager.get_or_create_session(
+        # Session calls go through a thread: the Redis manager does network I/O
+        session_id = await asyncio.to_thread(
+            self.session_manager.get_or_create_session,
             session_id=chat_query.session_id,
             project_id=chat_query.project_id
         )
@@ -69,37 +321,72 @@ class ChatService:
             f"Processing query for session {session_id}, project {chat_query.project_id}"
         )
 
-        # Step 2: Retrieve relevant chunks
-        retrieval_start = time.time()
-        sources = await self._retrieve_relevant_chunks(
-            query=chat_query.query,
-            project_id=chat_query.project_id,
-            top_k=chat_query.top_k,
-            include_images=chat_query.include_images
-        )
-        retrieval_time = (time.time() - retrieval_start) * 1000  # Convert to ms
-
-        logger.info(f"Retrieved {len(sources)} relevant chunks in {retrieval_time:.2f}ms")
-
-        # Step 3: Get conversation history
-        conversation_history = self.session_manager.get_conversation_history(
+        # Step 2: Get conversation history
+        conversation_history = await asyncio.to_thread(
+            self.session_manager.get_conversation_history,
             session_id=session_id,
             max_messages=10  # Last 5 exchanges (10 messages)
         )
 
-        # Step 4: Generate answer using LLM
-        generation_start = time.time()
-        answer = await self._generate_answer(
-            query=chat_query.query,
-            sources=sources,
-            conversation_history=conversation_history
-        )
-        generation_time = (time.time() - generation_start) * 1000  # Convert to ms
-
-        logger.info(f"Generated answer in {generation_time:.2f}ms")
-
-        # Step 5: Store conversation in session
-        self.session_manager.add_message(
+        # Step 3: Check the answer cache (exact query, then semantic match)
+        query_vector = None
+        cache_partition = None
+        cached = None
+        if self.answer_cache is not None:
+            lookup_start = time.time()
+            cache_partition = self._cache_partition(chat_query, conversation_history)
+            cached = self.answer_cache.get_exact(cache_partition, chat_query.query)
+            if cached is None:
+                query_vector = await self._embed_query(chat_query.query)
+                cached = self.answer_cache.get_similar(cache_partition, query_vector)
+            lookup_time = (time.time() - lookup_start) * 1000
+
+        if cached is not None:
+            answer, sources = cached
+            retrieval_time = lookup_time
+            generation_time = 0.0
+            logger.info(f"Answer cache hit in {lookup_time:.2f}ms")
+        else:
+            # Step 4: Retrieve relevant chunks
+            retrieval_start = time.time()
+            sources = await self._retrieve_relevant_chunks(
+                query=chat_query.query,
+                project_id=chat_query.project_id,
+                top_k=chat_query.top_k,
+                include_images=chat_query.include_images,
+                query_vector=query_vector
+            )
+            retrieval_time = (time.time() - retrieval_start) * 1000  # Convert to ms
+
+            logger.info(f"Retrieved {len(sources)} relevant chunks in {retrieval_time:.2f}ms")
+
+            # Step 5: Generate answer using LLM, passing on each new piece
+            generation_start = time.time()
+            pieces: list[str] = []
+            try:
+                async for delta in self._stream_answer(
+                    query=chat_query.query,
+                    sources=sources,
+                    conversation_history=conversation_history
+                ):
+                    pieces.append(delta)
+                    yield delta
+                answer = "".join(pieces).strip()
+            except Exception as e:
+                logger.error(f"Error generating answer with OpenAI: {e}", exc_info=True)
+                answer = f"{_GENERATION_ERROR_PREFIX}: {str(e)}"
+            generation_time = (time.time() - generation_start) * 1000  # Convert to ms
+
+            logger.info(f"Generated answer in {generation_time:.2f}ms")
+
+            if cache_partition is not None and not answer.startswith(_GENERATION_ERROR_PREFIX):
+                self.answer_cache.put(
+                    cache_partition, chat_query.query, query_vector, (answer, sources)
+                )
+
+        # Step 6: Store conversation in session
+        await asyncio.to_thread(
+            self.session_manager.add_message,
             session_id=session_id,
             message=ConversationMessage(
                 role="user",
@@ -107,7 +394,8 @@ class ChatService:
             )
         )
 
-        self.session_manager.add_message(
+        await asyncio.to_thread(
+            self.session_manager.add_message,
             session_id=session_id,
             message=ConversationMessage(
                 role="assistant",
@@ -116,10 +404,8 @@ class ChatService:
             )
         )
 
-        # Step 6: Build response
-        total_time = (time.time() - start_time) * 1000
-
-        return ChatResponse(
+        # Step 7: Build final response
+        yield ChatResponse(
             answer=answer,
             sources=sources,
             session_id=session_id,
@@ -127,7 +413,7 @@ class ChatService:
             project_id=chat_query.project_id,
             retrieval_time_ms=retrieval_time,
             generation_time_ms=generation_time,
-            total_time_ms=total_time
+            total_time_ms=(time.time() - start_time) * 1000
         )
 
     async def _retrieve_relevant_chunks(
@@ -135,7 +421,8 @@ class ChatService:
         query: str,
         project_id: str,
         top_k: int,
-        include_images: bool
+        include_images: bool,
+        query_vector: Optional[list[float]] = None
     ) -> list[SourceReference]:
         """
         Retrieve relevant chunks from vector store.
@@ -145,20 +432,29 @@ class ChatService:
             project_id: Project identifier
             top_k: Number of chunks to retrieve
             include_images: Whether to include image paths
+            query_vector: Precomputed query embedding (computed if omitted)
 
         Returns:
             List of SourceReference objects
         """
         # Generate query embedding
-        query_vector = self.embedder.embed_texts([query])[0]
-
-        # Search Weaviate
-        results = self.vector_store.search_with_visual_grounding(
+        if query_vector is None:
+            query_vector = await self._embed_query(query)
+
+        # Search Weaviate in a worker thread, so concurrent chat requests
+        # share the client's connection pool instead of queueing on the loop
+        limit = top_k * self.rerank_candidates_multiplier if self.reranker else top_k
+        results = await asyncio.to_thread(
+            self.vector_store.search_with_visual_grounding,
             query_vector=query_vector,
             project_id=project_id,
-            limit=top_k
+            limit=limit
         )
 
+        # Keep the top_k candidates the cross-encoder rates most relevant
+        if self.reranker is not None and results:
+            results = await asyncio.to_thread(self.reranker.rerank, query, results, top_k)
+
         # Convert to SourceReference objects
         sources = []
         for result in results:
@@ -178,12 +474,12 @@ class ChatService:
 
         return sources
 
-    async def _generate_answer(
+    async def _stream_answer(
         self,
         query: str,
         sources: list[SourceReference],
         conversation_history: list[ConversationMessage]
-    ) -> str:
+    ) -> AsyncIterator[str]:
         """
         Generate answer using LLM with retrieved context.
 
@@ -192,8 +488,8 @@ class ChatService:
             sources: Retrieved source chunks
             conversation_history: Previous conversation messages
 
-        Returns:
-            Generated answer text
+        Yields:
+            Pieces of the answer text as they are generated
         """
         # Build context from sources
         context_parts = []
@@ -212,33 +508,14 @@ class ChatService:
                 history_parts.append(f"{msg.role.upper()}: {msg.content}")
             history_text = "\n\n".join(history_parts)
 
-        # Build system prompt
-        system_prompt = """You are a helpful AI assistant that answers questions based on provided document context.
-
-Guidelines:
-1. Answer questions accurately using ONLY the information from the provided sources
-2. If the answer is not in the sources, say "I don't have enough information to answer this question"
-3. Cite sources by number when referencing specific information (e.g., "According to Source 1...")
-4. Be concise but comprehensive
-5. If sources conflict, acknowledge the discrepancy
-6. Maintain conversation context and refer to previous messages when relevant
-
-Format your answer clearly with proper paragraphs and citations."""
-
-        # Build messages for OpenAI API
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
+        # Keep the system prompt as the first, byte-identical message so the
+        # provider can serve it from its prompt cache; everything that varies
+        # per request goes into the user message after it
+        messages = [_SYSTEM_MESSAGE]
 
-        # Add conversation history if exists
-        if history_text:
-            messages.append({
-                "role": "system",
-                "content": f"Previous conversation:\n{history_text}"
-            })
-
-        # Add current context and query
-        user_message = f"""Context from documents:
+        # Add conversation history, current context and query
+        history_block = f"Previous conversation:\n{history_text}\n\n" if history_text else ""
+        user_message = f"""{history_block}Context from documents:
 {context}
 
 Question: {query}
@@ -248,23 +525,97 @@ Please answer the question based on the context provided above. Cite sources by
         messages.append({"role": "user", "content": user_message})
 
         # Call OpenAI API
-        try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",  # Fast and cost-effective
-                messages=messages,
-                temperature=0.2,  # Low temperature for factual answers
-                max_tokens=1000,
-                top_p=0.9
+        async for delta in self._stream_completion(messages):
+            yield delta
+
+    def _stream_completion(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, sharing one request between identical prompts.
+
+        Concurrent requests that build exactly the same messages (same
+        project context, history and question) follow a single in-flight
+        completion instead of each sending their own.
+
+        Args:
+            messages: Chat messages for the completion
+
+        Returns:
+            Iterator over pieces of the answer text
+        """
+        key = hashlib.sha256(orjson.dumps(messages)).hexdigest()
+
+        completion = self._inflight_completions.get(key)
+        if completion is None:
+            completion = _SharedCompletion(self._create_completion(messages))
+            self._inflight_completions[key] = completion
+            completion.task.add_done_callback(
+                lambda _: self._inflight_completions.pop(key, None)
             )
+        else:
+            logger.info("Joining an identical in-flight completion")
+
+        return completion.follow()
+
+    async def _create_completion(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """Send one streaming chat completion request."""
+        stream = await self.async_openai_client.chat.completions.create(
+            model="gpt-4o-mini",  # Fast and cost-effective
+            messages=messages,
+            temperature=0.2,  # Low temperature for factual answers
+            max_tokens=1000,
+            top_p=0.9,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-            answer = response.choices[0].message.content.strip()
-            logger.debug(f"Generated answer: {answer[:100]}...")
+    async def _embed_query(self, query: str) -> list[float]:
+        """
+        Embed a query, reusing the embedding of a recent identical query.
 
-            return answer
+        Queries that miss the cache are embedded together with those of
+        concurrent requests.
 
-        except Exception as e:
-            logger.error(f"Error generating answer with OpenAI: {e}", exc_info=True)
-            return f"Sorry, I encountered an error while generating the answer: {str(e)}"
+        Args:
+            query: User's question
+
+        Returns:
+            Query embedding
+        """
+        query_vector = self._query_vectors.get(query)
+        if query_vector is not None:
+            self._query_vectors.move_to_end(query)
+            return query_vector
+
+        query_vector = await self._query_embedder.embed(query)
+        self._query_vectors[query] = query_vector
+        if len(self._query_vectors) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_vectors.popitem(last=False)
+        return query_vector
+
+    @staticmethod
+    def _cache_partition(
+        chat_query: ChatQuery,
+        conversation_history: list[ConversationMessage]
+    ) -> tuple:
+        """
+        Build the answer-cache partition for a query.
+
+        Answers only depend on the project, the retrieval parameters and the
+        conversation turns that are fed into the prompt, so those form the
+        partition; the query itself is matched within it.
+        """
+        history_digest = hashlib.sha256()
+        for msg in conversation_history[-6:]:
+            history_digest.update(f"{msg.role}\x00{msg.content}\x00".encode("utf-8"))
+
+        return (
+            chat_query.project_id,
+            chat_query.top_k,
+            chat_query.include_images,
+            history_digest.hexdigest(),
+        )
 
     def get_conversation_history(
         self,
@@ -297,3 +648,7 @@ Please answer the question based on the context provided above. Cite sources by
             True if cleared successfully
         """
         return self.session_manager.clear_session(session_id)
+
+    async def aclose(self) -> None:
+        """Stop the background query-embedding task."""
+        await self._query_embedder.close()
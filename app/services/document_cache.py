@@ -0,0 +1,160 @@
+"""Persistent content-addressed caches for extracted documents."""
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.services.document_processor import BoundingBox, TextBlock
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentBlockCache:
+    """
+    Directory of extracted blocks and metadata keyed by file content.
+
+    Keys are SHA-256 digests of the parser version and the file bytes, so
+    re-uploading an unchanged file skips parsing, while a new parser
+    version never reuses blocks extracted by an older one. Each entry is
+    one JSON file, written atomically so concurrent worker processes can
+    share the directory.
+    """
+
+    def __init__(self, cache_dir: Path, parser_version: str):
+        """
+        Open (or create) the cache directory.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            parser_version: Identifies the extraction code and library versions
+        """
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.parser_version = parser_version
+
+    def make_key(self, content: bytes) -> str:
+        """Build the cache key for a file's content."""
+        digest = hashlib.sha256(f"{self.parser_version}\0".encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[TextBlock], Dict[str, Any]]]:
+        """
+        Look up cached blocks.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            (blocks, document_metadata), or None on a miss or unreadable entry
+        """
+        try:
+            entry = orjson.loads((self.cache_dir / f"{key}.json").read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable block cache entry {key}: {e}")
+            return None
+
+        blocks = [
+            TextBlock(
+                text=block["text"],
+                bbox=BoundingBox(*block["bbox"]),
+                page_number=block["page_number"],
+                block_type=block["block_type"],
+                confidence=block["confidence"],
+                metadata=block["metadata"]
+            )
+            for block in entry["blocks"]
+        ]
+        return blocks, entry["metadata"]
+
+    def put(self, key: str, blocks: List[TextBlock], metadata: Dict[str, Any]) -> None:
+        """
+        Store extracted blocks, replacing any existing entry for the key.
+
+        Args:
+            key: Cache key from make_key
+            blocks: Extracted text blocks
+            metadata: Document metadata
+        """
+        data = orjson.dumps({
+            "blocks": [block.to_dict() for block in blocks],
+            "metadata": metadata,
+        })
+        _write_atomic(self.cache_dir / f"{key}.json", data)
+
+
+class ExtractedTextCache:
+    """
+    Directory of extracted text and metadata keyed by file content.
+
+    Same layout and keying as DocumentBlockCache, for the plain text that
+    extract_text produces, so re-uploading an unchanged file skips parsing.
+    """
+
+    def __init__(self, cache_dir: Path, extractor_version: str):
+        """
+        Open (or create) the cache directory.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            extractor_version: Identifies the extraction code and library versions
+        """
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.extractor_version = extractor_version
+
+    def make_key(self, content: bytes) -> str:
+        """Build the cache key for a file's content."""
+        digest = hashlib.sha256(f"text\0{self.extractor_version}\0".encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Look up cached text.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            (text, extra_metadata), or None on a miss or unreadable entry
+        """
+        try:
+            entry = orjson.loads((self.cache_dir / f"{key}.json").read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable text cache entry {key}: {e}")
+            return None
+
+        return entry["text"], entry["metadata"]
+
+    def put(self, key: str, text: str, metadata: Dict[str, Any]) -> None:
+        """
+        Store extracted text, replacing any existing entry for the key.
+
+        Args:
+            key: Cache key from make_key
+            text: Extracted text
+            metadata: Extra metadata returned with the text
+        """
+        _write_atomic(self.cache_dir / f"{key}.json", orjson.dumps({"text": text, "metadata": metadata}))
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file via a temporary file and rename, so readers never see a partial entry."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
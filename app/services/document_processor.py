@@ -1,23 +1,39 @@
 """
-Enhanced document processor using PyMuPDF and pdfplumber.
+Enhanced document processor using PyMuPDF.
 
 This module provides layout-aware text extraction with bounding boxes,
 table detection, and document structure preservation.
 """
 
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import fitz  # PyMuPDF
-import pdfplumber
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# PDFs with fewer pages are extracted in-process; below this, starting
+# worker processes costs more than it saves
+PARALLEL_MIN_PAGES = 256
+
+# Pages per worker task when a PDF is extracted in parallel
+PAGES_PER_TASK = 16
+
+# Identifies the extraction output in the block cache; bump the leading
+# number whenever process_pdf starts producing different blocks
+PARSER_VERSION = f"1-pymupdf-{fitz.VersionBind}"
+
 
 class BoundingBox:
     """Represents a bounding box with coordinates."""
 
+    __slots__ = ("x1", "y1", "x2", "y2")
+
     def __init__(self, x1: float, y1: float, x2: float, y2: float):
         self.x1 = x1
         self.y1 = y1
@@ -54,6 +70,9 @@ class BoundingBox:
 class TextBlock:
     """Represents a text block extracted from a document."""
 
+    # Created for every block of every page, so skip the per-instance __dict__
+    __slots__ = ("text", "bbox", "page_number", "block_type", "confidence", "metadata")
+
     def __init__(
         self,
         text: str,
@@ -82,24 +101,106 @@ class TextBlock:
         }
 
 
+def _page_blocks(
+    doc: "fitz.Document",
+    page_indices: Iterable[int]
+) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Extract the non-empty text blocks and the tables of some pages.
+
+    Both come back as plain tuples so worker processes can send them back
+    cheaply:
+    - text: (text, x0, y0, x1, y1, page_number, block_no, block_type)
+    - tables: (x0, y0, x1, y1, page_number, table_index, cell_rows)
+    """
+    rows = []
+    tables = []
+
+    for page_num in page_indices:
+        page = doc[page_num]
+        page_height = page.rect.height
+
+        # Get text blocks (format: x0, y0, x1, y1, "text", block_no, block_type)
+        for x0, y0, x1, y1, text, block_no, block_type in page.get_text("blocks"):
+            text = text.strip()
+
+            # Skip empty blocks
+            if not text:
+                continue
+
+            # Determine block type (0 = text, 1 = image)
+            b_type = "image" if block_type == 1 else "text"
+
+            # Detect headers/footers (heuristic: top 10% or bottom 10% of page)
+            if y0 < page_height * 0.1:
+                b_type = "header"
+            elif y1 > page_height * 0.9:
+                b_type = "footer"
+
+            rows.append((text, x0, y0, x1, y1, page_num + 1, block_no, b_type))  # 1-indexed pages
+
+        # Find tables on the same page object; a page whose table detection
+        # fails still keeps its text. find_tables switches PyMuPDF's global
+        # small-glyph-heights mode on and doesn't always switch it back,
+        # which would shift the text bboxes of the following pages
+        small_glyph_heights = fitz.TOOLS.set_small_glyph_heights()
+        try:
+            for table_idx, table in enumerate(page.find_tables()):
+                table_data = table.extract()
+                if table_data:
+                    tables.append((*table.bbox, page_num + 1, table_idx, table_data))
+        except Exception as e:
+            logger.error(f"Error extracting tables on page {page_num + 1}: {e}", exc_info=True)
+        finally:
+            fitz.TOOLS.set_small_glyph_heights(small_glyph_heights)
+
+    return rows, tables
+
+
+def _extract_page_range(
+    file_path: str,
+    page_indices: List[int]
+) -> Tuple[List[tuple], List[tuple]]:
+    """Worker entry point: reopen the PDF and extract blocks from some pages."""
+    with fitz.open(file_path) as doc:
+        return _page_blocks(doc, page_indices)
+
+
 class DocumentProcessor:
     """
     Enhanced document processor with layout awareness.
 
     Features:
     - Extract text blocks with bounding boxes (PyMuPDF)
-    - Detect and extract tables (pdfplumber)
+    - Detect and extract tables (PyMuPDF, same pass as the text)
     - Preserve reading order
     - Identify block types (text, table, header, footer)
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize the processor.
+
+        Args:
+            cache_dir: Optional directory for reusing the blocks of PDFs
+                that were processed before
+        """
         self.logger = logging.getLogger(__name__)
+        self.block_cache = None
+
+        if cache_dir is not None:
+            from app.services.document_cache import DocumentBlockCache
+
+            self.block_cache = DocumentBlockCache(cache_dir, PARSER_VERSION)
 
     def process_pdf(self, file_path: Path) -> Tuple[List[TextBlock], Dict[str, Any]]:
         """
         Process a PDF file and extract text blocks with metadata.
 
+        The PDF is opened once; metadata, text blocks and tables all come
+        from the same document. With a block cache, a PDF whose content was
+        processed before is not parsed again.
+
         Args:
             file_path: Path to PDF file
 
@@ -108,18 +209,47 @@ class DocumentProcessor:
         """
         self.logger.info(f"Processing PDF: {file_path}")
 
-        # Extract metadata
-        metadata = self._extract_metadata(file_path)
+        cache_key = None
+        content = None
+        if self.block_cache is not None:
+            content = file_path.read_bytes()
+            cache_key = self.block_cache.make_key(content)
+            cached = self.block_cache.get(cache_key)
+            if cached is not None:
+                all_blocks, metadata = cached
+                metadata["file_name"] = file_path.name
+                metadata["processed_at"] = datetime.now().isoformat()
+                self.logger.info(f"Reusing {len(all_blocks)} cached blocks for {file_path.name}")
+                return all_blocks, metadata
+
+        text_blocks: List[TextBlock] = []
+        table_blocks: List[TextBlock] = []
 
-        # Extract text blocks with PyMuPDF
-        text_blocks = self._extract_text_blocks_pymupdf(file_path)
+        try:
+            # Parse the bytes already read for the cache key instead of
+            # reading the file a second time
+            source = fitz.open(stream=content, filetype="pdf") if content else fitz.open(file_path)
+            with source as doc:
+                # Extract metadata
+                metadata = self._extract_metadata(file_path, doc)
 
-        # Extract tables with pdfplumber
-        table_blocks = self._extract_tables_pdfplumber(file_path)
+                # Extract text blocks and tables in one pass over the pages
+                text_blocks, table_blocks = self._extract_blocks(file_path, doc)
+
+        except Exception as e:
+            self.logger.error(f"Error extracting text blocks: {e}", exc_info=True)
+            metadata = self._fallback_metadata(file_path)
+            cache_key = None  # Don't cache a failed extraction
 
         # Merge text and table blocks, sorted by reading order
         all_blocks = self._merge_and_sort_blocks(text_blocks, table_blocks)
 
+        if cache_key is not None:
+            try:
+                self.block_cache.put(cache_key, all_blocks, metadata)
+            except OSError as e:
+                self.logger.warning(f"Could not cache blocks for {file_path.name}: {e}")
+
         self.logger.info(
             f"Extracted {len(all_blocks)} blocks "
             f"({len(text_blocks)} text, {len(table_blocks)} tables) "
@@ -128,11 +258,10 @@ class DocumentProcessor:
 
         return all_blocks, metadata
 
-    def _extract_metadata(self, file_path: Path) -> Dict[str, Any]:
+    def _extract_metadata(self, file_path: Path, doc: "fitz.Document") -> Dict[str, Any]:
         """Extract document-level metadata."""
         try:
-            doc = fitz.open(file_path)
-            metadata = {
+            return {
                 "file_name": file_path.name,
                 "file_size": file_path.stat().st_size,
                 "page_count": len(doc),
@@ -141,146 +270,103 @@ class DocumentProcessor:
                 "created": doc.metadata.get("creationDate", ""),
                 "processed_at": datetime.now().isoformat()
             }
-            doc.close()
-            return metadata
         except Exception as e:
             self.logger.error(f"Error extracting metadata: {e}")
-            return {
-                "file_name": file_path.name,
-                "file_size": file_path.stat().st_size,
-                "page_count": 0,
-                "processed_at": datetime.now().isoformat()
-            }
+            return self._fallback_metadata(file_path)
 
-    def _extract_text_blocks_pymupdf(self, file_path: Path) -> List[TextBlock]:
+    def _fallback_metadata(self, file_path: Path) -> Dict[str, Any]:
+        """Metadata for a PDF whose own metadata couldn't be read."""
+        return {
+            "file_name": file_path.name,
+            "file_size": file_path.stat().st_size,
+            "page_count": 0,
+            "processed_at": datetime.now().isoformat()
+        }
+
+    def _extract_blocks(
+        self,
+        file_path: Path,
+        doc: "fitz.Document"
+    ) -> Tuple[List[TextBlock], List[TextBlock]]:
         """
-        Extract text blocks with bounding boxes using PyMuPDF.
+        Extract text blocks and tables with bounding boxes using PyMuPDF.
 
         PyMuPDF's get_text("blocks") returns blocks in reading order with:
         - Block text
         - Bounding box coordinates
         - Block number (reading order)
-        """
-        blocks = []
-
-        try:
-            doc = fitz.open(file_path)
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-
-                # Get text blocks (format: x0, y0, x1, y1, "text", block_no, block_type)
-                text_blocks = page.get_text("blocks")
-
-                for block in text_blocks:
-                    # block format: (x0, y0, x1, y1, "lines of text", block_no, block_type)
-                    x0, y0, x1, y1, text, block_no, block_type = block
-
-                    # Skip empty blocks
-                    if not text.strip():
-                        continue
-
-                    # Create bounding box
-                    bbox = BoundingBox(x0, y0, x1, y1)
 
-                    # Determine block type (0 = text, 1 = image)
-                    b_type = "image" if block_type == 1 else "text"
+        Tables are found with page.find_tables() and converted to Markdown.
 
-                    # Detect headers/footers (heuristic: top 10% or bottom 10% of page)
-                    page_height = page.rect.height
-                    if y0 < page_height * 0.1:
-                        b_type = "header"
-                    elif y1 > page_height * 0.9:
-                        b_type = "footer"
-
-                    text_block = TextBlock(
-                        text=text.strip(),
-                        bbox=bbox,
-                        page_number=page_num + 1,  # 1-indexed
-                        block_type=b_type,
-                        confidence=1.0,
-                        metadata={"block_number": block_no}
-                    )
-
-                    blocks.append(text_block)
-
-            doc.close()
-
-        except Exception as e:
-            self.logger.error(f"Error extracting text blocks: {e}", exc_info=True)
-
-        return blocks
-
-    def _extract_tables_pdfplumber(self, file_path: Path) -> List[TextBlock]:
+        Long PDFs are split into page ranges extracted in parallel worker
+        processes, since pages are independent.
         """
-        Extract tables using pdfplumber.
-
-        Tables are converted to Markdown format and stored as table blocks.
-        """
-        table_blocks = []
-
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    # Find tables on page
-                    tables = page.find_tables()
-
-                    for table_idx, table in enumerate(tables):
-                        # Extract table data
-                        table_data = table.extract()
-
-                        if not table_data:
-                            continue
-
-                        # Convert table to Markdown format
-                        markdown_table = self._table_to_markdown(table_data)
-
-                        # Get table bounding box
-                        bbox = BoundingBox(
-                            table.bbox[0],  # x0
-                            table.bbox[1],  # y0
-                            table.bbox[2],  # x1
-                            table.bbox[3]   # y1
-                        )
-
-                        table_block = TextBlock(
-                            text=markdown_table,
-                            bbox=bbox,
-                            page_number=page_num + 1,
-                            block_type="table",
-                            confidence=0.95,
-                            metadata={
-                                "table_index": table_idx,
-                                "rows": len(table_data),
-                                "cols": len(table_data[0]) if table_data else 0,
-                                "raw_data": table_data
-                            }
-                        )
-
-                        table_blocks.append(table_block)
-
-        except Exception as e:
-            self.logger.error(f"Error extracting tables: {e}", exc_info=True)
+        page_count = len(doc)
+        workers = min(
+            max((os.cpu_count() or 1) - 1, 1),
+            -(-page_count // PAGES_PER_TASK)
+        )
 
-        return table_blocks
+        if page_count < PARALLEL_MIN_PAGES or workers < 2:
+            rows, tables = _page_blocks(doc, range(page_count))
+        else:
+            page_ranges = [
+                list(range(start, min(start + PAGES_PER_TASK, page_count)))
+                for start in range(0, page_count, PAGES_PER_TASK)
+            ]
+            rows, tables = [], []
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                for part_rows, part_tables in pool.map(
+                    _extract_page_range, repeat(str(file_path)), page_ranges
+                ):
+                    rows.extend(part_rows)
+                    tables.extend(part_tables)
+
+        text_blocks = [
+            TextBlock(
+                text=text,
+                bbox=BoundingBox(x0, y0, x1, y1),
+                page_number=page_number,
+                block_type=b_type,
+                confidence=1.0,
+                metadata={"block_number": block_no}
+            )
+            for text, x0, y0, x1, y1, page_number, block_no, b_type in rows
+        ]
+
+        table_blocks = [
+            TextBlock(
+                text=self._table_to_markdown(table_data),
+                bbox=BoundingBox(x0, y0, x1, y1),
+                page_number=page_number,
+                block_type="table",
+                confidence=0.95,
+                metadata={
+                    "table_index": table_idx,
+                    "rows": len(table_data),
+                    "cols": len(table_data[0]) if table_data else 0,
+                    "raw_data": table_data
+                }
+            )
+            for x0, y0, x1, y1, page_number, table_idx, table_data in tables
+        ]
+
+        return text_blocks, table_blocks
 
     def _table_to_markdown(self, table_data: List[List[str]]) -> str:
         """Convert table data to Markdown format."""
         if not table_data:
             return ""
 
-        lines = []
-
-        # Header row
-        header = table_data[0]
-        lines.append("| " + " | ".join(str(cell or "") for cell in header) + " |")
-
-        # Separator
-        lines.append("| " + " | ".join("---" for _ in header) + " |")
+        # Header and data rows; join() gets lists, since it would otherwise
+        # materialize each generator into a list first
+        lines = ["| " + " | ".join([str(cell or "") for cell in row]) + " |" for row in table_data]
 
-        # Data rows
-        for row in table_data[1:]:
-            lines.append("| " + " | ".join(str(cell or "") for cell in row) + " |")
+        # Separator after the header row
+        lines.insert(1, "| " + " | ".join(["---"] * len(table_data[0])) + " |")
 
         return "\n".join(lines)
 
@@ -0,0 +1,77 @@
+"""Shared OpenAI API clients."""
+
+import importlib.util
+import logging
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# One pool per process; sized for concurrent embedding batches plus chat traffic
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Global singleton instances
+_openai_client: Optional[OpenAI] = None
+_async_openai_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Get the shared synchronous OpenAI client.
+
+    Returns:
+        OpenAI client backed by a single keep-alive connection pool
+    """
+    global _openai_client
+
+    if _openai_client is None:
+        _openai_client = OpenAI(
+            api_key=get_settings().openai_api_key,
+            http_client=httpx.Client(
+                http2=_HTTP2, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            ),
+        )
+
+    return _openai_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Get the shared asynchronous OpenAI client.
+
+    Returns:
+        AsyncOpenAI client backed by a single keep-alive connection pool
+    """
+    global _async_openai_client
+
+    if _async_openai_client is None:
+        _async_openai_client = AsyncOpenAI(
+            api_key=get_settings().openai_api_key,
+            http_client=httpx.AsyncClient(
+                http2=_HTTP2, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            ),
+        )
+        logger.info(f"Created shared AsyncOpenAI client (http2={_HTTP2})")
+
+    return _async_openai_client
+
+
+async def close_openai_clients() -> None:
+    """Close the shared clients and their connection pools."""
+    global _openai_client, _async_openai_client
+
+    if _openai_client is not None:
+        _openai_client.close()
+        _openai_client = None
+
+    if _async_openai_client is not None:
+        await _async_openai_client.close()
+        _async_openai_client = None
@@ -0,0 +1,279 @@
+"""Redis-backed session management for multi-worker deployments."""
+
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when SESSION_REDIS_URL is set
+    redis = None
+
+from pydantic import TypeAdapter
+
+from app.models import ConversationMessage
+
+logger = logging.getLogger(__name__)
+
+# ConversationMessage is a plain dataclass; this (de)serialises it to JSON
+_MESSAGE_ADAPTER = TypeAdapter(ConversationMessage)
+
+
+class RedisSessionManager:
+    """
+    Manages conversation sessions in Redis.
+
+    Same interface as SessionManager, but sessions live in Redis so every
+    uvicorn worker sees the same conversations and they survive restarts.
+    Each session is a list of JSON messages (session:{id}:messages) and a
+    metadata hash (session:{id}:meta). Both keys get the session TTL again
+    on every access, so Redis expires inactive sessions by itself and no
+    sweep is needed. A sorted set (sessions:active) scores each session id
+    by its expiry time so the active count needs no keyspace scan.
+    """
+
+    def __init__(self, redis_url: str, session_ttl_minutes: int = 60, max_messages: int = 200):
+        """
+        Connect to Redis.
+
+        Args:
+            redis_url: Redis connection URL (redis://host:port/db)
+            session_ttl_minutes: Time-to-live for inactive sessions (default 60 minutes)
+            max_messages: Messages kept per session; older ones are dropped
+
+        Raises:
+            RuntimeError: If the redis package is not installed
+        """
+        if redis is None:
+            raise RuntimeError("Redis sessions require the redis package (pip install redis)")
+
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._ttl_seconds = session_ttl_minutes * 60
+        self._max_messages = max_messages
+
+        logger.info(f"RedisSessionManager initialized with TTL={session_ttl_minutes} minutes")
+
+    _ACTIVE_KEY = "sessions:active"
+
+    @staticmethod
+    def _messages_key(session_id: str) -> str:
+        return f"session:{session_id}:messages"
+
+    @staticmethod
+    def _meta_key(session_id: str) -> str:
+        return f"session:{session_id}:meta"
+
+    def create_session(self, project_id: str) -> str:
+        """
+        Create a new session.
+
+        Args:
+            project_id: Project identifier
+
+        Returns:
+            New session ID (UUID)
+        """
+        session_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        meta_key = self._meta_key(session_id)
+
+        pipe = self._redis.pipeline()
+        pipe.hset(meta_key, mapping={
+            "project_id": project_id,
+            "created_at": now,
+            "last_accessed": now,
+        })
+        pipe.expire(meta_key, self._ttl_seconds)
+        pipe.zadd(self._ACTIVE_KEY, {session_id: time.time() + self._ttl_seconds})
+        pipe.execute()
+
+        logger.info(f"Created new session {session_id} for project {project_id}")
+        return session_id
+
+    def get_or_create_session(self, session_id: Optional[str], project_id: str) -> str:
+        """
+        Get existing session or create new one.
+
+        Args:
+            session_id: Optional existing session ID
+            project_id: Project identifier
+
+        Returns:
+            Session ID (existing or new)
+        """
+        if session_id:
+            # A missing (or expired) session has no project_id
+            owner = self._redis.hget(self._meta_key(session_id), "project_id")
+            if owner == project_id:
+                self._touch(session_id)
+                return session_id
+            if owner is not None:
+                logger.warning(
+                    f"Session {session_id} belongs to different project. Creating new session."
+                )
+
+        # Create new session
+        return self.create_session(project_id)
+
+    def session_exists(self, session_id: str) -> bool:
+        """Check if session exists and is not expired."""
+        return bool(self._redis.exists(self._meta_key(session_id)))
+
+    def add_message(self, session_id: str, message: ConversationMessage) -> None:
+        """
+        Add a message to the conversation history.
+
+        Args:
+            session_id: Session identifier
+            message: ConversationMessage to add
+        """
+        if not self.session_exists(session_id):
+            logger.warning(f"Attempted to add message to non-existent session {session_id}")
+            return
+
+        messages_key = self._messages_key(session_id)
+
+        pipe = self._redis.pipeline()
+        pipe.rpush(messages_key, _MESSAGE_ADAPTER.dump_json(message))
+        pipe.ltrim(messages_key, -self._max_messages, -1)
+        self._touch(session_id, pipe)
+        total = min(pipe.execute()[0], self._max_messages)
+
+        logger.debug(
+            f"Added {message.role} message to session {session_id} "
+            f"(total messages: {total})"
+        )
+
+    def get_conversation_history(
+        self,
+        session_id: str,
+        max_messages: Optional[int] = None
+    ) -> list[ConversationMessage]:
+        """
+        Get conversation history for a session.
+
+        Args:
+            session_id: Session identifier
+            max_messages: Maximum number of recent messages to return (None = all)
+
+        Returns:
+            List of conversation messages (chronological order)
+        """
+        if not self.session_exists(session_id):
+            logger.warning(f"Attempted to get history for non-existent session {session_id}")
+            return []
+
+        start = -max_messages if max_messages is not None and max_messages > 0 else 0
+
+        pipe = self._redis.pipeline()
+        pipe.lrange(self._messages_key(session_id), start, -1)
+        self._touch(session_id, pipe)
+        raw_messages = pipe.execute()[0]
+
+        return [_MESSAGE_ADAPTER.validate_json(raw) for raw in raw_messages]
+
+    def clear_session(self, session_id: str) -> bool:
+        """
+        Clear all messages in a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if session was cleared, False if session doesn't exist
+        """
+        if not self.session_exists(session_id):
+            return False
+
+        pipe = self._redis.pipeline()
+        pipe.delete(self._messages_key(session_id))
+        self._touch(session_id, pipe)
+        pipe.execute()
+
+        logger.info(f"Cleared session {session_id}")
+        return True
+
+    def delete_session(self, session_id: str) -> bool:
+        """
+        Delete a session completely.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if session was deleted, False if session doesn't exist
+        """
+        pipe = self._redis.pipeline()
+        pipe.delete(self._meta_key(session_id), self._messages_key(session_id))
+        pipe.zrem(self._ACTIVE_KEY, session_id)
+        deleted = pipe.execute()[0]
+        if not deleted:
+            return False
+
+        logger.info(f"Deleted session {session_id}")
+        return True
+
+    def get_session_metadata(self, session_id: str) -> Optional[dict]:
+        """
+        Get metadata for a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Metadata dictionary or None if session doesn't exist
+        """
+        metadata = self._redis.hgetall(self._meta_key(session_id))
+        if not metadata:
+            return None
+
+        for field in ("created_at", "last_accessed"):
+            if field in metadata:
+                metadata[field] = datetime.fromisoformat(metadata[field])
+        return metadata
+
+    def cleanup_expired_sessions(self) -> int:
+        """
+        Clean up all expired sessions.
+
+        Redis expires session keys itself; this only drops expired ids from
+        the active-session index.
+
+        Returns:
+            Number of sessions cleaned up (always 0)
+        """
+        self._redis.zremrangebyscore(self._ACTIVE_KEY, "-inf", time.time())
+        return 0
+
+    def get_active_session_count(self) -> int:
+        """Get count of active (non-expired) sessions."""
+        now = time.time()
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(self._ACTIVE_KEY, "-inf", now)
+        pipe.zcard(self._ACTIVE_KEY)
+        return pipe.execute()[1]
+
+    def get_last_cleanup_count(self) -> int:
+        """Get the number of sessions removed by the most recent cleanup."""
+        return 0
+
+    def _touch(self, session_id: str, pipe=None) -> None:
+        """
+        Update the last accessed timestamp and restart the session's TTL.
+
+        Args:
+            session_id: Session identifier
+            pipe: Pipeline to queue the commands on (executed immediately if omitted)
+        """
+        target = pipe if pipe is not None else self._redis.pipeline()
+        meta_key = self._meta_key(session_id)
+
+        target.hset(meta_key, "last_accessed", datetime.now().isoformat())
+        target.expire(meta_key, self._ttl_seconds)
+        target.expire(self._messages_key(session_id), self._ttl_seconds)
+        target.zadd(self._ACTIVE_KEY, {session_id: time.time() + self._ttl_seconds})
+
+        if pipe is None:
+            target.execute()
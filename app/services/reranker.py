@@ -0,0 +1,128 @@
+"""Cross-encoder re-ranking of retrieved chunks."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:  # Optional: re-ranking needs sentence-transformers
+    CrossEncoder = None
+
+from app.ingestion.vector_store import SearchResult
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-orders vector search results by cross-encoder relevance.
+
+    ANN similarity ranks chunks by embedding distance alone; a cross-encoder
+    reads the query and each chunk together and scores them more precisely,
+    so a few candidates beyond top_k can be fetched and the best top_k kept.
+
+    Scores are cached per (query, chunk id), so repeated questions only run
+    the model on chunks it hasn't scored for them yet.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "BAAI/bge-reranker-base",
+        ttl_seconds: float = 3600,
+        max_entries: int = 100_000,
+    ):
+        """
+        Load the cross-encoder model.
+
+        Args:
+            model_name: Hugging Face cross-encoder model
+            ttl_seconds: Time-to-live for each cached score
+            max_entries: Maximum number of cached scores before LRU eviction
+
+        Raises:
+            RuntimeError: If sentence-transformers is not installed
+        """
+        if CrossEncoder is None:
+            raise RuntimeError(
+                "Re-ranking requires sentence-transformers (pip install sentence-transformers)"
+            )
+
+        self.model = CrossEncoder(model_name)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # (query, chunk id) -> (score, expiry), in least- to most-recently-used order
+        self._scores: OrderedDict[tuple[str, str], tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        logger.info(f"CrossEncoderReranker initialized with model {model_name}")
+
+    def rerank(
+        self,
+        query: str,
+        results: Sequence[SearchResult],
+        top_k: int,
+    ) -> list[SearchResult]:
+        """
+        Keep the top_k results the cross-encoder rates most relevant.
+
+        Runs the model synchronously; call it from a worker thread.
+
+        Args:
+            query: User's question
+            results: Candidate search results
+            top_k: Number of results to keep
+
+        Returns:
+            Best top_k results, most relevant first, with score set to the
+            cross-encoder score
+        """
+        now = time.time()
+        scores: list[Optional[float]] = []
+        with self._lock:
+            for result in results:
+                cached = self._scores.get((query, result["id"]))
+                if cached is not None and cached[1] > now:
+                    self._scores.move_to_end((query, result["id"]))
+                    scores.append(cached[0])
+                else:
+                    scores.append(None)
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            predicted = self.model.predict([(query, results[i]["text"]) for i in missing])
+            with self._lock:
+                for i, score in zip(missing, predicted):
+                    scores[i] = float(score)
+                    key = (query, results[i]["id"])
+                    self._scores[key] = (scores[i], now + self.ttl_seconds)
+                    self._scores.move_to_end(key)
+                while len(self._scores) > self.max_entries:
+                    self._scores.popitem(last=False)
+
+        ranked = sorted(zip(scores, results), key=lambda pair: pair[0], reverse=True)
+        return [{**result, "score": score} for score, result in ranked[:top_k]]
+
+
+# Global singleton instance
+_reranker: Optional[CrossEncoderReranker] = None
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """
+    Get the global reranker instance.
+
+    Returns:
+        CrossEncoderReranker singleton configured from settings
+    """
+    global _reranker
+
+    if _reranker is None:
+        from app.config import get_settings
+
+        _reranker = CrossEncoderReranker(model_name=get_settings().rerank_model)
+
+    return _reranker
@@ -0,0 +1,247 @@
+"""Two-tier (exact + semantic) cache for chat answers."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    In-process answer cache with an exact tier and a semantic tier.
+
+    Tier 1 is an LRU keyed on (partition, query string). Tier 2 compares the
+    normalized query embedding against every cached embedding in the same
+    partition with one matrix-vector product and returns the best match if
+    its cosine similarity reaches the threshold.
+
+    Partitions keep entries from different projects (and different
+    conversation contexts) from ever answering each other. A partition is
+    either the project id or a tuple that starts with it, so a project's
+    entries can be dropped when its documents change.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        ttl_seconds: float = 600,
+        max_entries: int = 10_000,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a semantic hit
+            ttl_seconds: Time-to-live for each entry
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # (partition, query) -> row index, in least- to most-recently-used order
+        self._rows: OrderedDict[tuple[Hashable, str], int] = OrderedDict()
+        self._values: dict[int, Any] = {}
+        self._keys: dict[int, tuple[Hashable, str]] = {}
+        self._free_rows: list[int] = []
+
+        # Row-aligned storage for the semantic tier (allocated on first put)
+        self._vectors: Optional[np.ndarray] = None
+        self._partitions: list[Optional[Hashable]] = []
+        self._expires_at = np.zeros(0, dtype=np.float64)
+
+        logger.info(
+            f"SemanticCache initialized with threshold={threshold}, "
+            f"ttl={ttl_seconds}s, max_entries={max_entries}"
+        )
+
+    def get_exact(self, partition: Hashable, query: str) -> Optional[Any]:
+        """
+        Look up a cached value by exact query string.
+
+        Args:
+            partition: Partition key (e.g. project and conversation context)
+            query: Query string
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        key = (partition, query)
+        row = self._rows.get(key)
+        if row is None:
+            return None
+
+        if self._expires_at[row] <= time.monotonic():
+            self._evict(key)
+            return None
+
+        self._rows.move_to_end(key)
+        return self._values[row]
+
+    def get_similar(self, partition: Hashable, query_vector: list[float]) -> Optional[Any]:
+        """
+        Look up the most similar cached query in the same partition.
+
+        Args:
+            partition: Partition key
+            query_vector: Query embedding
+
+        Returns:
+            Cached value of the closest entry above the threshold, or None
+        """
+        if self._vectors is None or not self._rows:
+            return None
+
+        rows = np.fromiter(
+            (row for row, p in enumerate(self._partitions) if p == partition),
+            dtype=np.intp,
+        )
+        if rows.size == 0:
+            return None
+
+        rows = rows[self._expires_at[rows] > time.monotonic()]
+        if rows.size == 0:
+            return None
+
+        similarities = self._vectors[rows] @ self._normalize(query_vector)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        row = int(rows[best])
+        self._rows.move_to_end(self._keys[row])
+        logger.debug(f"Semantic cache hit with similarity {similarities[best]:.4f}")
+        return self._values[row]
+
+    def put(
+        self,
+        partition: Hashable,
+        query: str,
+        query_vector: list[float],
+        value: Any,
+    ) -> None:
+        """
+        Store a value for a query.
+
+        Args:
+            partition: Partition key
+            query: Query string
+            query_vector: Query embedding
+            value: Value to cache
+        """
+        key = (partition, query)
+        if key in self._rows:
+            self._evict(key)
+
+        while len(self._rows) >= self.max_entries:
+            self._evict(next(iter(self._rows)))
+
+        vector = self._normalize(query_vector)
+        row = self._allocate_row(vector.shape[0])
+
+        self._vectors[row] = vector
+        self._partitions[row] = partition
+        self._expires_at[row] = time.monotonic() + self.ttl_seconds
+        self._values[row] = value
+        self._keys[row] = key
+        self._rows[key] = row
+
+    def invalidate(self, project_id: str) -> int:
+        """
+        Remove every entry cached for a project.
+
+        Args:
+            project_id: Project identifier (the partition or its first element)
+
+        Returns:
+            Number of entries removed
+        """
+        stale = [
+            key for key in self._rows
+            if key[0] == project_id
+            or (isinstance(key[0], tuple) and key[0][:1] == (project_id,))
+        ]
+        for key in stale:
+            self._evict(key)
+
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached answers for project {project_id}")
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._rows.clear()
+        self._values.clear()
+        self._keys.clear()
+        self._free_rows = list(range(len(self._partitions)))
+        self._partitions = [None] * len(self._partitions)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _allocate_row(self, dim: int) -> int:
+        """Return a free row, growing the vector matrix when full."""
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        if self._vectors is None:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+
+        row = len(self._partitions)
+        if row >= self._vectors.shape[0]:
+            capacity = min(max(16, row * 2), self.max_entries)
+            vectors = np.zeros((capacity, dim), dtype=np.float32)
+            vectors[:row] = self._vectors[:row]
+            expires_at = np.zeros(capacity, dtype=np.float64)
+            expires_at[:row] = self._expires_at[:row]
+            self._vectors = vectors
+            self._expires_at = expires_at
+
+        self._partitions.append(None)
+        return row
+
+    def _evict(self, key: tuple[Hashable, str]) -> None:
+        """Remove an entry and recycle its row."""
+        row = self._rows.pop(key)
+        self._values.pop(row, None)
+        self._keys.pop(row, None)
+        self._partitions[row] = None
+        self._free_rows.append(row)
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> np.ndarray:
+        """Convert to a unit-length float32 array."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
+
+
+# Global singleton instance
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """
+    Get the global semantic cache instance.
+
+    Returns:
+        SemanticCache singleton configured from settings
+    """
+    global _semantic_cache
+
+    if _semantic_cache is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+
+        _semantic_cache = SemanticCache(
+            threshold=settings.semantic_cache_threshold,
+            ttl_seconds=settings.semantic_cache_ttl_seconds,
+            max_entries=settings.semantic_cache_max_entries,
+        )
+
+    return _semantic_cache
@@ -1,12 +1,18 @@
 """Session management for conversation persistence."""
 
 import logging
+import threading
+import time
 import uuid
-from typing import Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, deque
 from app.models import ConversationMessage
 
+if TYPE_CHECKING:
+    from app.services.redis_session_manager import RedisSessionManager
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,22 +20,48 @@ class SessionManager:
     """
     Manages conversation sessions with in-memory storage.
 
-    For MVP: Simple in-memory dictionary storage
-    For Production: Replace with Redis, PostgreSQL, or similar
+    Sessions only live in this process; set SESSION_REDIS_URL to use
+    RedisSessionManager when running several workers. Safe to call from
+    multiple threads.
     """
 
-    def __init__(self, session_ttl_minutes: int = 60):
+    def __init__(
+        self,
+        session_ttl_minutes: int = 60,
+        max_messages: int = 200,
+        on_evict: Optional[Callable[[str, ConversationMessage], None]] = None,
+    ):
         """
         Initialize session manager.
 
         Args:
             session_ttl_minutes: Time-to-live for inactive sessions (default 60 minutes)
+            max_messages: Messages kept per session; older ones are dropped
+            on_evict: Optional callback receiving (session_id, message) for each
+                message dropped by the cap, e.g. to fold it into a summary;
+                called with the manager's lock held
         """
-        self._sessions: dict[str, list[ConversationMessage]] = {}
+        # Bounded per session, so long conversations can't grow without limit
+        self._sessions: dict[str, deque[ConversationMessage]] = {}
+        self._max_messages = max_messages
+        self._on_evict = on_evict
         self._session_metadata: dict[str, dict] = {}
-        self._ttl_minutes = session_ttl_minutes
-
-        logger.info(f"SessionManager initialized with TTL={session_ttl_minutes} minutes")
+        # time.monotonic() of each session's last access; expiry checks are
+        # one float comparison and immune to wall-clock changes. Kept in
+        # access order (least recent first), and since every session has
+        # the same TTL that is also expiry order.
+        self._last_accessed: OrderedDict[str, float] = OrderedDict()
+        self._ttl_seconds = session_ttl_minutes * 60
+        self._last_cleanup_count = 0
+        # One lock for all sessions: expiry order is a single shared map,
+        # so per-session shards wouldn't protect it. Reentrant because
+        # get_or_create_session calls create_session.
+        self._lock = threading.RLock()
+
+        logger.info(
+            f"SessionManager initialized with TTL={session_ttl_minutes} minutes, "
+            f"max_messages={max_messages}"
+        )
 
     def create_session(self, project_id: str) -> str:
         """
@@ -42,12 +74,13 @@ class SessionManager:
             New session ID (UUID)
         """
         session_id = str(uuid.uuid4())
-        self._sessions[session_id] = []
-        self._session_metadata[session_id] = {
-            "project_id": project_id,
-            "created_at": datetime.now(),
-            "last_accessed": datetime.now(),
-        }
+        with self._lock:
+            self._sessions[session_id] = deque(maxlen=self._max_messages)
+            self._session_metadata[session_id] = {
+                "project_id": project_id,
+                "created_at": datetime.now(),
+            }
+            self._last_accessed[session_id] = time.monotonic()
 
         logger.info(f"Created new session {session_id} for project {project_id}")
         return session_id
@@ -63,35 +96,48 @@ class SessionManager:
         Returns:
             Session ID (existing or new)
         """
-        if session_id and self.session_exists(session_id):
-            # Validate project_id matches
-            metadata = self._session_metadata.get(session_id, {})
-            if metadata.get("project_id") == project_id:
-                self._update_last_accessed(session_id)
-                return session_id
-            else:
-                logger.warning(
-                    f"Session {session_id} belongs to different project. Creating new session."
-                )
-
-        # Create new session
-        return self.create_session(project_id)
+        with self._lock:
+            now = time.monotonic()
+            if session_id and self._session_alive(session_id, now):
+                # Validate project_id matches
+                metadata = self._session_metadata.get(session_id, {})
+                if metadata.get("project_id") == project_id:
+                    self._update_last_accessed(session_id, now)
+                    return session_id
+                else:
+                    logger.warning(
+                        f"Session {session_id} belongs to different project. Creating new session."
+                    )
+
+            # Create new session
+            return self.create_session(project_id)
 
     def session_exists(self, session_id: str) -> bool:
         """Check if session exists and is not expired."""
-        if session_id not in self._sessions:
+        with self._lock:
+            return self._session_alive(session_id, time.monotonic())
+
+    def _session_alive(self, session_id: str, now: float) -> bool:
+        """
+        Check if session exists and is not expired at a given time.
+
+        Args:
+            session_id: Session identifier
+            now: Current time.monotonic(), read once by the caller
+
+        Returns:
+            True if the session is live; expired sessions are removed
+        """
+        last_accessed = self._last_accessed.get(session_id)
+        if last_accessed is None:
             return False
 
         # Check expiration
-        metadata = self._session_metadata.get(session_id, {})
-        last_accessed = metadata.get("last_accessed")
-
-        if last_accessed:
-            age = datetime.now() - last_accessed
-            if age > timedelta(minutes=self._ttl_minutes):
-                logger.info(f"Session {session_id} expired (age: {age})")
-                self._cleanup_session(session_id)
-                return False
+        age = now - last_accessed
+        if age > self._ttl_seconds:
+            logger.info(f"Session {session_id} expired (age: {timedelta(seconds=age)})")
+            self._cleanup_session(session_id)
+            return False
 
         return True
 
@@ -103,17 +149,24 @@ class SessionManager:
             session_id: Session identifier
             message: ConversationMessage to add
         """
-        if not self.session_exists(session_id):
-            logger.warning(f"Attempted to add message to non-existent session {session_id}")
-            return
+        with self._lock:
+            now = time.monotonic()
+            if not self._session_alive(session_id, now):
+                logger.warning(f"Attempted to add message to non-existent session {session_id}")
+                return
 
-        self._sessions[session_id].append(message)
-        self._update_last_accessed(session_id)
+            self._update_last_accessed(session_id, now)
 
-        logger.debug(
-            f"Added {message.role} message to session {session_id} "
-            f"(total messages: {len(self._sessions[session_id])})"
-        )
+            messages = self._sessions[session_id]
+            if self._on_evict is not None and len(messages) == messages.maxlen:
+                self._on_evict(session_id, messages[0])
+
+            messages.append(message)  # Drops the oldest message once at the cap
+
+            logger.debug(
+                f"Added {message.role} message to session {session_id} "
+                f"(total messages: {len(messages)})"
+            )
 
     def get_conversation_history(
         self,
@@ -130,17 +183,21 @@ class SessionManager:
         Returns:
             List of conversation messages (chronological order)
         """
-        if not self.session_exists(session_id):
-            logger.warning(f"Attempted to get history for non-existent session {session_id}")
-            return []
+        with self._lock:
+            now = time.monotonic()
+            if not self._session_alive(session_id, now):
+                logger.warning(f"Attempted to get history for non-existent session {session_id}")
+                return []
 
-        messages = self._sessions[session_id]
+            messages = self._sessions[session_id]
 
-        if max_messages is not None and max_messages > 0:
-            messages = messages[-max_messages:]
+            # Only the requested tail is copied
+            start = 0
+            if max_messages is not None and max_messages > 0:
+                start = max(len(messages) - max_messages, 0)
 
-        self._update_last_accessed(session_id)
-        return messages
+            self._update_last_accessed(session_id, now)
+            return list(islice(messages, start, None))
 
     def clear_session(self, session_id: str) -> bool:
         """
@@ -152,14 +209,16 @@ class SessionManager:
         Returns:
             True if session was cleared, False if session doesn't exist
         """
-        if not self.session_exists(session_id):
-            return False
+        with self._lock:
+            now = time.monotonic()
+            if not self._session_alive(session_id, now):
+                return False
 
-        self._sessions[session_id] = []
-        self._update_last_accessed(session_id)
+            self._sessions[session_id].clear()
+            self._update_last_accessed(session_id, now)
 
-        logger.info(f"Cleared session {session_id}")
-        return True
+            logger.info(f"Cleared session {session_id}")
+            return True
 
     def delete_session(self, session_id: str) -> bool:
         """
@@ -171,12 +230,13 @@ class SessionManager:
         Returns:
             True if session was deleted, False if session doesn't exist
         """
-        if session_id not in self._sessions:
-            return False
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
 
-        self._cleanup_session(session_id)
-        logger.info(f"Deleted session {session_id}")
-        return True
+            self._cleanup_session(session_id)
+            logger.info(f"Deleted session {session_id}")
+            return True
 
     def get_session_metadata(self, session_id: str) -> Optional[dict]:
         """
@@ -188,10 +248,15 @@ class SessionManager:
         Returns:
             Metadata dictionary or None if session doesn't exist
         """
-        if not self.session_exists(session_id):
-            return None
+        with self._lock:
+            now = time.monotonic()
+            if not self._session_alive(session_id, now):
+                return None
 
-        return self._session_metadata.get(session_id, {}).copy()
+            metadata = self._session_metadata.get(session_id, {}).copy()
+            idle = now - self._last_accessed[session_id]
+            metadata["last_accessed"] = datetime.now() - timedelta(seconds=idle)
+            return metadata
 
     def cleanup_expired_sessions(self) -> int:
         """
@@ -200,53 +265,84 @@ class SessionManager:
         Returns:
             Number of sessions cleaned up
         """
-        now = datetime.now()
-        expired_sessions = []
-
-        for session_id, metadata in self._session_metadata.items():
-            last_accessed = metadata.get("last_accessed")
-            if last_accessed:
-                age = now - last_accessed
-                if age > timedelta(minutes=self._ttl_minutes):
-                    expired_sessions.append(session_id)
-
-        for session_id in expired_sessions:
-            self._cleanup_session(session_id)
+        with self._lock:
+            cutoff = time.monotonic() - self._ttl_seconds
+            expired_count = 0
+
+            # Expired sessions are all at the front; stop at the first live one
+            while self._last_accessed:
+                session_id, last_accessed = next(iter(self._last_accessed.items()))
+                if last_accessed >= cutoff:
+                    break
+                self._cleanup_session(session_id)
+                expired_count += 1
 
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+            if expired_count:
+                logger.info(f"Cleaned up {expired_count} expired sessions")
 
-        return len(expired_sessions)
+            self._last_cleanup_count = expired_count
+            return expired_count
 
     def get_active_session_count(self) -> int:
         """Get count of active (non-expired) sessions."""
         return len(self._sessions)
 
-    def _update_last_accessed(self, session_id: str) -> None:
-        """Update last accessed timestamp for a session."""
-        if session_id in self._session_metadata:
-            self._session_metadata[session_id]["last_accessed"] = datetime.now()
+    def get_last_cleanup_count(self) -> int:
+        """Get the number of sessions removed by the most recent cleanup."""
+        return self._last_cleanup_count
+
+    def _update_last_accessed(self, session_id: str, now: float) -> None:
+        """
+        Update last accessed timestamp for a live session.
+
+        Callers have just checked the session with _session_alive, so it is
+        known to exist; moving it to the end keeps expiry order.
+
+        Args:
+            session_id: Session identifier
+            now: Current time.monotonic()
+        """
+        self._last_accessed[session_id] = now
+        self._last_accessed.move_to_end(session_id)
 
     def _cleanup_session(self, session_id: str) -> None:
         """Remove session from storage."""
         self._sessions.pop(session_id, None)
         self._session_metadata.pop(session_id, None)
+        self._last_accessed.pop(session_id, None)
 
 
 # Global singleton instance
-_session_manager: Optional[SessionManager] = None
+_session_manager: Optional["SessionManager | RedisSessionManager"] = None
 
 
-def get_session_manager() -> SessionManager:
+def get_session_manager() -> "SessionManager | RedisSessionManager":
     """
     Get the global session manager instance.
 
     Returns:
-        SessionManager singleton
+        RedisSessionManager singleton if SESSION_REDIS_URL is set,
+        otherwise the in-memory SessionManager singleton
     """
     global _session_manager
 
     if _session_manager is None:
-        _session_manager = SessionManager(session_ttl_minutes=60)
+        from app.config import get_settings
+
+        settings = get_settings()
+
+        if settings.session_redis_url:
+            from app.services.redis_session_manager import RedisSessionManager
+
+            _session_manager = RedisSessionManager(
+                settings.session_redis_url,
+                session_ttl_minutes=60,
+                max_messages=settings.session_max_messages,
+            )
+        else:
+            _session_manager = SessionManager(
+                session_ttl_minutes=60,
+                max_messages=settings.session_max_messages,
+            )
 
     return _session_manager
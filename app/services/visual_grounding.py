@@ -9,14 +9,23 @@ This module handles:
 """
 
 import logging
-import io
+import os
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import fitz  # PyMuPDF
-from PIL import Image, ImageDraw
+from PIL import Image, ImageColor, ImageDraw
 
 logger = logging.getLogger(__name__)
 
+# Threads encoding and writing chunk images for one document
+IMAGE_WRITER_THREADS = min(4, os.cpu_count() or 1)
+
+# Per-image failures that skip just that chunk's image: MuPDF errors are
+# RuntimeErrors, PIL raises ValueError/OSError, disk errors are OSErrors
+_IMAGE_ERRORS = (RuntimeError, ValueError, OSError)
+
 
 class VisualGroundingService:
     """
@@ -40,6 +49,8 @@ class VisualGroundingService:
         """
         self.data_dir = Path(data_dir)
         self.highlight_color = highlight_color
+        # Parsed once; an invalid color name fails here rather than per image
+        self._highlight_rgb = ImageColor.getrgb(highlight_color)
         self.highlight_width = highlight_width
         self.logger = logging.getLogger(__name__)
 
@@ -69,59 +80,133 @@ class VisualGroundingService:
             Path to saved image, or None if failed
         """
         try:
-            # Open PDF
-            doc = fitz.open(pdf_path)
+            with fitz.open(pdf_path) as doc:
+                # Get page (0-indexed)
+                page_idx = page_number - 1
+                if page_idx < 0 or page_idx >= len(doc):
+                    self.logger.error(f"Invalid page number: {page_number}")
+                    return None
+
+                page = doc[page_idx]
+
+                if not add_highlight and output_path.suffix.lower() == ".png":
+                    # Nothing to draw, so MuPDF writes the PNG itself
+                    pix = self._render_pixmap(page, bounding_box, padding, dpi)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    pix.save(str(output_path))
+                else:
+                    img = self._render_clip(page, bounding_box, add_highlight, padding, dpi)
+                    self._save_image(img, output_path)
 
-            # Get page (0-indexed)
-            page_idx = page_number - 1
-            if page_idx < 0 or page_idx >= len(doc):
-                self.logger.error(f"Invalid page number: {page_number}")
-                doc.close()
-                return None
+            self.logger.debug(f"Created chunk image: {output_path.name}")
+            return output_path
 
-            page = doc[page_idx]
+        except Exception as e:
+            self.logger.error(f"Error cropping chunk image: {e}", exc_info=True)
+            return None
 
-            # Create rectangle with padding
-            x1, y1, x2, y2 = bounding_box
-            rect = fitz.Rect(
-                max(0, x1 - padding),
-                max(0, y1 - padding),
-                min(page.rect.width, x2 + padding),
-                min(page.rect.height, y2 + padding)
-            )
+    def _render_clip(
+        self,
+        page: fitz.Page,
+        bounding_box: List[float],
+        add_highlight: bool = True,
+        padding: int = 10,
+        dpi: int = 144
+    ) -> Image.Image:
+        """
+        Render a region of an already-loaded page.
 
-            # Calculate zoom factor for DPI
-            # Default PDF DPI is 72, so zoom = target_dpi / 72
-            zoom = dpi / 72
-            mat = fitz.Matrix(zoom, zoom)
+        Args:
+            page: Loaded PDF page
+            bounding_box: Bounding box [x1, y1, x2, y2]
+            add_highlight: Whether to add highlight border
+            padding: Padding around bounding box in points
+            dpi: Resolution for rendering (144 = 2x, 72 = 1x)
 
-            # Render page region to pixmap
-            pix = page.get_pixmap(clip=rect, matrix=mat)
+        Returns:
+            Cropped PIL image
+        """
+        img = self._pixmap_to_image(self._render_pixmap(page, bounding_box, padding, dpi))
 
-            # Convert to PNG bytes
-            img_bytes = pix.tobytes("png")
+        # Add highlight border
+        if add_highlight:
+            img = self._add_highlight_border(img)
 
-            # Convert to PIL Image
-            img = Image.open(io.BytesIO(img_bytes))
+        return img
+
+    @staticmethod
+    def _render_pixmap(
+        page: fitz.Page,
+        bounding_box: List[float],
+        padding: int = 10,
+        dpi: int = 144
+    ) -> fitz.Pixmap:
+        """
+        Render a padded region of an already-loaded page to a pixmap.
+
+        Args:
+            page: Loaded PDF page
+            bounding_box: Bounding box [x1, y1, x2, y2]
+            padding: Padding around bounding box in points
+            dpi: Resolution for rendering (144 = 2x, 72 = 1x)
 
-            # Add highlight border
-            if add_highlight:
-                img = self._add_highlight_border(img)
+        Returns:
+            RGB pixmap of the region
+        """
+        # Create rectangle with padding
+        x1, y1, x2, y2 = bounding_box
+        rect = fitz.Rect(
+            max(0, x1 - padding),
+            max(0, y1 - padding),
+            min(page.rect.width, x2 + padding),
+            min(page.rect.height, y2 + padding)
+        )
+        if rect.is_empty:
+            raise ValueError(f"Bounding box {bounding_box} is outside the page")
 
-            # Create output directory if needed
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Calculate zoom factor for DPI
+        # Default PDF DPI is 72, so zoom = target_dpi / 72
+        zoom = dpi / 72
+        mat = fitz.Matrix(zoom, zoom)
 
-            # Save image
-            img.save(output_path, "PNG", optimize=True)
+        # Render page region to pixmap
+        return page.get_pixmap(clip=rect, matrix=mat)
 
-            doc.close()
+    @staticmethod
+    def _pixmap_to_image(pix: fitz.Pixmap) -> Image.Image:
+        """
+        Wrap a rendered pixmap's samples in a PIL image.
 
-            self.logger.debug(f"Created chunk image: {output_path.name}")
-            return output_path
+        get_pixmap renders RGB without alpha by default, so the raw samples
+        can be copied straight into PIL instead of going through PNG.
 
-        except Exception as e:
-            self.logger.error(f"Error cropping chunk image: {e}", exc_info=True)
-            return None
+        Args:
+            pix: Rendered RGB pixmap
+
+        Returns:
+            PIL Image in RGB mode
+        """
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    @staticmethod
+    def _save_image(img: Image.Image, output_path: Path) -> None:
+        """
+        Save a rendered image, creating its directory if needed.
+
+        The format follows the file suffix: .webp is written as fast lossless
+        WebP, anything else as PNG.
+
+        Args:
+            img: PIL Image
+            output_path: Where to save the image
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.suffix.lower() == ".webp":
+            # quality/method are encoder effort for lossless WebP; the lowest
+            # settings still beat optimized PNG on size for page crops
+            img.save(output_path, "WEBP", lossless=True, quality=0, method=1)
+        else:
+            img.save(output_path, "PNG")
 
     def _add_highlight_border(self, img: Image.Image) -> Image.Image:
         """
@@ -135,14 +220,14 @@ class VisualGroundingService:
         """
         draw = ImageDraw.Draw(img)
 
-        # Draw rectangle around entire image
+        # Draw rectangle around entire image; PIL insets a wide outline,
+        # so one call paints the whole border
         width, height = img.size
-        for i in range(self.highlight_width):
-            draw.rectangle(
-                [(i, i), (width - i - 1, height - i - 1)],
-                outline=self.highlight_color,
-                width=1
-            )
+        draw.rectangle(
+            [(0, 0), (width - 1, height - 1)],
+            outline=self._highlight_rgb,
+            width=self.highlight_width
+        )
 
         return img
 
@@ -165,40 +250,81 @@ class VisualGroundingService:
         Returns:
             List of relative image paths (relative to data_dir)
         """
-        image_paths = []
+        image_paths = [""] * len(chunks)
 
         # Create images directory
         images_dir = self.data_dir / "documents" / project_id / document_id / "chunk_images"
         images_dir.mkdir(parents=True, exist_ok=True)
 
-        for chunk in chunks:
+        # Group chunks by page so the PDF is opened once and each page loaded once
+        chunks_by_page: Dict[int, List[Tuple[int, Any]]] = defaultdict(list)
+        for i, chunk in enumerate(chunks):
             # Skip if no bounding box or invalid
             bbox = getattr(chunk, 'bounding_box', [0, 0, 0, 0])
             if bbox == [0, 0, 0, 0]:
                 # No visual grounding for this chunk
-                image_paths.append("")
                 continue
+            chunks_by_page[getattr(chunk, 'page_number', 1)].append((i, chunk))
 
-            # Generate image filename
-            chunk_id = getattr(chunk, 'chunk_id', f"chunk_{getattr(chunk, 'chunk_index', 0)}")
-            page_num = getattr(chunk, 'page_number', 1)
-            output_path = images_dir / f"{chunk_id}_page_{page_num}.png"
-
-            # Crop and save image
-            result = self.crop_chunk_image(
-                pdf_path=pdf_path,
-                page_number=page_num,
-                bounding_box=bbox,
-                output_path=output_path,
-                add_highlight=True
-            )
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            self.logger.error(f"Error opening {pdf_path} for chunk images: {e}", exc_info=True)
+            return image_paths
+
+        # (chunk_id, error) for images that could not be created, logged once
+        # at the end; anything other than a rendering or I/O error propagates
+        failures: List[Tuple[str, str]] = []
 
-            if result:
-                # Store relative path
-                rel_path = str(output_path.relative_to(self.data_dir))
-                image_paths.append(rel_path)
-            else:
-                image_paths.append("")
+        def collect(index: int, output_path: Path, saved: Future) -> None:
+            try:
+                saved.result()
+            except _IMAGE_ERRORS as e:
+                failures.append((output_path.stem, repr(e)))
+                return
+
+            self.logger.debug(f"Created chunk image: {output_path.name}")
+
+            # Store relative path
+            image_paths[index] = str(output_path.relative_to(self.data_dir))
+
+        # PyMuPDF is not thread-safe, so pages are rendered on this thread;
+        # image encoding (most of the time, and GIL-free in PIL) runs on a
+        # few writer threads. Bounding the pending saves bounds memory.
+        pending: deque = deque()
+
+        with doc, ThreadPoolExecutor(max_workers=IMAGE_WRITER_THREADS) as writers:
+            for page_num, page_chunks in chunks_by_page.items():
+                page_idx = page_num - 1
+                page = doc[page_idx] if 0 <= page_idx < len(doc) else None
+
+                for i, chunk in page_chunks:
+                    # Generate image filename
+                    chunk_id = getattr(chunk, 'chunk_id', f"chunk_{getattr(chunk, 'chunk_index', 0)}")
+                    output_path = images_dir / f"{chunk_id}_page_{page_num}.webp"
+
+                    if page is None:
+                        failures.append((output_path.stem, f"invalid page number {page_num}"))
+                        continue
+
+                    # Crop, then save in the background
+                    try:
+                        img = self._render_clip(page, chunk.bounding_box, add_highlight=True)
+                    except _IMAGE_ERRORS as e:
+                        failures.append((output_path.stem, repr(e)))
+                        continue
+
+                    pending.append((i, output_path, writers.submit(self._save_image, img, output_path)))
+                    if len(pending) > 2 * IMAGE_WRITER_THREADS:
+                        collect(*pending.popleft())
+
+            while pending:
+                collect(*pending.popleft())
+
+        if failures:
+            self.logger.warning(
+                f"Failed to create {len(failures)} chunk images, e.g. {failures[:5]}"
+            )
 
         self.logger.info(
             f"Generated {sum(1 for p in image_paths if p)} chunk images "
@@ -244,8 +370,7 @@ class VisualGroundingService:
             pix = page.get_pixmap(matrix=mat)
 
             # Convert to PIL Image
-            img_bytes = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_bytes))
+            img = self._pixmap_to_image(pix)
 
             # Draw highlight rectangle on full page
             draw = ImageDraw.Draw(img)
@@ -259,20 +384,15 @@ class VisualGroundingService:
                 int(y2 * zoom)
             ]
 
-            # Draw thick red rectangle
-            for i in range(self.highlight_width):
-                draw.rectangle(
-                    [
-                        (scaled_bbox[0] + i, scaled_bbox[1] + i),
-                        (scaled_bbox[2] - i, scaled_bbox[3] - i)
-                    ],
-                    outline=self.highlight_color,
-                    width=1
-                )
+            # Draw thick red rectangle (the outline grows inwards)
+            draw.rectangle(
+                [(scaled_bbox[0], scaled_bbox[1]), (scaled_bbox[2], scaled_bbox[3])],
+                outline=self._highlight_rgb,
+                width=self.highlight_width
+            )
 
             # Save image
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            img.save(output_path, "PNG", optimize=True)
+            self._save_image(img, output_path)
 
             doc.close()
 
@@ -339,9 +459,12 @@ class VisualGroundingService:
             images_dir = self.data_dir / "documents" / project_id / document_id / "chunk_images"
 
             if images_dir.exists():
-                # Delete all images
-                for img_file in images_dir.glob("*.png"):
-                    img_file.unlink()
+                # Delete all images, including PNGs from older ingests
+                # (scandir avoids a Path object per file)
+                with os.scandir(images_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith((".webp", ".png")):
+                            os.unlink(entry.path)
 
                 # Remove directory
                 images_dir.rmdir()
@@ -5,6 +5,8 @@ from app.ingestion.chunker import chunk_text
 from app.ingestion.loaders import RawDocument
 from app.ingestion.file_types import FileType
 from app.ingestion.chunker import chunk_document
+from app.ingestion.chunker import SemanticChunker
+from app.services.document_processor import BoundingBox, TextBlock
 
 
 def test_chunk_text_small_text():
@@ -52,6 +54,22 @@ def test_chunk_text_overlap():
         assert len(overlap) > 0
 
 
+def test_chunk_text_slices_original_text():
+    """Test that chunks are slices of the original text, whitespace included."""
+    lines = [f"line {i} has\tfive words" for i in range(40)]
+    text = "\n".join(lines)
+
+    chunks = chunk_text(text, max_tokens=20, overlap_tokens=5)
+
+    assert len(chunks) > 1
+    for chunk_index, chunk in chunks:
+        assert chunk in text
+        assert len(chunk.split()) <= 20
+    assert "\n" in chunks[0][1]
+    assert chunks[0][1].startswith("line 0")
+    assert text.endswith(chunks[-1][1])
+
+
 def test_chunk_text_empty():
     """Test chunking empty text."""
     chunks = chunk_text("", max_tokens=100, overlap_tokens=10)
@@ -92,3 +110,79 @@ def test_chunk_document():
     assert first_chunk.metadata["chunk_index"] == 0
     assert "total_chunks" in first_chunk.metadata
 
+
+
+def _make_blocks(count, words_per_block, page_number=1):
+    """Build simple text blocks with unique words."""
+    return [
+        TextBlock(
+            text=" ".join(f"b{i}w{j}" for j in range(words_per_block)),
+            bbox=BoundingBox(0, i * 20, 100, (i + 1) * 20),
+            page_number=page_number,
+        )
+        for i in range(count)
+    ]
+
+
+def test_semantic_chunker_overlap():
+    """Test that consecutive chunks share trailing blocks covering the overlap."""
+    chunker = SemanticChunker(chunk_size=100, chunk_overlap=30, min_chunk_size=1)
+    blocks = _make_blocks(count=20, words_per_block=25)
+    
+    chunks = chunker.chunk_blocks(blocks, "doc", "proj", "doc.pdf")
+    
+    assert len(chunks) > 1
+    for previous, current in zip(chunks, chunks[1:]):
+        previous_blocks = previous.text.split("\n\n")
+        current_blocks = current.text.split("\n\n")
+        # 30 overlap words need the last two 25-word blocks
+        assert current_blocks[:2] == previous_blocks[-2:]
+    
+    for chunk in chunks:
+        assert chunk.metadata["word_count"] == len(chunk.text.split())
+
+
+def test_iter_chunk_blocks_matches_chunk_blocks():
+    """Test that streamed chunks match the list API, tables first on each page."""
+    chunker = SemanticChunker(chunk_size=50, chunk_overlap=10, min_chunk_size=1)
+    blocks = []
+    for page in (1, 2, 3):
+        blocks.extend(_make_blocks(count=4, words_per_block=20, page_number=page))
+        blocks.append(TextBlock(
+            text="| a | b |\n| --- | --- |\n| 1 | 2 |",
+            bbox=BoundingBox(0, 500, 100, 600),
+            page_number=page,
+            block_type="table",
+        ))
+    
+    streamed = [c.to_dict() for c in chunker.iter_chunk_blocks(blocks, "doc", "proj", "doc.pdf")]
+    listed = [c.to_dict() for c in chunker.chunk_blocks(blocks, "doc", "proj", "doc.pdf")]
+    
+    assert streamed == listed
+    assert [c["chunk_index"] for c in streamed] == list(range(len(streamed)))
+    assert [c["page_number"] for c in streamed] == sorted(c["page_number"] for c in streamed)
+    for page in (1, 2, 3):
+        page_types = [c["chunk_type"] for c in streamed if c["page_number"] == page]
+        assert page_types[0] == "table"
+
+
+def test_semantic_chunker_dedupe_blocks():
+    """Test that repeated text blocks are dropped only when enabled."""
+    boilerplate = "Copyright 2024 Example Corp. All rights reserved."
+    blocks = []
+    for page in (1, 2, 3):
+        blocks.extend(_make_blocks(count=1, words_per_block=10, page_number=page))
+        blocks.append(TextBlock(
+            text=boilerplate,
+            bbox=BoundingBox(0, 700, 100, 720),
+            page_number=page,
+        ))
+    
+    deduped = SemanticChunker(chunk_size=1000, min_chunk_size=1, dedupe_blocks=True)
+    kept = SemanticChunker(chunk_size=1000, min_chunk_size=1)
+    
+    deduped_text = deduped.chunk_blocks(blocks, "doc", "proj", "doc.pdf")[0].text
+    kept_text = kept.chunk_blocks(blocks, "doc", "proj", "doc.pdf")[0].text
+    
+    assert deduped_text.count(boilerplate) == 1
+    assert kept_text.count(boilerplate) == 3
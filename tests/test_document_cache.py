@@ -0,0 +1,45 @@
+"""Tests for the persistent document block cache."""
+
+from app.services.document_cache import DocumentBlockCache, ExtractedTextCache
+from app.services.document_processor import BoundingBox, TextBlock
+
+
+def test_block_cache_round_trips_blocks(tmp_path):
+    """Test that stored blocks and metadata come back unchanged."""
+    cache = DocumentBlockCache(tmp_path, parser_version="v1")
+    blocks = [
+        TextBlock("Intro", BoundingBox(72.0, 51.5, 199.25, 62.5), 1, "header", 1.0, {"block_number": 0}),
+        TextBlock("| a |\n| --- |", BoundingBox(72, 120, 432, 245), 1, "table", 0.95,
+                  {"table_index": 0, "rows": 1, "cols": 1, "raw_data": [["a"]]}),
+    ]
+    key = cache.make_key(b"%PDF-1.7 content")
+
+    assert cache.get(key) is None
+    cache.put(key, blocks, {"file_name": "a.pdf", "page_count": 1})
+
+    cached_blocks, metadata = DocumentBlockCache(tmp_path, parser_version="v1").get(key)
+    assert [block.to_dict() for block in cached_blocks] == [block.to_dict() for block in blocks]
+    assert metadata == {"file_name": "a.pdf", "page_count": 1}
+
+
+def test_block_cache_is_keyed_by_parser_version(tmp_path):
+    """Test that a new parser version doesn't reuse older entries."""
+    content = b"%PDF-1.7 content"
+
+    assert (
+        DocumentBlockCache(tmp_path, parser_version="v1").make_key(content)
+        != DocumentBlockCache(tmp_path, parser_version="v2").make_key(content)
+    )
+
+
+def test_text_cache_round_trips_text(tmp_path):
+    """Test that stored text and metadata come back unchanged, without colliding with blocks."""
+    content = b"<html><body>Hello</body></html>"
+    cache = ExtractedTextCache(tmp_path, extractor_version="v1")
+    key = cache.make_key(content)
+
+    assert cache.get(key) is None
+    assert key != DocumentBlockCache(tmp_path, parser_version="v1").make_key(content)
+    cache.put(key, "Hello", {"image_count": 0})
+
+    assert ExtractedTextCache(tmp_path, extractor_version="v1").get(key) == ("Hello", {"image_count": 0})
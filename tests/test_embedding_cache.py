@@ -0,0 +1,52 @@
+"""Tests for the persistent embedding cache."""
+
+import pytest
+from app.ingestion.embedding_cache import CachedEmbedder, EmbeddingCache
+
+
+class CountingEmbedder:
+    """Embedder that records which texts it was asked to embed."""
+
+    def __init__(self):
+        self.seen: list[str] = []
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self.seen.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_cached_embedder_only_embeds_misses(tmp_path):
+    """Test that repeated texts are served from the cache in input order."""
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, EmbeddingCache(tmp_path / "emb.sqlite"), model="m")
+
+    first = embedder.embed_texts(["a", "bb"])
+    second = embedder.embed_texts(["ccc", "a", "bb"])
+
+    assert inner.seen == ["a", "bb", "ccc"]
+    assert first == [[1.0, 1.0], [2.0, 1.0]]
+    assert second == [[3.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+
+
+def test_cache_persists_and_is_keyed_by_model(tmp_path):
+    """Test that entries survive reopening and differ per model."""
+    path = tmp_path / "emb.sqlite"
+    CachedEmbedder(CountingEmbedder(), EmbeddingCache(path), model="m").embed_texts(["a"])
+
+    inner = CountingEmbedder()
+    assert CachedEmbedder(inner, EmbeddingCache(path), model="m").embed_texts(["a"]) == [[1.0, 1.0]]
+    assert inner.seen == []
+
+    CachedEmbedder(inner, EmbeddingCache(path), model="other").embed_texts(["a"])
+    assert inner.seen == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_cached_embedder_async(tmp_path):
+    """Test the async path with a synchronous inner embedder."""
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner, EmbeddingCache(tmp_path / "emb.sqlite"), model="m")
+
+    assert await embedder.aembed_texts(["a", "a"]) == [[1.0, 1.0], [1.0, 1.0]]
+    assert await embedder.aembed_texts(["a"]) == [[1.0, 1.0]]
+    assert inner.seen == ["a", "a"]
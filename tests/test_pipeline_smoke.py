@@ -1,19 +1,29 @@
 """Smoke tests for the ingestion pipeline."""
 
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 from app.ingestion.loaders import RawDocument
 from app.ingestion.file_types import FileType
-from app.ingestion.pipeline import ingest_raw_document
+from app.ingestion.pipeline import ingest_raw_document, ingest_multiple_files
 from app.ingestion.embedder import BaseEmbedder
-from app.ingestion.vector_store import WeaviateVectorStore
+from app.ingestion.vector_store import WeaviateBatcher, WeaviateVectorStore
 
 
 class MockEmbedder:
     """Mock embedder for testing."""
     
-    def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Return fake embeddings (all zeros)."""
-        return [[0.0] * 3072 for _ in texts]  # text-embedding-3-large has 3072 dimensions
+    def __init__(self):
+        self.calls = 0
+        self.texts_embedded = 0
+        self._zero = np.zeros(3072, dtype=np.float32)  # text-embedding-3-large has 3072 dimensions
+    
+    def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Return fake embeddings (all zeros, a read-only view of one row)."""
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        return np.broadcast_to(self._zero, (len(texts), self._zero.size))
 
 
 class MockVectorStore:
@@ -22,11 +32,17 @@ class MockVectorStore:
     def __init__(self):
         self.stored_chunks = []
         self.stored_embeddings = []
+        self.deleted_sources = []
     
     def ensure_schema(self):
         """No-op for mock."""
         pass
     
+    def delete_by_source(self, project_id, source_id):
+        """Record which sources were cleared before storing."""
+        self.deleted_sources.append((project_id, source_id))
+        return 0
+    
     def upsert_chunks(self, chunks, embeddings):
         """Store chunks and embeddings for verification."""
         self.stored_chunks.extend(chunks)
@@ -64,7 +80,8 @@ async def test_ingest_raw_document_produces_chunks():
     assert result["source_id"] == "test-doc"
     assert result["file_name"] == "test.txt"
     
-    # Verify chunks were stored
+    # Verify chunks were stored, after clearing the source's old chunks
+    assert mock_vector_store.deleted_sources == [("test-project", "test-doc")]
     assert len(mock_vector_store.stored_chunks) == result["num_chunks"]
     assert len(mock_vector_store.stored_embeddings) == result["num_chunks"]
 
@@ -125,3 +142,160 @@ async def test_ingest_raw_document_empty_file():
     # Should handle gracefully
     assert "error" in result or result["num_chunks"] == 0
 
+
+
+@pytest.mark.asyncio
+async def test_ingest_multiple_files_embeds_once():
+    """Test that chunks from all files are embedded in a single call."""
+    raws = [
+        RawDocument(
+            project_id="test-project",
+            source_id=f"test-doc-{i}",
+            file_type=FileType.TXT,
+            file_name=f"test-{i}.txt",
+            bytes=b"This is a test document. " * 200,
+        )
+        for i in range(3)
+    ]
+    
+    mock_embedder = MockEmbedder()
+    mock_vector_store = MockVectorStore()
+    
+    results = await ingest_multiple_files(
+        project_id="test-project",
+        raws=raws,
+        vector_store=mock_vector_store,
+        embedder=mock_embedder,
+    )
+    
+    assert mock_embedder.calls == 1
+    assert [r["source_id"] for r in results] == ["test-doc-0", "test-doc-1", "test-doc-2"]
+    assert all(r["num_chunks"] > 0 for r in results)
+    assert len(mock_vector_store.stored_chunks) == sum(r["num_chunks"] for r in results)
+    
+    # The three files are identical, so each distinct chunk text is embedded once
+    unique_texts = {chunk.text for chunk in mock_vector_store.stored_chunks}
+    assert mock_embedder.texts_embedded == len(unique_texts)
+    assert len(mock_vector_store.stored_embeddings) == len(mock_vector_store.stored_chunks)
+
+
+@pytest.mark.asyncio
+async def test_ingest_multiple_files_shares_upsert_batches():
+    """Test that small files are stored together rather than one upsert batch each."""
+    inserted_batches = []
+
+    async def insert_many(objects):
+        inserted_batches.append(list(objects))
+        return SimpleNamespace(errors={})
+
+    class BatchingVectorStore(MockVectorStore):
+        """Mock store whose async upserts go through a WeaviateBatcher."""
+
+        def __init__(self):
+            super().__init__()
+            self.batcher = WeaviateBatcher(insert_many, batch_size=100, max_wait_ms=1000)
+
+        async def aupsert_chunks(self, chunks, embeddings):
+            await self.batcher.insert(list(chunks))
+
+    raws = [
+        RawDocument(
+            project_id="test-project",
+            source_id=f"test-doc-{i}",
+            file_type=FileType.TXT,
+            file_name=f"test-{i}.txt",
+            bytes=f"Small test document number {i}.".encode(),
+        )
+        for i in range(5)
+    ]
+    vector_store = BatchingVectorStore()
+
+    results = await ingest_multiple_files(
+        project_id="test-project",
+        raws=raws,
+        vector_store=vector_store,
+        embedder=MockEmbedder(),
+    )
+    await vector_store.batcher.close()
+
+    assert all(r["num_chunks"] == 1 for r in results)
+    assert [len(batch) for batch in inserted_batches] == [5]
+
+
+@pytest.mark.asyncio
+async def test_ingest_multiple_files_isolates_preparation_failures(monkeypatch):
+    """Test that a file whose preparation raises only fails that file."""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.ingestion import pipeline
+
+    prepare = pipeline._prepare_raw_document
+
+    def flaky_prepare(project_id, raw):
+        if raw.file_name == "broken.txt":
+            raise RuntimeError("worker died")
+        return prepare(project_id, raw)
+
+    # Threads instead of worker processes, so the patched function is used
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(pipeline, "_prepare_raw_document", flaky_prepare)
+    monkeypatch.setattr(pipeline, "get_process_pool", lambda: pool)
+
+    raws = [
+        RawDocument(
+            project_id="test-project",
+            source_id=name,
+            file_type=FileType.TXT,
+            file_name=name,
+            bytes=b"This is a test document. " * 100,
+        )
+        for name in ("good.txt", "broken.txt")
+    ]
+    mock_vector_store = MockVectorStore()
+
+    results = await ingest_multiple_files(
+        project_id="test-project",
+        raws=raws,
+        vector_store=mock_vector_store,
+        embedder=MockEmbedder(),
+    )
+
+    assert "error" not in results[0] and results[0]["num_chunks"] > 0
+    assert results[1]["error"] == "worker died"
+    assert len(mock_vector_store.stored_chunks) == results[0]["num_chunks"]
+
+
+@pytest.mark.asyncio
+async def test_ingest_removes_document_when_later_batch_fails(monkeypatch):
+    """Test that a document whose second micro-batch fails is not left half-stored."""
+    from app.config import get_settings
+
+    class FlakyEmbedder(MockEmbedder):
+        def embed_texts(self, texts):
+            if self.calls == 1:
+                self.calls += 1
+                raise RuntimeError("rate limited")
+            return super().embed_texts(texts)
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "embed_batch_size", 2)
+    monkeypatch.setattr(settings, "embed_max_concurrency", 1)
+
+    raw = RawDocument(
+        project_id="test-project",
+        source_id="test-doc",
+        file_type=FileType.TXT,
+        file_name="test.txt",
+        bytes=" ".join(f"Sentence number {i} of the test document." for i in range(2000)).encode(),
+    )
+    mock_vector_store = MockVectorStore()
+
+    result = await ingest_raw_document(
+        project_id="test-project",
+        raw=raw,
+        vector_store=mock_vector_store,
+        embedder=FlakyEmbedder(),
+    )
+
+    assert mock_vector_store.stored_chunks  # the first micro-batch was stored
+    assert result["error"] == "rate limited (partially stored chunks were removed)"
+    assert mock_vector_store.deleted_sources == [("test-project", "test-doc")] * 2
@@ -0,0 +1,82 @@
+"""Tests for the chat answer cache."""
+
+import pytest
+from app.services.semantic_cache import SemanticCache
+
+
+def test_exact_hit():
+    """Test that an identical query in the same partition is a hit."""
+    cache = SemanticCache()
+    cache.put("project-a", "What is RAG?", [1.0, 0.0, 0.0], "answer")
+    
+    assert cache.get_exact("project-a", "What is RAG?") == "answer"
+    assert cache.get_exact("project-a", "What is rag?") is None
+
+
+def test_semantic_hit_respects_threshold():
+    """Test that only sufficiently similar vectors are semantic hits."""
+    cache = SemanticCache(threshold=0.95)
+    cache.put("project-a", "What is RAG?", [1.0, 0.0, 0.0], "answer")
+    
+    assert cache.get_similar("project-a", [0.99, 0.05, 0.0]) == "answer"
+    assert cache.get_similar("project-a", [0.5, 0.5, 0.0]) is None
+
+
+def test_partitions_are_isolated():
+    """Test that entries never leak across partitions."""
+    cache = SemanticCache()
+    cache.put("project-a", "What is RAG?", [1.0, 0.0, 0.0], "answer")
+    
+    assert cache.get_exact("project-b", "What is RAG?") is None
+    assert cache.get_similar("project-b", [1.0, 0.0, 0.0]) is None
+
+
+def test_ttl_expiry():
+    """Test that expired entries are not returned."""
+    cache = SemanticCache(ttl_seconds=0)
+    cache.put("project-a", "What is RAG?", [1.0, 0.0, 0.0], "answer")
+    
+    assert cache.get_exact("project-a", "What is RAG?") is None
+    assert cache.get_similar("project-a", [1.0, 0.0, 0.0]) is None
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted when full."""
+    cache = SemanticCache(max_entries=2)
+    cache.put("p", "first", [1.0, 0.0], "1")
+    cache.put("p", "second", [0.0, 1.0], "2")
+    
+    # Touch "first" so "second" becomes the eviction candidate
+    assert cache.get_exact("p", "first") == "1"
+    cache.put("p", "third", [-1.0, 0.0], "3")
+    
+    assert len(cache) == 2
+    assert cache.get_exact("p", "second") is None
+    assert cache.get_exact("p", "first") == "1"
+    assert cache.get_exact("p", "third") == "3"
+    assert cache.get_similar("p", [0.0, 1.0]) is None
+
+
+def test_semantic_hit_refreshes_recency():
+    """Test that a semantic hit protects its entry from LRU eviction."""
+    cache = SemanticCache(max_entries=2)
+    cache.put("p", "first", [1.0, 0.0], "1")
+    cache.put("p", "second", [0.0, 1.0], "2")
+    
+    assert cache.get_similar("p", [0.99, 0.01]) == "1"
+    cache.put("p", "third", [-1.0, 0.0], "3")
+    
+    assert cache.get_exact("p", "first") == "1"
+    assert cache.get_exact("p", "second") is None
+
+
+def test_invalidate_drops_only_that_project():
+    """Test that invalidating a project removes its entries in every partition."""
+    cache = SemanticCache()
+    cache.put(("project-a", 5, False, "h1"), "What is RAG?", [1.0, 0.0], "a1")
+    cache.put(("project-a", 5, False, "h2"), "What is RAG?", [1.0, 0.0], "a2")
+    cache.put(("project-b", 5, False, "h1"), "What is RAG?", [1.0, 0.0], "b")
+    
+    assert cache.invalidate("project-a") == 2
+    assert cache.get_similar(("project-a", 5, False, "h1"), [1.0, 0.0]) is None
+    assert cache.get_exact(("project-b", 5, False, "h1"), "What is RAG?") == "b"
@@ -85,8 +85,23 @@ def test_text_file_extraction():
     assert "With multiple lines" in text
 
 
-def test_image_extraction_placeholder():
-    """Test that images return placeholder text."""
+def test_text_file_latin1_extraction():
+    """Test that a latin-1 text file is decoded rather than stripped of accents."""
+    raw = RawDocument(
+        project_id="test",
+        source_id="test",
+        file_type=FileType.TXT,
+        file_name="test.txt",
+        bytes="Café naïve résumé, déjà vu.".encode("latin-1"),
+    )
+    
+    text, metadata = extract_text(raw)
+    
+    assert "Café naïve résumé, déjà vu." in text
+
+
+def test_image_extraction_unsupported():
+    """Test that images are rejected until OCR is implemented."""
     raw = RawDocument(
         project_id="test",
         source_id="test",
@@ -95,11 +110,8 @@ def test_image_extraction_placeholder():
         bytes=b"fake image bytes",
     )
     
-    text, metadata = extract_text(raw)
-    
-    assert "IMAGE: test.jpg" in text
-    assert "no OCR yet" in text
-    assert "ocr_note" in metadata
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        extract_text(raw)
 
 
 def test_unknown_file_type():
@@ -112,8 +124,6 @@ def test_unknown_file_type():
         bytes=b"some content",
     )
     
-    text, metadata = extract_text(raw)
-    
-    assert "UNKNOWN FILE TYPE" in text
-    assert "error" in metadata
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        extract_text(raw)
 
@@ -0,0 +1,67 @@
+"""Tests for coalescing Weaviate upserts across concurrent ingests."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from app.ingestion.vector_store import WeaviateBatcher
+
+
+class RecordingInsertMany:
+    """insert_many stand-in that records batches and rejects chosen objects."""
+
+    def __init__(self, rejected=()):
+        self.batches: list[list] = []
+        self.rejected = set(rejected)
+
+    async def __call__(self, objects):
+        self.batches.append(list(objects))
+        errors = {
+            i: SimpleNamespace(message=f"bad object {obj}")
+            for i, obj in enumerate(objects)
+            if obj in self.rejected
+        }
+        return SimpleNamespace(errors=errors)
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_inserts():
+    """Test that objects from concurrent callers share batches of batch_size."""
+    insert_many = RecordingInsertMany()
+    batcher = WeaviateBatcher(insert_many, batch_size=4, max_wait_ms=20)
+
+    await asyncio.gather(batcher.insert([1, 2, 3]), batcher.insert([4, 5]))
+    await batcher.close()
+
+    assert [len(batch) for batch in insert_many.batches] == [4, 1]
+    assert sorted(obj for batch in insert_many.batches for obj in batch) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_batcher_fails_only_callers_with_rejected_objects():
+    """Test that a rejected object fails its own caller but not the others."""
+    insert_many = RecordingInsertMany(rejected={"b"})
+    batcher = WeaviateBatcher(insert_many, batch_size=10, max_wait_ms=20)
+
+    ok, failed = await asyncio.gather(
+        batcher.insert(["a"]), batcher.insert(["b", "c"]), return_exceptions=True
+    )
+    await batcher.close()
+
+    assert ok is None
+    assert isinstance(failed, RuntimeError)
+    assert "1/2" in str(failed)
+
+
+@pytest.mark.asyncio
+async def test_batcher_close_flushes_partial_batch():
+    """Test that close() sends a half-full batch instead of leaving callers waiting."""
+    insert_many = RecordingInsertMany()
+    batcher = WeaviateBatcher(insert_many, batch_size=10, max_wait_ms=500)
+
+    pending = asyncio.ensure_future(batcher.insert([1, 2, 3]))
+    await asyncio.sleep(0.05)
+    await batcher.close()
+
+    await asyncio.wait_for(pending, timeout=1)
+    assert insert_many.batches == [[1, 2, 3]]